@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Offline Scraper Benchmark
+=========================
+Times each scraper's parse and match path against the checked-in pages in
+benchmarks/fixtures/ (each retailer's listing, product and JSON markup, with
+the inventory's cigars among ~180 products), so parser and matcher changes
+can be compared on equal terms. Nothing is fetched: sockets are disabled for the whole run and
+the scrape cache is kept in memory.
+
+Fixtures:
+- cgars_listing.html: CGars brand listing page (.product-listing-box)
+- havanahouse_listing.html: Havana House WooCommerce listing page
+- cigarclub_search.html / cigarclub_product.html: Cigar Club search and
+  variable product pages
+- cigarclub_store_products.json / cigarclub_store_variations.json: Cigar Club
+  Store API pages
+- jjfox_search.html / jjfox_product.html: JJ Fox search page and a
+  configurable product page with its spConfig
+- no6_products.json / no6_product.json: No6 Cavendish Shopify products.json
+  page and /products/{handle}.json
+- inventory.json: the cigars looked up by the match cases (SCRAPE_INVENTORY
+  points at another .json/.csv inventory instead, see inventory.py)
+
+Each case runs once untimed, then BENCH_REPEAT times (default 5) with the
+matching memo caches cleared before every round, so results are cold-cache
+numbers. Reported per
+case: calls, items per second, wall and CPU ms per call and the parse/match
+split from run metrics (scrapers/metrics.py).
+
+The html suite parses each HTML fixture with every installed parser backend
+(scrapers/html_parser.py), subtree-only, against the old full html.parser
+parse, and reports the CPU saved per page.
+
+Usage:
+    python benchmarks/benchmark_scrapers.py                 # every retailer
+    python benchmarks/benchmark_scrapers.py cgars no6       # some of them
+    BENCH_JSON=bench.json python benchmarks/benchmark_scrapers.py
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import socket
+from contextlib import redirect_stdout
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+# Keep the benchmark off the shared cache database
+os.environ['SCRAPE_CACHE'] = '0'
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from inventory import load_file
+from scrapers import matching, metrics
+from scrapers.product_index import ProductIndex
+
+
+REPEAT = int(os.environ.get('BENCH_REPEAT', '5'))
+JSON_OUTPUT = os.environ.get('BENCH_JSON', '')
+
+
+def _no_network(*args, **kwargs):
+    raise RuntimeError("network access is disabled in the offline benchmark")
+
+
+def disable_network():
+    """Make any attempt to open a connection fail loudly."""
+    socket.socket.connect = _no_network
+    socket.socket.connect_ex = _no_network
+    socket.create_connection = _no_network
+    socket.getaddrinfo = _no_network
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def clear_memos():
+    """Empty every memoized matching helper so each round starts cold."""
+    for name in dir(matching):
+        fn = getattr(matching, name)
+        if hasattr(fn, 'cache_clear'):
+            fn.cache_clear()
+
+
+def run_case(name, fn, repeat=REPEAT):
+    """
+    Time fn() over repeat rounds. fn returns the number of items it handled.
+
+    Returns a result dict with calls, items, seconds, ms per call, items/sec
+    and the run-metrics phases recorded while it ran.
+    """
+    # One untimed call first, so compiled CSS selectors and regexes aren't billed to whichever case runs first
+    with redirect_stdout(io.StringIO()):
+        fn()
+
+    metrics.reset()
+    items = 0
+    seconds = 0.0
+    cpu = 0.0
+
+    for _ in range(repeat):
+        clear_memos()
+        # Scrapers log each decision - keep the report readable
+        with redirect_stdout(io.StringIO()):
+            started, cpu_started = time.perf_counter(), time.process_time()
+            items += fn()
+            seconds += time.perf_counter() - started
+            cpu += time.process_time() - cpu_started
+
+    phases = {
+        # Match calls take microseconds - keep more precision than snapshot()'s avg_ms
+        phase: {'count': h['count'], 'sum': h['sum'], 'avg_ms': round(h['sum'] / h['count'] * 1000, 4)}
+        for phase, h in metrics.snapshot().items()
+    }
+    return {
+        'case': name,
+        'calls': repeat,
+        'items': items,
+        'seconds': round(seconds, 6),
+        'ms_per_call': round(seconds / repeat * 1000, 3),
+        'cpu_ms_per_call': round(cpu / repeat * 1000, 3),
+        'items_per_sec': round(items / seconds, 1) if seconds else None,
+        'phases': phases,
+    }
+
+
+# -- cases per retailer --------------------------------------------------------
+# Each returns [(case name, fn)]; fixtures are read and parsed inputs built
+# up front so only the parse/match work itself is timed.
+
+def cgars_cases(inventory):
+    from scrapers import scrape_cgars as m
+    html = fixture('cgars_listing.html')
+    products, _ = m.parse_listing_page(html)
+    index = ProductIndex(products)
+
+    def match():
+        for c in inventory:
+            candidates = m.candidate_products(index, c['brand'], c['name'])
+            m.find_match(candidates, c['brand'], c['name'], c['box_size'], log_rejections=False)
+        return len(inventory)
+
+    return [
+        ('parse_listing_page', lambda: len(m.parse_listing_page(html)[0])),
+        ('index', lambda: len(ProductIndex(products))),
+        ('match', match),
+    ]
+
+
+def havanahouse_cases(inventory):
+    from scrapers import scrape_havana_house as m
+    html = fixture('havanahouse_listing.html')
+    products, _ = m.parse_search_results(html)
+    catalogue = m.build_catalogue(products)
+
+    def match():
+        for c in inventory:
+            m.find_match(m.candidate_products(catalogue, c['brand'], c['name']), c['brand'], c['name'], c['box_size'])
+        return len(inventory)
+
+    return [
+        ('parse_search_results', lambda: len(m.parse_search_results(html)[0])),
+        ('page_count', lambda: m.page_count(html) and 1),
+        ('build_catalogue', lambda: len(m.build_catalogue(products))),
+        ('match', match),
+    ]
+
+
+def cigarclub_cases(inventory):
+    from scrapers import scrape_cigar_club as m
+    from scrapers import woocommerce
+    search_html = fixture('cigarclub_search.html')
+    product_html = fixture('cigarclub_product.html')
+    store_products = json.loads(fixture('cigarclub_store_products.json'))
+    store_variations = json.loads(fixture('cigarclub_store_variations.json'))
+    products = woocommerce.slim_store_page(store_products)
+    variations = woocommerce.slim_store_page(store_variations)
+    catalogue = m.build_catalogue(products, variations)
+    search_results = m.parse_search_results(search_html)
+    url = 'https://www.cigar-club.com/shop/cohiba-siglo-vi/'
+
+    def store_catalogue():
+        slim = woocommerce.slim_store_page(store_products)
+        return len(m.build_catalogue(slim, woocommerce.slim_store_page(store_variations)))
+
+    def match_search():
+        for c in inventory:
+            for product in search_results:
+                m.match_product(product, c['brand'], c['name'])
+        return len(inventory)
+
+    def match_catalogue():
+        for c in inventory:
+            m.scrape_catalogue(catalogue, c['brand'], c['name'], c['box_size'])
+        return len(inventory)
+
+    return [
+        ('parse_search_results', lambda: len(m.parse_search_results(search_html))),
+        ('parse_product_page', lambda: len(m.parse_product_page(product_html, url))),
+        ('store_catalogue', store_catalogue),
+        ('match_search', match_search),
+        ('match_catalogue', match_catalogue),
+    ]
+
+
+def jjfox_cases(inventory):
+    from scrapers import scrape_jjfox as m
+    search_html = fixture('jjfox_search.html')
+    product_html = fixture('jjfox_product.html')
+    search_results = m.parse_search_results(search_html)
+
+    def match():
+        for c in inventory:
+            for product in search_results:
+                m.match_product(product, c['brand'], c['name'])
+        return len(inventory)
+
+    return [
+        ('parse_search_results', lambda: len(m.parse_search_results(search_html))),
+        ('parse_product_config', lambda: len(m.parse_product_config(product_html))),
+        ('match', match),
+    ]
+
+
+def no6_cases(inventory):
+    from scrapers import scrape_no6cavendish as m
+    catalogue_json = fixture('no6_products.json')
+    product_json = fixture('no6_product.json')
+    catalogue = m.build_catalogue(m.slim_catalogue_page(catalogue_json))
+
+    def match():
+        for c in inventory:
+            m.scrape_catalogue(catalogue, c['brand'], c['name'], c['box_size'])
+        return len(inventory)
+
+    return [
+        ('catalogue', lambda: len(m.build_catalogue(m.slim_catalogue_page(catalogue_json)))),
+        ('parse_product_json', lambda: len(m.parse_product_json(product_json))),
+        ('match', match),
+    ]
+
+
+def matching_cases(inventory):
+    from scrapers.scrape_cigar_club import MATCH_RULES as rules
+    names = sorted({
+        p['title'] for p in json.loads(fixture('no6_products.json'))['products']
+    } | {
+        v['title'] for p in json.loads(fixture('no6_products.json'))['products'] for v in p['variants']
+    } | {
+        f"{p['name']} - {v['attributes'][0]['value'].replace('-', ' ')}"
+        for p in json.loads(fixture('cigarclub_store_products.json')) for v in p.get('variations', [])
+    })
+
+    def extract_box_sizes():
+        for name in names:
+            matching.extract_box_size(name, rules)
+        return len(names)
+
+    def normalize_names():
+        for name in names:
+            matching.normalize_name(name, rules)
+        return len(names)
+
+    def signatures():
+        for c in inventory:
+            matching.match_signature(c['brand'], c['name'], rules)
+        return len(inventory)
+
+    return [
+        ('extract_box_size', extract_box_sizes),
+        ('normalize_name', normalize_names),
+        ('match_signature', signatures),
+    ]
+
+
+def html_cases(inventory):
+    from scrapers import html_parser
+    from scrapers import scrape_cgars, scrape_havana_house, scrape_cigar_club, scrape_jjfox
+    pages = [
+        ('cgars listing', 'cgars_listing.html', lambda h: scrape_cgars.parse_listing_page(h)[0]),
+        ('havanahouse listing', 'havanahouse_listing.html', lambda h: scrape_havana_house.parse_search_results(h)[0]),
+        ('cigarclub search', 'cigarclub_search.html', scrape_cigar_club.parse_search_results),
+        ('cigarclub product', 'cigarclub_product.html', lambda h: scrape_cigar_club.parse_product_page(h, '')),
+        ('jjfox search', 'jjfox_search.html', scrape_jjfox.parse_search_results),
+    ]
+    # The old behaviour first, then every installed backend reading only the subtrees
+    modes = [('html.parser, full page', 'html.parser', False)]
+    modes += [(backend, backend, True) for backend in html_parser.available_backends()]
+
+    def parse_with(backend, subtrees, parse, html):
+        def run():
+            saved = html_parser.BACKEND, html_parser.SUBTREES
+            html_parser.BACKEND, html_parser.SUBTREES = backend, subtrees
+            try:
+                return len(parse(html))
+            finally:
+                html_parser.BACKEND, html_parser.SUBTREES = saved
+        return run
+
+    cases = []
+    for page, name, parse in pages:
+        html = fixture(name)
+        cases += [(f"{page}: {label}", parse_with(backend, subtrees, parse, html))
+                  for label, backend, subtrees in modes]
+    return cases
+
+
+def print_parse_savings(results):
+    """CPU saved per page by each backend against the page's full html.parser parse."""
+    print("\n  Parse CPU per page vs html.parser, full page:")
+    baseline = {}
+    for r in results:
+        page, label = r['case'].split(': ', 1)
+        if page not in baseline:
+            baseline[page] = r['cpu_ms_per_call']
+        elif baseline[page]:
+            saved = 1 - r['cpu_ms_per_call'] / baseline[page]
+            print(f"    {page:<22} {label:<12} {r['cpu_ms_per_call']:>8.2f} ms ({saved:+.0%} saved)")
+
+
+SUITES = {
+    'cgars': cgars_cases,
+    'havanahouse': havanahouse_cases,
+    'cigarclub': cigarclub_cases,
+    'jjfox': jjfox_cases,
+    'no6': no6_cases,
+    'matching': matching_cases,
+    'html': html_cases,
+}
+
+
+def print_results(suite, results):
+    print(f"\n{suite}")
+    for r in results:
+        phases = ', '.join(f"{phase} {h['avg_ms']}ms x{h['count']}" for phase, h in sorted(r['phases'].items()))
+        rate = f"{r['items_per_sec']:>10.1f} items/s" if r['items_per_sec'] else f"{'-':>10} items/s"
+        print(f"  {r['case']:<38} {r['ms_per_call']:>9.3f} ms/call {r['cpu_ms_per_call']:>9.3f} cpu ms {rate}"
+              + (f"   [{phases}]" if phases else ''))
+
+
+def main():
+    names = sys.argv[1:] or list(SUITES)
+    unknown = [n for n in names if n not in SUITES]
+    if unknown:
+        print(f"Unknown suite(s): {', '.join(unknown)} (choose from {', '.join(SUITES)})")
+        sys.exit(2)
+
+    disable_network()
+    inventory = load_file(os.environ.get('SCRAPE_INVENTORY') or os.path.join(FIXTURES_DIR, 'inventory.json'))
+    print(f"Offline scraper benchmark: {len(inventory)} cigars, {REPEAT} rounds per case")
+
+    report = {'repeat': REPEAT, 'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'suites': {}}
+    for name in names:
+        results = [run_case(case, fn) for case, fn in SUITES[name](inventory)]
+        report['suites'][name] = results
+        print_results(name, results)
+        if name == 'html':
+            print_parse_savings(results)
+
+    if JSON_OUTPUT:
+        with open(JSON_OUTPUT, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {JSON_OUTPUT}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker
+===============
+Stops a run from spending hours on a retailer that is down or has changed
+its markup.
+
+Two checks guard each retailer in scrape_retailer():
+- a preflight canary before any cigar: the scraper module's preflight()
+  (or preflight_async(engine)) runs one known search and parses its first
+  product. A failed canary skips the retailer's whole work list.
+- a breaker that trips after THRESHOLD consecutive failures - failed
+  requests to one host (timeouts, 429/503, errors, as seen by the rate
+  scheduler) or cigar lookups that raised or found nothing while their
+  fetches failed (see scrapers/lookup_status.py) - and skips the cigars
+  that haven't started yet.
+
+Either way the reason is recorded in retailer_stats[retailer]['breaker'],
+and skipped cigars keep their last recorded price.
+"""
+
+import os
+
+from scrapers import rate_scheduler
+
+
+# Consecutive failures that trip the breaker (override with SCRAPE_BREAKER_THRESHOLD)
+THRESHOLD = int(os.environ.get('SCRAPE_BREAKER_THRESHOLD', '5'))
+
+
+class CircuitBreaker:
+    """Trip state for one retailer's run."""
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.reason = ''
+        self.failures = 0
+        self.skipped = []
+
+    def trip(self, reason):
+        """Open the circuit - every cigar not yet started is skipped."""
+        if not self.reason:
+            self.reason = reason
+            print(f"  Circuit breaker tripped: {reason} - skipping remaining cigars")
+
+    def success(self):
+        """A lookup finished and none of its fetches failed (or it found a price anyway)."""
+        self.failures = 0
+
+    def failure(self, error):
+        """A lookup raised, or found nothing while its fetches failed."""
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.trip(f"{self.failures} consecutive lookup errors (last: {error})")
+
+    def allow(self, cigar):
+        """True if the cigar may be scraped; records it as skipped otherwise."""
+        if not self.reason:
+            for host, (streak, last) in rate_scheduler.failing_hosts(self.threshold).items():
+                self.trip(f"{streak} consecutive failed requests to {host} (last: {last})")
+                break
+
+        if self.reason:
+            self.skipped.append(cigar['key'])
+            return False
+        return True
+
+    def summary(self):
+        """Stats entry for a tripped breaker (None if it never tripped)."""
+        if not self.reason:
+            return None
+        return {'reason': self.reason, 'skipped': len(self.skipped)}
+
+
+def _canary_failed(reason):
+    return f"preflight canary failed: {reason}"
+
+
+def run_preflight(module, breaker):
+    """Run the module's sync canary (if it has one), tripping the breaker on failure."""
+    if not hasattr(module, 'preflight'):
+        return
+    try:
+        reason = module.preflight()
+    except Exception as e:
+        reason = f"error: {e}"
+    if reason:
+        breaker.trip(_canary_failed(reason))
+    else:
+        print("  Preflight canary passed")
+
+
+async def run_preflight_async(module, engine, breaker):
+    """Async version of run_preflight() using the module's preflight_async(engine)."""
+    if not hasattr(module, 'preflight_async'):
+        return
+    try:
+        reason = await module.preflight_async(engine)
+    except Exception as e:
+        reason = f"error: {e}"
+    if reason:
+        breaker.trip(_canary_failed(reason))
+    else:
+        print("  Preflight canary passed")
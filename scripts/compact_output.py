@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Compact Price Output
+====================
+A small, precompressed alternative to uk_market_prices.js for the app,
+written next to it when SCRAPE_COMPACT_OUTPUT=1. The app still imports
+uk_market_prices.js, so the scheduled workflow doesn't write or publish
+these yet.
+
+uk_market_prices.js repeats every retailer name, field name and URL host
+for every cigar, indented. The compact output is minified JSON with those
+strings interned once, optionally split into one chunk per brand so the
+app only fetches the brands it shows:
+
+    market_prices/manifest.json
+    market_prices/cohiba.1a2b3c4d.json       (content-hashed, so cacheable forever)
+    market_prices/*.json.gz / *.json.br      precompressed siblings
+
+manifest.json:
+    {"version": 1, "updated": "2026-10-17",
+     "retailers": ["CGars", "JJ Fox", ...],
+     "prefixes": ["https://www.cgarsltd.co.uk/", ...],
+     "row": ["name", "box_size", "price", "sources"],
+     "source": ["retailer", "price", "prefix", "path", "in_stock"],
+     "chunks": {"Cohiba": {"file": "cohiba.1a2b3c4d.json", "cigars": 12, "bytes": 1830}, ...}}
+
+A chunk maps each of its brands to rows:
+    {"Cohiba": [["Siglo VI", 25, 1234.5, [[0, 1220.0, 0, "cohiba-siglo-vi.html", 1], ...]], ...]}
+
+where a source's retailer and prefix are indexes into the manifest's
+tables, url = prefixes[prefix] + path, and in_stock is 1 or 0.
+
+SCRAPE_OUTPUT_CHUNKS=0 writes a single all.{hash}.json chunk instead of
+one per brand. .br files need the brotli package and are skipped without it.
+"""
+
+import os
+import re
+import gzip
+import json
+import glob
+import hashlib
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPACT_OUTPUT = os.environ.get('SCRAPE_COMPACT_OUTPUT', '0') == '1'
+CHUNK_BY_BRAND = os.environ.get('SCRAPE_OUTPUT_CHUNKS', '1') != '0'
+
+COMPACT_DIR = 'market_prices'
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+ROW_FIELDS = ['name', 'box_size', 'price', 'sources']
+SOURCE_FIELDS = ['retailer', 'price', 'prefix', 'path', 'in_stock']
+
+
+def _minified(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'brand'
+
+
+def split_url(url):
+    """(prefix, path) of a URL - everything up to the last '/' before any query, and the rest."""
+    cut = url.rfind('/', 0, url.find('?') if '?' in url else len(url))
+    return url[:cut + 1], url[cut + 1:]
+
+
+class _Table:
+    """Interned strings, indexed in first-seen order."""
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def __call__(self, value):
+        if value not in self.index:
+            self.index[value] = len(self.values)
+            self.values.append(value)
+        return self.index[value]
+
+
+def encode(final_prices):
+    """(brands, retailers, prefixes) - rows per brand and the interned tables they index."""
+    retailers, prefixes = _Table(), _Table()
+    brands = {}
+    for data in sorted(final_prices.values(), key=lambda d: (d['brand'], d['name'], d['box_size'])):
+        sources = []
+        for retailer, source in data['sources'].items():
+            prefix, path = split_url(source.get('url', '') or '')
+            sources.append([retailers(retailer), source['price'], prefixes(prefix), path,
+                            1 if source.get('in_stock', True) else 0])
+        brands.setdefault(data['brand'], []).append([data['name'], data['box_size'], data['price'], sources])
+    return brands, retailers.values, prefixes.values
+
+
+def _write(directory, name, payload):
+    """Write a file plus its .gz (and .br, if brotli is installed) siblings; returns bytes written raw."""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    # mtime=0 keeps the .gz byte-identical across runs when the data hasn't changed
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(payload, quality=11))
+    return len(payload)
+
+
+def write(final_prices, directory='.'):
+    """Write the compact chunks and manifest under directory/market_prices; returns the manifest."""
+    out_dir = os.path.join(directory, COMPACT_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+
+    brands, retailers, prefixes = encode(final_prices)
+    groups = {brand: {brand: rows} for brand, rows in brands.items()} if CHUNK_BY_BRAND else {'all': brands}
+
+    chunks = {}
+    for group, chunk in groups.items():
+        payload = _minified(chunk)
+        name = f"{_slug(group)}.{hashlib.sha1(payload).hexdigest()[:8]}.json"
+        size = _write(out_dir, name, payload)
+        chunks[group] = {'file': name, 'cigars': sum(len(rows) for rows in chunk.values()), 'bytes': size}
+
+    manifest = {
+        'version': FORMAT_VERSION,
+        'updated': datetime.now().strftime('%Y-%m-%d'),
+        'retailers': retailers,
+        'prefixes': prefixes,
+        'row': ROW_FIELDS,
+        'source': SOURCE_FIELDS,
+        'chunks': chunks,
+    }
+    _write(out_dir, MANIFEST, _minified(manifest))
+
+    # Chunks from earlier runs that the manifest no longer names
+    keep = {MANIFEST} | {c['file'] for c in chunks.values()}
+    for path in glob.glob(os.path.join(out_dir, '*.json*')):
+        if os.path.basename(path).split('.json')[0] + '.json' not in keep:
+            os.remove(path)
+
+    total = sum(c['bytes'] for c in chunks.values())
+    compressed = ' (+ .gz' + (', .br)' if brotli is not None else ')')
+    print(f"Saved {len(final_prices)} prices as {len(chunks)} compact chunk(s), {total} bytes{compressed}, "
+          f"to {out_dir}")
+    return manifest
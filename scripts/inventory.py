@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Inventory Loader
+================
+The cigars to price: unique (brand, name, box size) rows of the
+"Cigar Inventory" sheet, as
+
+    {"brand": ..., "name": ..., "box_size": 25, "key": "brand|name|25"}
+
+From Google Sheets (GOOGLE_SHEETS_CREDENTIALS):
+- the sheet's Drive version is checked first; if it matches the cached
+  copy (.inventory_cache.json) nothing is downloaded
+- otherwise the first HEADER_ROWS rows are read to find the Brand, Name
+  and box-size columns, and only those three columns are downloaded
+- with no credentials, or if the API fails, the cached copy is used
+
+From a local file (SCRAPE_INVENTORY=path):
+- .json: a list of cigar objects (brand, name, box_size) - e.g. the one a
+  HAR snapshot or the benchmark fixtures carry
+- .csv: a sheet export with Brand, Name and box-size columns
+
+The local path needs no Google libraries and no network.
+"""
+
+import os
+import re
+import csv
+import json
+
+
+SHEET_ID = "10A_FMj8eotx-xlzAlCNFxjOr3xEOuO4p5GxAZjHC86A"
+SHEET_NAME = 'Cigar Inventory'
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly',
+          'https://www.googleapis.com/auth/drive.metadata.readonly']
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SCRIPT_DIR, '.inventory_cache.json')
+
+# Local inventory file (.json or .csv) used instead of the sheet
+INVENTORY_FILE = os.environ.get('SCRAPE_INVENTORY', '')
+
+# Rows searched for the header before falling back to reading the whole sheet
+HEADER_ROWS = 20
+FULL_RANGE = 'A:S'
+
+# Plausible box sizes - anything else is a typo or a single
+MIN_BOX, MAX_BOX = 3, 50
+
+
+def find_columns(rows):
+    """(header_row, brand_col, name_col, box_col) of the header among rows, or None."""
+    for i, row in enumerate(rows):
+        cells = [str(c).strip() for c in row]
+        if 'Brand' not in cells or 'Name' not in cells:
+            continue
+        box_idx = next((j for j, c in enumerate(cells)
+                        if ('/' in c and 'Number' in c and 'Box' in c) or c.lower() == 'box_size'), None)
+        if box_idx is not None:
+            return i, cells.index('Brand'), cells.index('Name'), box_idx
+    return None
+
+
+def parse_cigars(rows):
+    """Unique cigars from (brand, name, box) rows."""
+    cigars = []
+    seen = set()
+    for row in rows:
+        brand, name, box_raw = (str(c).strip() for c in (list(row) + ['', '', ''])[:3])
+        if not (brand and name and box_raw):
+            continue
+        m = re.search(r'\d+', box_raw)
+        if not m:
+            continue
+        box = int(m.group())
+        if not MIN_BOX <= box <= MAX_BOX:
+            continue
+        key = f"{brand}|{name}|{box}"
+        if key not in seen:
+            seen.add(key)
+            cigars.append({"brand": brand, "name": name, "box_size": box, "key": key})
+    return cigars
+
+
+def pick_columns(rows, columns):
+    """(brand, name, box) of each row below the header found by find_columns()."""
+    header, brand_idx, name_idx, box_idx = columns
+    return [tuple(row[j] if j < len(row) else '' for j in (brand_idx, name_idx, box_idx))
+            for row in rows[header + 1:]]
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+
+# -- local file ----------------------------------------------------------------
+
+def load_file(path):
+    """Cigars from a local .json or .csv inventory file ([] if unreadable)."""
+    print(f"Loading inventory from {path}...")
+    try:
+        if path.lower().endswith('.json'):
+            with open(path) as f:
+                data = json.load(f)
+            rows = [(c.get('brand', ''), c.get('name', ''), c.get('box_size', '')) for c in data]
+        else:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                table = list(csv.reader(f))
+            columns = find_columns(table)
+            if columns is None:
+                print("  ERROR: Could not find required columns")
+                return []
+            rows = pick_columns(table, columns)
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"  ERROR: could not read {path} ({e})")
+        return []
+
+    cigars = parse_cigars(rows)
+    print(f"  Found {len(cigars)} unique cigars")
+    return cigars
+
+
+# -- Google Sheets -------------------------------------------------------------
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cache if cache.get('sheet') == SHEET_ID else None
+
+
+def _save_cache(version, cigars):
+    try:
+        with open(CACHE_PATH, 'w') as f:
+            json.dump({'sheet': SHEET_ID, 'version': version, 'cigars': cigars}, f)
+    except OSError as e:
+        print(f"  Could not cache inventory: {e}")
+
+
+def _cached(cache, reason):
+    if not cache:
+        return []
+    print(f"  {reason} - using cached inventory (version {cache.get('version')}, {len(cache['cigars'])} cigars)")
+    return cache['cigars']
+
+
+def _sheet_version(credentials):
+    """The sheet's Drive version (changes on every edit), or None if Drive can't be read."""
+    from googleapiclient.discovery import build
+    try:
+        drive = build('drive', 'v3', credentials=credentials, cache_discovery=False)
+        meta = drive.files().get(fileId=SHEET_ID, fields='version,modifiedTime').execute()
+        return meta.get('version') or meta.get('modifiedTime')
+    except Exception as e:
+        print(f"  Sheet version unavailable ({e}) - downloading")
+        return None
+
+
+def _download(credentials):
+    """Cigars read from the sheet's Brand, Name and box-size columns only."""
+    from googleapiclient.discovery import build
+    values = build('sheets', 'v4', credentials=credentials, cache_discovery=False).spreadsheets().values()
+
+    head = values.get(spreadsheetId=SHEET_ID, range=f"'{SHEET_NAME}'!1:{HEADER_ROWS}").execute()
+    columns = find_columns(head.get('values', []))
+    if columns is None:
+        # Header further down than expected - read the sheet whole
+        rows = values.get(spreadsheetId=SHEET_ID, range=f"'{SHEET_NAME}'!{FULL_RANGE}").execute().get('values', [])
+        print(f"  Loaded {len(rows)} rows from API")
+        columns = find_columns(rows)
+        if columns is None:
+            print("  ERROR: Could not find required columns")
+            return None
+        return parse_cigars(pick_columns(rows, columns))
+
+    header, brand_idx, name_idx, box_idx = columns
+    print(f"  Found columns: Brand={brand_idx}, Name={name_idx}, Box={box_idx}")
+    ranges = [f"'{SHEET_NAME}'!{_column_letter(j)}{header + 2}:{_column_letter(j)}"
+              for j in (brand_idx, name_idx, box_idx)]
+    result = values.batchGet(spreadsheetId=SHEET_ID, ranges=ranges, majorDimension='COLUMNS').execute()
+    cols = [(r.get('values') or [[]])[0] for r in result.get('valueRanges', [])]
+    cols += [[]] * (3 - len(cols))
+    length = max(len(c) for c in cols)
+    print(f"  Loaded {length} rows x 3 columns from API")
+    return parse_cigars(tuple(c[i] if i < len(c) else '' for c in cols) for i in range(length))
+
+
+def load_sheet():
+    """Cigars from the Google Sheet, skipping the download if it hasn't changed since the cached copy."""
+    print("Loading inventory via Google Sheets API...")
+    cache = _load_cache()
+
+    creds_json = os.environ.get('GOOGLE_SHEETS_CREDENTIALS')
+    if not creds_json:
+        print("  ERROR: No GOOGLE_SHEETS_CREDENTIALS environment variable")
+        return _cached(cache, "No credentials")
+
+    try:
+        from google.oauth2 import service_account
+        credentials = service_account.Credentials.from_service_account_info(json.loads(creds_json), scopes=SCOPES)
+
+        version = _sheet_version(credentials)
+        if version is not None and cache and cache.get('version') == version:
+            print(f"  Sheet unchanged (version {version}) - using cached inventory")
+            print(f"  Found {len(cache['cigars'])} unique cigars")
+            return cache['cigars']
+
+        cigars = _download(credentials)
+    except Exception as e:
+        print(f"  API Error: {e}")
+        return _cached(cache, "Sheet unavailable")
+
+    if not cigars:
+        return _cached(cache, "Sheet returned no cigars")
+    # Kept even without a version, as the fallback for runs that can't reach the sheet
+    _save_cache(version, cigars)
+    print(f"  Found {len(cigars)} unique cigars")
+    return cigars
+
+
+def load_inventory():
+    """Cigars from SCRAPE_INVENTORY if set, otherwise from the Google Sheet."""
+    if INVENTORY_FILE:
+        return load_file(INVENTORY_FILE)
+    return load_sheet()
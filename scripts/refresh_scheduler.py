@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Refresh Scheduler
+=================
+Volatility-aware scheduling of (cigar, retailer) price checks.
+
+Most box prices don't change for months, so re-scraping every cigar from
+every retailer on every run wastes navigations. The scheduler keeps a
+small state file (refresh_schedule.json) with, for each pair:
+
+- the last result we recorded (price, url, stock, product name) or None
+- when it was last checked and when its price last changed
+- how many checks and changes we've seen
+- its current refresh interval in days
+
+After each check the interval adapts: an unchanged price stretches it
+(x GROWTH, up to MAX_INTERVAL_DAYS), a changed price shrinks it
+(x SHRINK, down to MIN_INTERVAL_DAYS). Pairs that aren't due reuse their
+last recorded result so aggregation still sees them.
+"""
+
+import os
+import json
+from datetime import datetime, timedelta
+
+from scrapers import har
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEDULE_PATH = os.path.join(SCRIPT_DIR, 'refresh_schedule.json')
+
+# Interval bounds and adaptation factors
+MIN_INTERVAL_DAYS = 0
+MAX_INTERVAL_DAYS = 56
+INITIAL_INTERVAL_DAYS = 7
+GROWTH = 1.5
+SHRINK = 0.5
+
+# Runs are weekly - treat "due within a day" as due so a pair never slips a week
+DUE_SLACK = timedelta(days=1)
+
+# Set SCRAPE_FULL_REFRESH=1 to ignore the schedule and check every pair
+# (always the case when recording or replaying a HAR snapshot)
+FULL_REFRESH = os.environ.get('SCRAPE_FULL_REFRESH', '0') == '1' or har.RECORD or har.REPLAY
+
+
+def pair_key(cigar_key, retailer):
+    """State key for a (cigar, retailer) pair."""
+    return f"{cigar_key}@{retailer}"
+
+
+def prices_differ(old, new):
+    """True if two recorded results represent a price (or availability) change."""
+    if old is None or new is None:
+        return (old is None) != (new is None)
+    if abs(old.get('price', 0) - new.get('price', 0)) >= 0.01:
+        return True
+    return old.get('in_stock', True) != new.get('in_stock', True)
+
+
+class RefreshScheduler:
+    """Learns per-pair change rates and decides which pairs are due."""
+
+    def __init__(self, path=SCHEDULE_PATH, now=None):
+        self.path = path
+        self.now = now or datetime.now()
+        self.state = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+
+    def is_due(self, cigar_key, retailer):
+        """True if this pair should be scraped on this run."""
+        if FULL_REFRESH:
+            return True
+
+        entry = self.state.get(pair_key(cigar_key, retailer))
+        if not entry or not entry.get('last_checked'):
+            return True
+
+        last_checked = datetime.fromisoformat(entry['last_checked'])
+        next_due = last_checked + timedelta(days=entry.get('interval_days', INITIAL_INTERVAL_DAYS))
+        return self.now + DUE_SLACK >= next_due
+
+    def due_cigars(self, cigars, retailer):
+        """Split cigars into (due, skipped) for a retailer."""
+        due, skipped = [], []
+        for cigar in cigars:
+            (due if self.is_due(cigar['key'], retailer) else skipped).append(cigar)
+        return due, skipped
+
+    def last_result(self, cigar_key, retailer):
+        """Last recorded result for a pair (None if never found)."""
+        entry = self.state.get(pair_key(cigar_key, retailer))
+        return entry.get('last_result') if entry else None
+
+    def record(self, cigar_key, retailer, result):
+        """Record a fresh check and adapt the pair's interval."""
+        key = pair_key(cigar_key, retailer)
+        now_iso = self.now.isoformat(timespec='seconds')
+        entry = self.state.get(key)
+
+        if entry is None:
+            self.state[key] = {
+                'last_result': result,
+                'last_checked': now_iso,
+                'last_changed': now_iso,
+                'checks': 1,
+                'changes': 0,
+                'interval_days': INITIAL_INTERVAL_DAYS,
+            }
+            return
+
+        interval = entry.get('interval_days', INITIAL_INTERVAL_DAYS)
+        if prices_differ(entry.get('last_result'), result):
+            entry['changes'] = entry.get('changes', 0) + 1
+            entry['last_changed'] = now_iso
+            interval = max(MIN_INTERVAL_DAYS, interval * SHRINK)
+        else:
+            interval = min(MAX_INTERVAL_DAYS, max(interval, 1) * GROWTH)
+
+        entry['interval_days'] = round(interval, 2)
+        entry['last_result'] = result
+        entry['last_checked'] = now_iso
+        entry['checks'] = entry.get('checks', 0) + 1
+
+    def summary(self, cigars, retailers):
+        """Count of due vs skipped pairs across all retailers."""
+        due = skipped = 0
+        for retailer in retailers:
+            for cigar in cigars:
+                if self.is_due(cigar['key'], retailer):
+                    due += 1
+                else:
+                    skipped += 1
+        return due, skipped
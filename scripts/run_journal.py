@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Run Journal
+===========
+Append-only record of a scrape run, so a run that dies part way (crash,
+CI timeout, killed runner) doesn't lose the lookups it already finished.
+
+Every (cigar, retailer) outcome is appended to scrape_journal.jsonl the
+moment it's known, one JSON object per line:
+
+    {"type": "run", "started": "...", "cigars": [...]}       first line, written by a fresh run
+    {"type": "pair", "cigar": "brand|name|box", "retailer": "...", "result": {...} or null, "at": "..."}
+
+Each line goes out as a single O_APPEND write, so retailer worker processes
+share the file without a lock. Lookups that raised aren't journaled and are
+retried on resume.
+
+    python scrape_orchestrator.py --resume         # scrape only pairs the journal doesn't have
+    python scrape_orchestrator.py --from-journal   # aggregate and save from the journal, no scraping
+
+Both read the inventory from the run line, so neither needs Google Sheets.
+"""
+
+import os
+import json
+from datetime import datetime
+
+from scrapers import har
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# A replay journals next to its other outputs, leaving a real run's journal alone
+JOURNAL_PATH = os.environ.get('SCRAPE_JOURNAL') or (
+    os.path.join(har.HAR_DIR, har.REPLAY_OUTPUT_DIR, 'scrape_journal.jsonl') if har.REPLAY
+    else os.path.join(SCRIPT_DIR, 'scrape_journal.jsonl')
+)
+
+
+class RunJournal:
+    """One run's JSONL journal."""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+
+    def _write(self, entry, mode):
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | mode, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def start(self, cigars):
+        """Begin a fresh run - replaces any previous journal."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._write({'type': 'run', 'started': datetime.now().isoformat(timespec='seconds'), 'cigars': cigars},
+                    os.O_TRUNC)
+
+    def append(self, cigar_key, retailer, result):
+        """Record one pair's outcome (result is the stored source data, or None if not found)."""
+        self._write({'type': 'pair', 'cigar': cigar_key, 'retailer': retailer, 'result': result,
+                     'at': datetime.now().isoformat(timespec='seconds')}, os.O_APPEND)
+
+    def load(self):
+        """
+        (cigars, pairs) from the journal, where pairs is {(cigar_key, retailer): result}.
+
+        Returns ([], {}) if there is no journal. A line cut off by the crash
+        that interrupted the run is ignored.
+        """
+        cigars, pairs = [], {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('type') == 'run':
+                        cigars = entry.get('cigars') or []
+                    elif entry.get('type') == 'pair':
+                        pairs[(entry['cigar'], entry['retailer'])] = entry.get('result')
+        except OSError:
+            return [], {}
+        return cigars, pairs
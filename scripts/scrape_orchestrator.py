@@ -6,38 +6,47 @@ Coordinates individual retailer scrapers and aggregates results.
 
 Each retailer has its own dedicated scraper module optimized for that site's
 specific HTML structure and pricing format.
+
+The inventory comes from the Google Sheet (cached until the sheet changes)
+or from a local .json/.csv file named by SCRAPE_INVENTORY (see inventory.py).
+
+SCRAPE_COMPACT_OUTPUT=1 also writes the prices as compact, precompressed
+per-brand chunks for the app (see compact_output.py).
+
+SCRAPE_HAR=record saves the run's traffic as a HAR snapshot and
+SCRAPE_HAR=replay re-runs against it offline (see scrapers/har.py).
+
+Every (cigar, retailer) outcome is journaled as it's produced (see
+run_journal.py):
+
+    python scrape_orchestrator.py --resume         # finish an interrupted run
+    python scrape_orchestrator.py --from-journal   # aggregate from the journal only
 """
 
+import time
+
+# Startup is measured from here, before the project's own imports
+STARTED = time.time()
+
 import json
 import os
 import sys
+import asyncio
 import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
-# Ensure dependencies
-def install(pkg):
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
-
-try:
-    from google.oauth2 import service_account
-    from googleapiclient.discovery import build
-    GOOGLE_API_AVAILABLE = True
-except ImportError:
-    try:
-        install("google-auth")
-        install("google-api-python-client")
-        from google.oauth2 import service_account
-        from googleapiclient.discovery import build
-        GOOGLE_API_AVAILABLE = True
-    except:
-        GOOGLE_API_AVAILABLE = False
-        print("Warning: Google API libraries not available")
-
-import re
+from refresh_scheduler import RefreshScheduler
+from search_planner import plan_searches, describe_plan
+from circuit_breaker import CircuitBreaker, run_preflight, run_preflight_async
+from run_journal import RunJournal
+from inventory import load_inventory
+import compact_output
+from scrapers import browser, resource_policy, rate_scheduler, metrics, har, lookup_status
+from scrapers.matching import match_signature
 
 # Configuration
-SHEET_ID = "10A_FMj8eotx-xlzAlCNFxjOr3xEOuO4p5GxAZjHC86A"
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # List of retailer scrapers to run (in order)
@@ -53,92 +62,17 @@ RETAILER_SCRAPERS = [
     ('Sautter', 'scrapers/scrape_sautter.py'),
 ]
 
+# Run each retailer in its own worker process (set SCRAPE_PARALLEL=0 to run
+# them one after another in this process, e.g. when debugging a scraper)
+PARALLEL_RETAILERS = os.environ.get('SCRAPE_PARALLEL', '1') != '0'
 
-def load_inventory():
-    """Load inventory from Google Sheets API."""
-    print("Loading inventory via Google Sheets API...")
-    
-    creds_json = os.environ.get('GOOGLE_SHEETS_CREDENTIALS')
-    if not creds_json:
-        print("  ERROR: No GOOGLE_SHEETS_CREDENTIALS environment variable")
-        return []
-    
-    try:
-        creds_data = json.loads(creds_json)
-        credentials = service_account.Credentials.from_service_account_info(
-            creds_data,
-            scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
-        )
-        
-        service = build('sheets', 'v4', credentials=credentials)
-        
-        result = service.spreadsheets().values().get(
-            spreadsheetId=SHEET_ID,
-            range='Cigar Inventory!A:S'
-        ).execute()
-        
-        rows = result.get('values', [])
-        print(f"  Loaded {len(rows)} rows from API")
-        
-        if not rows:
-            return []
-        
-        # Find header row and column indices
-        cigars = []
-        seen = set()
-        header_idx = None
-        brand_idx = name_idx = box_idx = None
-        
-        for i, row in enumerate(rows):
-            row_str = ','.join(str(c) for c in row)
-            if 'Brand' in row_str and 'Name' in row_str:
-                header_idx = i
-                for j, col in enumerate(row):
-                    col_clean = str(col).strip()
-                    if col_clean == 'Brand':
-                        brand_idx = j
-                    elif col_clean == 'Name':
-                        name_idx = j
-                    elif '/' in col_clean and 'Number' in col_clean and 'Box' in col_clean:
-                        box_idx = j
-                
-                if all(x is not None for x in [brand_idx, name_idx, box_idx]):
-                    print(f"  Found columns: Brand={brand_idx}, Name={name_idx}, Box={box_idx}")
-                    break
-        
-        if header_idx is None or box_idx is None:
-            print("  ERROR: Could not find required columns")
-            return []
-        
-        # Parse data rows
-        for row in rows[header_idx + 1:]:
-            if len(row) > max(brand_idx, name_idx, box_idx):
-                brand = str(row[brand_idx]).strip() if brand_idx < len(row) else ''
-                name = str(row[name_idx]).strip() if name_idx < len(row) else ''
-                box_raw = str(row[box_idx]).strip() if box_idx < len(row) else ''
-                
-                if brand and name and box_raw:
-                    try:
-                        box = int(re.search(r'\d+', box_raw).group())
-                        if 3 <= box <= 50:
-                            key = f"{brand}|{name}|{box}"
-                            if key not in seen:
-                                seen.add(key)
-                                cigars.append({
-                                    "brand": brand,
-                                    "name": name,
-                                    "box_size": box,
-                                    "key": key
-                                })
-                    except:
-                        pass
-        
-        print(f"  Found {len(cigars)} unique cigars")
-        return cigars
-        
-    except Exception as e:
-        print(f"  API Error: {e}")
-        return []
+# Use the asyncio page-pool engine for scrapers that provide scrape_async
+# (set SCRAPE_ASYNC=0 to drive the single sync page instead)
+ASYNC_ENGINE = os.environ.get('SCRAPE_ASYNC', '1') != '0'
+
+# Plan search queries across the whole inventory before scraping, so each
+# unique query runs once per retailer (SCRAPE_SEARCH_PLAN=0 to disable)
+SEARCH_PLAN = os.environ.get('SCRAPE_SEARCH_PLAN', '1') != '0'
 
 
 def load_scraper_module(scraper_file):
@@ -215,67 +149,352 @@ def calculate_average(prices_with_sources):
     return round(avg, 2), prices_with_sources
 
 
-def run_scrapers(cigars):
-    """Run all retailer scrapers and collect results."""
-    print(f"\nScraping {len(cigars)} cigars from available retailers...")
-    print("=" * 60)
+def scrape_retailer(retailer_name, scraper_file, cigars):
+    """
+    Run one retailer scraper over every cigar.
     
-    # Results structure: {cigar_key: {retailer: price}}
-    all_results = {c['key']: {} for c in cigars}
-    retailer_stats = {name: {'found': 0, 'total': len(cigars)} for name, _ in RETAILER_SCRAPERS}
+    Returns (results, stats) where results is {cigar_key: source_data},
+    stats['checked'] lists the keys of every cigar actually scraped,
+    stats['failed_keys'] those whose lookup raised or found nothing while a
+    fetch failed (see lookup_status.py) and stats['skipped_keys'] those
+    skipped by the circuit breaker.
+    """
+    results = {}
+    stats = {'found': 0, 'total': len(cigars), 'checked': [], 'failed_keys': []}
     
-    # Load and run each scraper
-    for retailer_name, scraper_file in RETAILER_SCRAPERS:
-        print(f"\n[{retailer_name}]")
+    if not cigars:
+        print("  Nothing due for refresh")
+        return results, stats
+    
+    module = load_scraper_module(scraper_file)
+    if module is None:
+        print(f"  Scraper not found: {scraper_file}")
+        return results, stats
+    
+    if not hasattr(module, 'scrape'):
+        print(f"  Scraper missing 'scrape' function: {scraper_file}")
+        return results, stats
+    
+    # Count this retailer's requests and timings separately from earlier ones in this process
+    rate_scheduler.reset_counters()
+    metrics.reset()
+    
+    # Build each cigar's match signature once, before any matching
+    rules = getattr(module, 'MATCH_RULES', None)
+    if rules is not None:
+        for cigar in cigars:
+            match_signature(cigar['brand'], cigar['name'], rules)
+    
+    # Catalogue modes answer lookups without keyword searches (CGars' crawl
+    # mode still searches for cigars its brand listings don't surface)
+    searches = not getattr(module, 'CATALOGUE_MODE', False)
+    if SEARCH_PLAN and searches and hasattr(module, 'set_search_plan'):
+        plan = plan_searches(cigars, module.get_search_terms)
+        module.set_search_plan(plan['aliases'])
+        stats['search_plan'] = {k: plan[k] for k in ('terms', 'distinct', 'unique', 'saved')}
+        print(f"  {describe_plan(plan, len(cigars))}")
+    
+    # Every outcome goes to the run journal as soon as it's known
+    journal = RunJournal()
+    
+    def record(cigar, result):
+        stats['checked'].append(cigar['key'])
+        if not result or not result.get('price'):
+            journal.append(cigar['key'], retailer_name, None)
+            return
         
-        module = load_scraper_module(scraper_file)
-        if module is None:
-            print(f"  Scraper not found: {scraper_file}")
-            continue
+        price = result['price']
+        extracted_box = result.get('box_size')
         
-        if not hasattr(module, 'scrape'):
-            print(f"  Scraper missing 'scrape' function: {scraper_file}")
-            continue
+        # STRICT BOX SIZE VALIDATION
+        if extracted_box is not None and extracted_box != cigar['box_size']:
+            print(f"  ✗ {cigar['name']}: Box mismatch (wanted {cigar['box_size']}, got {extracted_box})")
+            journal.append(cigar['key'], retailer_name, None)
+            return
         
-        try:
+        # Store price along with metadata
+        results[cigar['key']] = {
+            'price': price,
+            'url': result.get('url', ''),
+            'in_stock': result.get('in_stock', True),
+            'product_name': result.get('product_name', ''),
+            'scraped_at': datetime.now().isoformat(timespec='seconds')
+        }
+        journal.append(cigar['key'], retailer_name, results[cigar['key']])
+        stats['found'] += 1
+        stock_status = "✓" if result.get('in_stock', True) else "⚠ OUT OF STOCK"
+        print(f"  {stock_status} {cigar['brand']} {cigar['name']} (Box {cigar['box_size']}): £{price:.2f}")
+    
+    # Preflight canary and consecutive-failure breaker for this retailer
+    breaker = CircuitBreaker()
+    progress = metrics.Progress(len(cigars))
+    
+    def lookup_started():
+        if 'first_lookup_s' not in stats:
+            stats['first_lookup_s'] = metrics.since_run_start()
+            if stats['first_lookup_s'] is not None:
+                print(f"  First lookup {stats['first_lookup_s']:.1f}s after start")
+    
+    def finished(cigar, result):
+        breaker.success()
+        record(cigar, result)
+        progress.step()
+    
+    def failed(cigar, error):
+        # Raised, or found nothing while a fetch failed - not a check: not
+        # journaled (a resumed run retries it) and not recorded by the
+        # scheduler, so it keeps its last price and stays due
+        breaker.failure(error)
+        stats['failed_keys'].append(cigar['key'])
+        progress.step()
+    
+    try:
+        if ASYNC_ENGINE and hasattr(module, 'scrape_async') and hasattr(module, 'create_engine'):
+            # Several cigars in flight at once through the module's page pool
+            from scrapers.async_engine import run_all
+            
+            async def scrape_async(engine, brand, name, box_size):
+                lookup_started()
+                with metrics.timer('lookup'), lookup_status.track() as fetch_failures:
+                    result = await module.scrape_async(engine, brand, name, box_size)
+                    return lookup_status.check(result, fetch_failures)
+            
+            async def run_async():
+                engine = module.create_engine()
+                await run_preflight_async(module, engine, breaker)
+                await run_all(engine, scrape_async, cigars,
+                              on_result=finished, on_error=failed, allow=breaker.allow)
+            
+            asyncio.run(run_async())
+        else:
             # Initialize the scraper if needed
             if hasattr(module, 'init'):
                 module.init()
             
+            run_preflight(module, breaker)
+            
             # Scrape each cigar
             for cigar in cigars:
-                result = module.scrape(cigar['brand'], cigar['name'], cigar['box_size'])
-                
-                if result and result.get('price'):
-                    price = result['price']
-                    extracted_box = result.get('box_size')
-                    
-                    # STRICT BOX SIZE VALIDATION
-                    if extracted_box is not None and extracted_box != cigar['box_size']:
-                        print(f"  ✗ {cigar['name']}: Box mismatch (wanted {cigar['box_size']}, got {extracted_box})")
-                        continue
-                    
-                    # Store price along with metadata
-                    all_results[cigar['key']][retailer_name] = {
-                        'price': price,
-                        'url': result.get('url', ''),
-                        'in_stock': result.get('in_stock', True),
-                        'product_name': result.get('product_name', '')
-                    }
-                    retailer_stats[retailer_name]['found'] += 1
-                    stock_status = "✓" if result.get('in_stock', True) else "⚠ OUT OF STOCK"
-                    print(f"  {stock_status} {cigar['brand']} {cigar['name']} (Box {cigar['box_size']}): £{price:.2f}")
+                if not breaker.allow(cigar):
+                    continue
+                lookup_started()
+                try:
+                    with metrics.timer('lookup'), lookup_status.track() as fetch_failures:
+                        result = module.scrape(cigar['brand'], cigar['name'], cigar['box_size'])
+                        lookup_status.check(result, fetch_failures)
+                except Exception as e:
+                    print(f"  Error scraping {cigar['brand']} {cigar['name']}: {e}")
+                    failed(cigar, e)
+                    continue
+                finished(cigar, result)
             
             # Cleanup scraper
             if hasattr(module, 'cleanup'):
                 module.cleanup()
-                
-        except Exception as e:
-            print(f"  Error running scraper: {e}")
+            
+    except Exception as e:
+        print(f"  Error running scraper: {e}")
+    
+    # Persistent cache hit/miss counters for this retailer
+    cache = getattr(module, '_cache', None)
+    if hasattr(cache, 'stats'):
+        stats['cache'] = cache.stats()
+    
+    # Requests, blocked requests and bytes per page type under the module's resource policy
+    policy = getattr(module, 'RESOURCE_POLICY', None)
+    if policy:
+        stats['resources'] = resource_policy.stats(policy['retailer'])
+    
+    # Adapted request rate, waits and throttling per host
+    stats['hosts'] = rate_scheduler.stats()
+    
+    # Per-phase latency histograms and overall throughput
+    stats['metrics'] = metrics.snapshot()
+    stats['progress'] = progress.summary()
+    
+    # Why this retailer's run was cut short, if it was
+    stats['skipped_keys'] = breaker.skipped
+    if breaker.summary():
+        stats['breaker'] = breaker.summary()
     
+    return results, stats
+
+
+class _PrefixedStream:
+    """Line-buffered stream wrapper that tags every line with a prefix."""
+    
+    def __init__(self, stream, prefix):
+        self._stream = stream
+        self._prefix = prefix
+        self._buffer = ''
+    
+    def write(self, text):
+        self._buffer += text
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            self._stream.write(f"{self._prefix}{line}\n")
+        self._stream.flush()
+        return len(text)
+    
+    def flush(self):
+        self._stream.flush()
+
+
+def _retailer_worker(retailer_name, scraper_file, cigars):
+    """Worker process entry point - runs a single retailer in isolation."""
+    sys.stdout = _PrefixedStream(sys.stdout, f"[{retailer_name}] ")
+    return scrape_retailer(retailer_name, scraper_file, cigars)
+
+
+def run_scrapers(cigars, journaled=None):
+    """
+    Run all retailer scrapers and collect results.
+    
+    journaled is {(cigar_key, retailer): result} from an interrupted run's
+    journal (--resume); those pairs aren't scraped again.
+    """
+    journaled = journaled or {}
+    print(f"\nScraping {len(cigars)} cigars from available retailers...")
+    print("=" * 60)
+    
+    # Results structure: {cigar_key: {retailer: price}}
+    all_results = {c['key']: {} for c in cigars}
+    retailer_stats = {name: {'found': 0, 'total': len(cigars)} for name, _ in RETAILER_SCRAPERS}
+    
+    # Only spend navigations on (cigar, retailer) pairs that are due a refresh
+    scheduler = RefreshScheduler()
+    work = []
+    skipped_by_retailer = {}
+    resumed_by_retailer = {}
+    for retailer_name, scraper_file in RETAILER_SCRAPERS:
+        due, skipped = scheduler.due_cigars(cigars, retailer_name)
+        # Journaled outcomes are newer than anything the schedule holds
+        resumed = {c['key']: journaled[(c['key'], retailer_name)]
+                   for c in cigars if (c['key'], retailer_name) in journaled}
+        work.append((retailer_name, scraper_file, [c for c in due if c['key'] not in resumed]))
+        skipped_by_retailer[retailer_name] = [c for c in skipped if c['key'] not in resumed]
+        resumed_by_retailer[retailer_name] = resumed
+    
+    due_count = sum(len(due) for _, _, due in work)
+    skipped_count = sum(len(skipped) for skipped in skipped_by_retailer.values())
+    print(f"Refresh schedule: {due_count} pairs due, {skipped_count} reused from previous runs")
+    if journaled:
+        resumed_count = sum(len(resumed) for resumed in resumed_by_retailer.values())
+        print(f"Resuming: {resumed_count} pairs already in the journal")
+    
+    def merge(retailer_name, results, stats):
+        for key, data in results.items():
+            all_results[key][retailer_name] = data
+        
+        # Learn from this run's checks
+        for key in stats.pop('checked', []):
+            scheduler.record(key, retailer_name, results.get(key))
+        
+        # Pairs not due this run (or skipped by the circuit breaker, or whose
+        # lookup failed) keep their last recorded price
+        skipped_keys = set(stats.pop('skipped_keys', [])) | set(stats.pop('failed_keys', []))
+        reused = 0
+        for cigar in skipped_by_retailer[retailer_name] + [c for c in cigars if c['key'] in skipped_keys]:
+            previous = scheduler.last_result(cigar['key'], retailer_name)
+            if previous:
+                all_results[cigar['key']][retailer_name] = previous
+                reused += 1
+        
+        # Pairs the interrupted run already finished
+        resumed = resumed_by_retailer[retailer_name]
+        for key, data in resumed.items():
+            scheduler.record(key, retailer_name, data)
+            if data:
+                all_results[key][retailer_name] = data
+                stats['found'] += 1
+        
+        stats['found'] += reused
+        stats['reused'] = reused
+        if resumed:
+            stats['resumed'] = len(resumed)
+        stats['total'] = len(cigars)
+        retailer_stats[retailer_name] = stats
+    
+    # Chromium (launched by main() while the inventory loaded) is shared by
+    # the whole run - every retailer, in this process or a worker, connects
+    # to it and opens its own isolated context
+    try:
+        browser.start()
+    except Exception as e:
+        print(f"  Shared browser unavailable, scrapers will launch their own: {e}")
+    
+    try:
+        _dispatch_retailers(work, merge)
+    finally:
+        browser.stop()
+    
+    # A replay re-checks a frozen snapshot - it mustn't move the real schedule
+    if not har.REPLAY:
+        scheduler.save()
+    return all_results, retailer_stats
+
+
+def results_from_journal(cigars, journaled):
+    """
+    (all_results, retailer_stats) built from journaled outcomes alone, as
+    run_scrapers() would have returned them - pairs the journal doesn't
+    have keep their last recorded price.
+    """
+    scheduler = RefreshScheduler()
+    all_results = {c['key']: {} for c in cigars}
+    retailer_stats = {}
+    for retailer_name, _ in RETAILER_SCRAPERS:
+        stats = {'found': 0, 'total': len(cigars), 'reused': 0, 'resumed': 0}
+        for cigar in cigars:
+            pair = (cigar['key'], retailer_name)
+            if pair in journaled:
+                data = journaled[pair]
+                stats['resumed'] += 1
+            else:
+                data = scheduler.last_result(cigar['key'], retailer_name)
+                stats['reused'] += bool(data)
+            if data:
+                all_results[cigar['key']][retailer_name] = data
+                stats['found'] += 1
+        retailer_stats[retailer_name] = stats
     return all_results, retailer_stats
 
 
+def _dispatch_retailers(work, merge):
+    """
+    Run every retailer (in parallel worker processes if enabled) and merge results.
+    
+    work is a list of (retailer_name, scraper_file, cigars_to_scrape).
+    """
+    if PARALLEL_RETAILERS and len(work) > 1:
+        # One worker process per retailer - each site is a different host, so
+        # total wall time is that of the slowest retailer rather than the sum
+        print(f"Running {len(work)} retailers in parallel worker processes")
+        mp_context = multiprocessing.get_context('spawn')
+        
+        with ProcessPoolExecutor(max_workers=len(work), mp_context=mp_context) as pool:
+            futures = {
+                pool.submit(_retailer_worker, retailer_name, scraper_file, cigars): retailer_name
+                for retailer_name, scraper_file, cigars in work
+            }
+            
+            for future in as_completed(futures):
+                retailer_name = futures[future]
+                try:
+                    results, stats = future.result()
+                except Exception as e:
+                    print(f"\n[{retailer_name}]\n  Worker failed: {e}")
+                    continue
+                
+                merge(retailer_name, results, stats)
+                print(f"\n[{retailer_name}] finished: {stats['found']}/{stats['total']} found")
+    else:
+        for retailer_name, scraper_file, cigars in work:
+            print(f"\n[{retailer_name}]")
+            results, stats = scrape_retailer(retailer_name, scraper_file, cigars)
+            merge(retailer_name, results, stats)
+
+
 def aggregate_results(cigars, all_results):
     """Aggregate results from all retailers with outlier filtering."""
     print("\n" + "=" * 60)
@@ -316,7 +535,8 @@ def aggregate_results(cigars, all_results):
                     'price': data['price'],
                     'url': data.get('url', ''),
                     'in_stock': data.get('in_stock', True),
-                    'product_name': data.get('product_name', '')
+                    'product_name': data.get('product_name', ''),
+                    'scraped_at': data.get('scraped_at')
                 }
             
             final_prices[key] = {
@@ -348,17 +568,54 @@ def print_stats(retailer_stats):
         pct = (found / total * 100) if total > 0 else 0
         total_found += found
         total_possible += total
-        print(f"  {name:20} {found:3}/{total:3} = {pct:5.1f}%")
+        
+        cache_info = ''
+        if stats.get('cache'):
+            cache = stats['cache']
+            cache_info = f"  (cache {cache['hits']} hits / {cache['misses']} misses, {cache['hit_rate'] * 100:.0f}%)"
+        print(f"  {name:20} {found:3}/{total:3} = {pct:5.1f}%{cache_info}")
+        
+        if stats.get('resumed'):
+            print(f"  {'':20} {stats['resumed']} pairs from the run journal")
+        
+        if stats.get('breaker'):
+            print(f"  {'':20} circuit open: {stats['breaker']['reason']} "
+                  f"({stats['breaker']['skipped']} cigars skipped)")
+        
+        resources = stats.get('resources')
+        if resources and resources['requests']:
+            load = f", avg load {resources['avg_load_ms']:.0f} ms" if resources['avg_load_ms'] else ''
+            print(f"  {'':20} {resources['requests']} requests ({resources['blocked']} blocked), "
+                  f"{resources['bytes'] / 1e6:.1f} MB{load}")
+        
+        timings = stats.get('metrics', {})
+        if timings:
+            parts = [f"{phase} {h['count']}x{h['avg_ms']:.0f}ms" for phase, h in timings.items() if phase != 'lookup']
+            progress = stats.get('progress', {})
+            print(f"  {'':20} {progress.get('cigars_per_min', 0):.1f} cigars/min; {', '.join(parts)}")
+        
+        for host, rate in stats.get('hosts', {}).items():
+            throttled = rate['throttled'] + rate['timeouts']
+            print(f"  {'':20} {host}: {rate['requests']} requests at {rate['rate']:.2f}/s, "
+                  f"waited {rate['waited']:.0f}s, {throttled} throttled")
     
     print("-" * 40)
     overall_pct = (total_found / total_possible * 100) if total_possible > 0 else 0
     print(f"  {'OVERALL':20} {total_found:3}/{total_possible:3} = {overall_pct:5.1f}%")
+    
+    plans = [stats['search_plan'] for stats in retailer_stats.values() if stats.get('search_plan')]
+    if plans:
+        distinct = sum(p.get('distinct', p['terms']) for p in plans)
+        unique = sum(p['unique'] for p in plans)
+        saved = sum(p['saved'] for p in plans)
+        print(f"  Search plan: {unique} unique queries for {distinct} distinct terms "
+              f"(up to {saved} navigations saved by merging reordered/recased queries)")
 
 
-def save_results(final_prices, cigars):
+def save_results(final_prices, cigars, directory='.'):
     """Save results to JSON and JS files."""
     # Save detailed JSON
-    with open('prices.json', 'w') as f:
+    with open(os.path.join(directory, 'prices.json'), 'w') as f:
         json.dump(final_prices, f, indent=2)
     
     # Save JS format for app
@@ -381,7 +638,7 @@ def save_results(final_prices, cigars):
             'updated': datetime.now().strftime('%Y-%m-%d')
         }
     
-    with open('uk_market_prices.js', 'w') as f:
+    with open(os.path.join(directory, 'uk_market_prices.js'), 'w') as f:
         f.write('// UK Market Prices - Auto-generated\n')
         f.write(f'// Updated: {datetime.now().strftime("%Y-%m-%d %H:%M")}\n')
         f.write(f'// Cigars with prices: {len(final_prices)}/{len(cigars)}\n\n')
@@ -389,24 +646,75 @@ def save_results(final_prices, cigars):
         f.write(json.dumps(js_data, indent=2))
         f.write(';\n')
     
-    print(f"\nSaved {len(final_prices)} prices to prices.json and uk_market_prices.js")
+    print(f"\nSaved {len(final_prices)} prices to {os.path.join(directory, 'prices.json')} and uk_market_prices.js")
+    
+    # Minified, interned, per-brand chunks with .gz/.br siblings for the app
+    if compact_output.COMPACT_OUTPUT:
+        compact_output.write(final_prices, directory)
+
+
+def print_startup(startup):
+    """Print where the time before the first lookup went."""
+    if startup['first_scrape_s'] is None:
+        return
+    browser_text = f", browser {startup['browser_launch_s']:.1f}s (overlapped)" if startup['browser_launch_s'] else ''
+    print(f"\nTime to first scrape: {startup['first_scrape_s']:.1f}s "
+          f"(imports {startup['imports_s']:.1f}s, inventory {startup['inventory_s']:.1f}s{browser_text})")
 
 
 def main():
+    started_main = time.time()
     print("=" * 60)
     print("UK CIGAR PRICE SCRAPER - ORCHESTRATOR")
     print("=" * 60)
     print(f"Date: {datetime.now()}")
     print()
     
-    # Load inventory
-    cigars = load_inventory()
+    metrics.mark_run_start(STARTED)
+    resume = '--resume' in sys.argv
+    from_journal = '--from-journal' in sys.argv
+    
+    # An interrupted run (or one being re-aggregated) brings its own inventory
+    journal = RunJournal()
+    cigars, journaled = [], {}
+    if resume or from_journal:
+        cigars, journaled = journal.load()
+        print(f"Run journal {journal.path}: {len(cigars)} cigars, {len(journaled)} pairs recorded")
+        if not cigars:
+            if from_journal:
+                print("No run journal to aggregate!")
+                return
+            print("Nothing to resume - starting a fresh run")
+            resume = False
+    
+    # Boot Chromium in the background while the inventory loads
+    if not from_journal:
+        browser.launch()
+    
+    inventory_started = time.perf_counter()
     if not cigars:
-        print("No cigars found in inventory!")
-        return
+        # Load inventory (a replay uses the one recorded with its snapshot)
+        if har.REPLAY:
+            cigars = har.load_inventory()
+        else:
+            cigars = load_inventory()
+        if not cigars:
+            print("No cigars found in inventory!")
+            browser.stop()
+            return
+        
+        if har.RECORD:
+            har.start_recording()
+            har.save_inventory(cigars)
+        
+        journal.start(cigars)
+    inventory_seconds = time.perf_counter() - inventory_started
     
-    # Run all scrapers
-    all_results, retailer_stats = run_scrapers(cigars)
+    if from_journal:
+        all_results, retailer_stats = results_from_journal(cigars, journaled)
+    else:
+        # Run all scrapers
+        all_results, retailer_stats = run_scrapers(cigars, journaled)
     
     # Aggregate results
     final_prices = aggregate_results(cigars, all_results)
@@ -414,8 +722,21 @@ def main():
     # Print statistics
     print_stats(retailer_stats)
     
-    # Save results
-    save_results(final_prices, cigars)
+    # Save results (under the snapshot when replaying, leaving the real outputs alone)
+    output_dir = har.output_dir()
+    save_results(final_prices, cigars, output_dir)
+    
+    # Timings, cache hit rates and throughput next to prices.json
+    if not from_journal:
+        first = [s['first_lookup_s'] for s in retailer_stats.values() if s.get('first_lookup_s') is not None]
+        startup = {
+            'imports_s': round(started_main - STARTED, 2),
+            'inventory_s': round(inventory_seconds, 2),
+            'browser_launch_s': round(browser.launch_seconds(), 2) if browser.launch_seconds() else None,
+            'first_scrape_s': min(first) if first else None,
+        }
+        print_startup(startup)
+        metrics.write_reports(retailer_stats, output_dir, startup)
     
     # Summary
     print("\n" + "=" * 60)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Async Scraping Engine
+=====================
+asyncio-based Playwright engine shared by the browser-driven scrapers.
+
+Each retailer gets one engine holding a bounded pool of pages in its own
+context on the shared browser (see browser.py), so several cigars can be
+in flight against the same site at once without exceeding the configured
+concurrency limit.
+
+Scraper modules expose async counterparts of their sync functions
+(search_products_async, get_product_*_async, scrape_async) that take the
+engine as their first argument.
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from scrapers import browser, har, resource_policy as resource_policy_module
+
+
+# Pages in flight per retailer (override with SCRAPE_CONCURRENCY)
+DEFAULT_CONCURRENCY = int(os.environ.get('SCRAPE_CONCURRENCY', '3'))
+
+# Cigar lookups run_all() keeps in flight per page in the pool
+LOOKUPS_PER_PAGE = 2
+
+
+class AsyncEngine:
+    """Bounded page pool for one retailer."""
+
+    def __init__(self, concurrency=None, context_options=None, init_script=None, resource_policy=None,
+                 lazy=False):
+        self.concurrency = max(1, concurrency or DEFAULT_CONCURRENCY)
+        self.context_options = context_options or {}
+        self.init_script = init_script
+        self.resource_policy = resource_policy
+        # Lazy engines only open the browser when a page is first borrowed
+        self.lazy = lazy
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages = None
+        self._inflight = {}
+        self._starting = None
+
+    async def start(self):
+        """Connect to the shared browser and open the page pool."""
+        if self._context:
+            return
+
+        # Pages borrowed concurrently by a lazy engine share one start
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if not self._context:
+                await self._open()
+
+    async def _open(self):
+        print(f"  Opening async context ({self.concurrency} pages)...")
+        self._playwright = await async_playwright().start()
+        self._browser = await browser.connect_async(self._playwright)
+        self._context = await self._browser.new_context(
+            **har.context_options(self.context_options, self.resource_policy, 'async'))
+
+        if self.init_script:
+            await self._context.add_init_script(self.init_script)
+        await resource_policy_module.install_async(self._context, self.resource_policy)
+        await har.install_async(self._context, self.resource_policy)
+
+        self._pages = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._pages.put_nowait(await self._context.new_page())
+        print("  Browser ready")
+
+    async def close(self):
+        """Close the page pool and disconnect from the browser."""
+        try:
+            if self._context:
+                await self._context.close()
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+        except:
+            pass
+        self._playwright = self._browser = self._context = self._pages = None
+        self._inflight = {}
+        self._starting = None
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool, waiting if all pages are busy."""
+        await self.start()
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)
+
+    async def cached(self, cache, key, factory):
+        """
+        Return cache[key], computing it with factory() on a miss.
+
+        Concurrent callers asking for the same key share one in-flight
+        fetch instead of each navigating to the same page. The factory is
+        responsible for storing its result in the cache; a failure it
+        remembers counts against every lookup that shared the fetch.
+        """
+        if key in cache:
+            return cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        result = await asyncio.shield(task)
+        if hasattr(cache, 'recall_failure'):
+            cache.recall_failure(key)
+        return result
+
+
+async def run_all(engine, scrape_async, cigars, on_result=None, on_error=None, allow=None):
+    """
+    Scrape every cigar through the engine with bounded concurrency.
+
+    Args:
+        engine: AsyncEngine for the retailer
+        scrape_async: the module's scrape_async coroutine function
+        cigars: list of inventory dicts (brand, name, box_size, key)
+        on_result: optional callback(cigar, result) called as each finishes
+        on_error: optional callback(cigar, exception) called instead of
+            on_result when a lookup raises
+        allow: optional callable(cigar) checked before each lookup starts;
+            False skips the cigar (e.g. once a circuit breaker has tripped)
+
+    Returns:
+        list of results in the same order as cigars (None on failure or skip)
+    """
+    # Lookups in flight - enough to keep every page busy between a lookup's
+    # navigations, few enough that allow() is checked as lookups start
+    in_flight = asyncio.Semaphore(LOOKUPS_PER_PAGE * engine.concurrency)
+
+    async def run_one(cigar):
+        async with in_flight:
+            if allow and not allow(cigar):
+                return None
+            try:
+                result = await scrape_async(engine, cigar['brand'], cigar['name'], cigar['box_size'])
+            except Exception as e:
+                print(f"  Error scraping {cigar['brand']} {cigar['name']}: {e}")
+                if on_error:
+                    on_error(cigar, e)
+                    return None
+                result = None
+        if on_result:
+            on_result(cigar, result)
+        return result
+
+    if not engine.lazy:
+        await engine.start()
+    try:
+        return await asyncio.gather(*(run_one(c) for c in cigars))
+    finally:
+        await engine.close()
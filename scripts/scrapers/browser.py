@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Shared Browser Provider
+=======================
+One Chromium instance per scrape run, owned by the orchestrator.
+
+The orchestrator calls launch() at startup, so Chromium boots on its own
+thread while the inventory loads, then start() once it needs the browser.
+Chromium is launched with a remote debugging port and its CDP endpoint is
+published in SCRAPER_BROWSER_CDP, so worker processes, async engines and
+the orchestrator's own in-process scrapes connect to the same browser
+instead of each cold-launching their own.
+
+Every retailer still gets its own isolated BrowserContext carrying its own
+user agent, locale, headers and stealth init script.
+
+When a scraper runs standalone (no endpoint published), the first
+new_context() call launches a private browser which is closed again when
+its last context is released.
+"""
+
+import os
+import time
+import socket
+import threading
+
+from scrapers import har, resource_policy as resource_policy_module
+
+
+# Launch flags for the shared browser. Havana House used to add
+# --disable-web-security and --disable-features=IsolateOrigins,site-per-process
+# to its own launch; nothing it does needs cross-origin access, and on a
+# shared browser they would weaken every retailer's contexts, so they're left out.
+LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+]
+
+# Environment variable carrying the shared browser's CDP endpoint
+CDP_ENV = 'SCRAPER_BROWSER_CDP'
+
+
+# This process's connection (or private browser) used by new_context()
+_playwright = None
+_browser = None
+_contexts = 0
+
+# The shared browser, launched and closed on its own thread (orchestrator only)
+_owner = None
+_launch_seconds = None
+
+
+def _free_port():
+    """Pick a free local TCP port for the remote debugging endpoint."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _run_owner(owner):
+    """Owner thread: launch Chromium, then hold it open until stop()."""
+    # Imported here so runs (and workers) that never drive a browser don't load Playwright
+    from playwright.sync_api import sync_playwright
+    try:
+        playwright = sync_playwright().start()
+        try:
+            browser = playwright.chromium.launch(
+                headless=True,
+                args=LAUNCH_ARGS + [f"--remote-debugging-port={owner['port']}"]
+            )
+        except:
+            playwright.stop()
+            raise
+    except Exception as e:
+        owner['error'] = e
+        owner['ready'].set()
+        return
+
+    owner['launch_seconds'] = time.perf_counter() - owner['started']
+    owner['ready'].set()
+    # Sync Playwright objects belong to the thread that made them - close them here too
+    owner['stop'].wait()
+    try:
+        browser.close()
+        playwright.stop()
+    except:
+        pass
+
+
+def launch():
+    """
+    Start launching the shared Chromium in the background (orchestrator only).
+    
+    Returns at once, so the caller can load the inventory while Chromium
+    boots; start() waits for it and publishes the endpoint.
+    """
+    global _owner
+    if _owner:
+        return
+
+    print("Starting shared browser...")
+    _owner = {
+        'port': _free_port(),
+        'started': time.perf_counter(),
+        'ready': threading.Event(),
+        'stop': threading.Event(),
+        'error': None,
+        'launch_seconds': None,
+    }
+    _owner['thread'] = threading.Thread(target=_run_owner, args=(_owner,), name='shared-browser', daemon=True)
+    _owner['thread'].start()
+
+
+def start():
+    """Launch the shared Chromium (unless launch() already has) and publish its CDP endpoint once it's up."""
+    global _launch_seconds
+    launch()
+    _owner['ready'].wait()
+    if _owner['error']:
+        error = _owner['error']
+        stop()
+        raise error
+
+    endpoint = f"http://127.0.0.1:{_owner['port']}"
+    os.environ[CDP_ENV] = endpoint
+    _launch_seconds = _owner['launch_seconds']
+    print(f"  Shared browser ready ({endpoint}, launched in {_launch_seconds:.1f}s)")
+    return endpoint
+
+
+def launch_seconds():
+    """How long the shared browser took to launch (None if it never came up)."""
+    return _launch_seconds
+
+
+def _disconnect():
+    """Drop this process's connection (closing its private browser, if it launched one)."""
+    global _playwright, _browser, _contexts
+    try:
+        if _browser:
+            _browser.close()
+        if _playwright:
+            _playwright.stop()
+    except:
+        pass
+    _playwright = _browser = None
+    _contexts = 0
+
+
+def stop():
+    """Close the connection to the browser, and the shared browser itself if this process owns it."""
+    global _owner
+    _disconnect()
+    if _owner:
+        _owner['stop'].set()
+        _owner['thread'].join(timeout=30)
+        os.environ.pop(CDP_ENV, None)
+        _owner = None
+
+
+def get_browser():
+    """Browser for this process: the shared one if published, else a private launch."""
+    global _playwright, _browser
+    if _browser:
+        return _browser
+
+    from playwright.sync_api import sync_playwright
+    _playwright = sync_playwright().start()
+    endpoint = os.environ.get(CDP_ENV)
+
+    if endpoint:
+        _browser = _playwright.chromium.connect_over_cdp(endpoint)
+    else:
+        _browser = _playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+    return _browser
+
+
+def new_context(context_options=None, init_script=None, resource_policy=None):
+    """Create an isolated context for one retailer (routed by its resource policy and har.py)."""
+    global _contexts
+    context = get_browser().new_context(**har.context_options(context_options, resource_policy, 'sync'))
+    if init_script:
+        context.add_init_script(init_script)
+    resource_policy_module.install(context, resource_policy)
+    har.install(context, resource_policy)
+    _contexts += 1
+    return context
+
+
+def close_context(context):
+    """Close a retailer's context, releasing this process's connection once it is unused."""
+    global _contexts
+    try:
+        context.close()
+    except:
+        pass
+    _contexts = max(0, _contexts - 1)
+
+    # The shared browser itself stays up until the orchestrator's stop()
+    if _contexts == 0:
+        _disconnect()
+
+
+async def connect_async(playwright):
+    """Async counterpart of get_browser() for an async_playwright instance."""
+    endpoint = os.environ.get(CDP_ENV)
+    if endpoint:
+        return await playwright.chromium.connect_over_cdp(endpoint)
+    return await playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
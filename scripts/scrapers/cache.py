@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Persistent Scrape Cache
+=======================
+SQLite-backed replacement for the per-module _cache dicts.
+
+Scrapers keep their existing "type:detail" keys (jjfox:{term},
+no6_json:{handle}, jjfox_prices:{url}, ...). The type prefix selects
+the entry's TTL, so re-runs on the same day are answered from disk instead
+of re-downloading the same search pages and product JSON.
+
+The store is shared by every scraper and worker process, is capped at
+MAX_ENTRIES with least-recently-used eviction, and each ScrapeCache keeps
+hit/miss counters for the run.
+
+Failed fetches are remembered for the run only (remember()), and every
+read of such an entry counts as a failed fetch for the lookup making it
+(see lookup_status.py), so a cached failure never passes for "not found".
+
+Usage mirrors a dict:
+    _cache = ScrapeCache()
+    if key in _cache:
+        return _cache[key]
+    _cache[key] = value
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from scrapers import har, lookup_status
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Location of the shared cache database (SCRAPE_CACHE=0 keeps entries in memory only).
+# HAR record/replay runs never use it: every page must be fetched (or replayed).
+CACHE_PATH = os.environ.get('SCRAPE_CACHE_PATH', os.path.join(SCRIPTS_DIR, '.scrape_cache.sqlite'))
+PERSIST = os.environ.get('SCRAPE_CACHE', '1') != '0' and not (har.RECORD or har.REPLAY)
+
+# Size caps (entries) for the database and the in-process layer
+MAX_ENTRIES = int(os.environ.get('SCRAPE_CACHE_MAX_ENTRIES', '20000'))
+MEMORY_ENTRIES = 2000
+
+HOUR = 3600
+
+# TTL per entry type (the key prefix before the first ':')
+# Listings that carry prices expire within the day; name-only search
+# results change rarely and are kept longer.
+TTLS = {
+    'cgars': 20 * HOUR,
+    'cgars_brand': 20 * HOUR,
+    'havanahouse': 20 * HOUR,
+    'jjfox': 72 * HOUR,
+    'jjfox_price': 20 * HOUR,
+    'jjfox_prices': 20 * HOUR,
+    'no6': 72 * HOUR,
+    'no6_json': 20 * HOUR,
+    'no6_catalogue': 20 * HOUR,
+    'cigarclub': 72 * HOUR,
+    'cigarclub_variants': 20 * HOUR,
+    'cigarclub_catalogue': 20 * HOUR,
+    'havanahouse_catalogue': 20 * HOUR,
+}
+DEFAULT_TTL = 20 * HOUR
+
+
+# Marks a key absent from the in-process layer
+_MISSING = object()
+
+
+def entry_type(key):
+    """Entry type of a cache key ("jjfox:robusto" -> "jjfox")."""
+    return key.split(':', 1)[0]
+
+
+class ScrapeCache:
+    """Dict-like persistent cache with per-type TTLs, LRU eviction and counters."""
+
+    def __init__(self, path=None, persist=None, ttls=None, max_entries=None):
+        self.path = path or CACHE_PATH
+        self.persist = PERSIST if persist is None else persist
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self.max_entries = max_entries or MAX_ENTRIES
+
+        # One lock guards the in-process layer, the counters and the
+        # connection - http_fetch.fetch_all threads share a module's cache
+        self._memo = OrderedDict()
+        self._failed = set()
+        self._conn = None
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    # -- internals ---------------------------------------------------------
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        return self._conn
+
+    def _count(self, key, event):
+        """Bump a counter; the caller holds the lock."""
+        counters = self._counters.setdefault(entry_type(key), {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0})
+        counters[event] += 1
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memo[key] = value
+            self._memo.move_to_end(key)
+            while len(self._memo) > MEMORY_ENTRIES:
+                self._memo.popitem(last=False)
+
+    def _recall(self, key):
+        """Value of key in the in-process layer (now most recently used), or _MISSING."""
+        with self._lock:
+            value = self._memo.get(key, _MISSING)
+            if value is not _MISSING:
+                self._memo.move_to_end(key)
+            return value
+
+    def _lookup(self, key):
+        """(found, value) from memory, then disk - a disk hit is kept in memory."""
+        value = self._recall(key)
+        if value is not _MISSING:
+            self.recall_failure(key)
+            return True, value
+
+        found, value = self._load(key)
+        if found:
+            self._remember(key, value)
+        return found, value
+
+    def _lookup_counted(self, key):
+        found, value = self._lookup(key)
+        with self._lock:
+            self._count(key, 'hits' if found else 'misses')
+        return found, value
+
+    def _load(self, key):
+        """Fetch a live entry from disk, deleting it if expired. Returns (found, value)."""
+        if not self.persist:
+            return False, None
+
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute('SELECT value, created FROM cache WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return False, None
+
+                value, created = row
+                now = time.time()
+                if now - created > self.ttls.get(entry_type(key), DEFAULT_TTL):
+                    conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                    conn.commit()
+                    self._count(key, 'expired')
+                    return False, None
+
+                conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+                conn.commit()
+                return True, json.loads(value)
+            except sqlite3.Error as e:
+                print(f"    Cache read error: {e}")
+                return False, None
+
+    def _store(self, key, value):
+        if not self.persist:
+            return
+
+        with self._lock:
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, type, value, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                    (key, entry_type(key), json.dumps(value), now, now)
+                )
+
+                # Evict least recently used entries beyond the size cap
+                (count,) = conn.execute('SELECT COUNT(*) FROM cache').fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed ASC LIMIT ?)',
+                        (count - self.max_entries,)
+                    )
+                conn.commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"    Cache write error: {e}")
+
+    # -- dict interface ----------------------------------------------------
+
+    def __contains__(self, key):
+        return self._lookup_counted(key)[0]
+
+    def __getitem__(self, key):
+        found, value = self._lookup(key)
+        if not found:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._remember(key, value)
+        with self._lock:
+            self._failed.discard(key)
+            self._count(key, 'writes')
+        self._store(key, value)
+
+    def get(self, key, default=None):
+        # One lookup, so another thread can't evict the entry between check and read
+        found, value = self._lookup_counted(key)
+        return value if found else default
+
+    def remember(self, key, value):
+        """Cache for this process only - used for failed fetches worth retrying next run."""
+        self._remember(key, value)
+        with self._lock:
+            self._failed.add(key)
+        lookup_status.failed(f"{key}: fetch failed")
+
+    def recall_failure(self, key):
+        """Count a failed fetch against the running lookup if key was remembered as one."""
+        with self._lock:
+            failed = key in self._failed
+        if failed:
+            lookup_status.failed(f"{key}: fetch failed earlier this run")
+
+    def stats(self):
+        """Hit/miss counters for this run, per entry type and in total."""
+        with self._lock:
+            by_type = {t: dict(c) for t, c in self._counters.items()}
+
+        total = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0}
+        for counters in by_type.values():
+            for name, value in counters.items():
+                total[name] += value
+
+        lookups = total['hits'] + total['misses']
+        total['hit_rate'] = round(total['hits'] / lookups, 3) if lookups else 0.0
+        total['by_type'] = by_type
+        return total
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+HAR Record / Replay
+===================
+Frozen snapshots of a run's traffic, so a full scrape_orchestrator.py pass
+can be re-run offline in seconds - to profile it, bisect a performance
+regression, or try a matcher change against last week's real pages.
+
+SCRAPE_HAR=record
+    Every browser context records its traffic to a HAR archive in
+    SCRAPE_HAR_DIR ({retailer}-sync.har.zip / {retailer}-async.har.zip,
+    written when the context closes), plain HTTP fetches made through
+    http_fetch.get() go to http-{host}.har, and the orchestrator saves the
+    inventory it scraped.
+
+SCRAPE_HAR=replay
+    Contexts are served from those archives through Playwright routing
+    (requests that weren't recorded are aborted), http_fetch.get() answers
+    from the recorded entries, and the inventory comes from the snapshot -
+    nothing reaches the network.
+
+Both modes keep the scrape cache in memory and check every cigar, so a
+replay performs the same lookups the recording did. Replay also turns off
+per-host pacing and writes prices and metrics to SCRAPE_HAR_DIR/replay
+instead of over the real outputs.
+"""
+
+import os
+import re
+import json
+import glob
+import threading
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODE = os.environ.get('SCRAPE_HAR', '').strip().lower()
+RECORD = MODE == 'record'
+REPLAY = MODE == 'replay'
+
+HAR_DIR = os.environ.get('SCRAPE_HAR_DIR', os.path.join(SCRIPTS_DIR, 'har'))
+
+INVENTORY_FILE = 'inventory.json'
+REPLAY_OUTPUT_DIR = 'replay'
+
+# Recorded plain HTTP entries (record mode) and the lookup built from them (replay)
+_http_entries = {}
+_http_replay = None
+_lock = threading.Lock()
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'browser'
+
+
+def archive_path(retailer, kind):
+    """HAR archive for one retailer's sync or async browser context."""
+    return os.path.join(HAR_DIR, f"{_slug(retailer)}-{kind}.har.zip")
+
+
+def _retailer(resource_policy):
+    return (resource_policy or {}).get('retailer', 'browser')
+
+
+def context_options(options, resource_policy, kind):
+    """new_context() options, plus HAR recording in record mode."""
+    options = dict(options or {})
+    if RECORD:
+        os.makedirs(HAR_DIR, exist_ok=True)
+        # 'minimal' keeps what routing from the HAR needs (URLs, headers, bodies)
+        options.update(record_har_path=archive_path(_retailer(resource_policy), kind),
+                       record_har_mode='minimal')
+    return options
+
+
+def _archives(resource_policy):
+    return sorted(glob.glob(os.path.join(HAR_DIR, f"{_slug(_retailer(resource_policy))}-*.har.zip")))
+
+
+def install(context, resource_policy):
+    """
+    Serve a sync context from the retailer's recorded archives (replay mode).
+
+    Must run after resource_policy.install(): Playwright tries the most
+    recently added route first, so recorded responses win and anything not
+    in the snapshot is aborted instead of reaching the policy's continue_().
+    """
+    if not REPLAY:
+        return
+    archives = _archives(resource_policy)
+    if not archives:
+        print(f"    No HAR snapshot for {_retailer(resource_policy)} in {HAR_DIR} - aborting its requests")
+        context.route('**/*', lambda route: route.abort())
+    # The first archive routed is tried last, so it alone aborts unknown requests
+    for i, path in enumerate(archives):
+        context.route_from_har(path, not_found='abort' if i == 0 else 'fallback')
+
+
+async def install_async(context, resource_policy):
+    """Async counterpart of install() for an async_playwright BrowserContext."""
+    if not REPLAY:
+        return
+    archives = _archives(resource_policy)
+    if not archives:
+        print(f"    No HAR snapshot for {_retailer(resource_policy)} in {HAR_DIR} - aborting its requests")
+
+        async def abort(route):
+            await route.abort()
+        await context.route('**/*', abort)
+    for i, path in enumerate(archives):
+        await context.route_from_har(path, not_found='abort' if i == 0 else 'fallback')
+
+
+# -- plain HTTP (http_fetch) ---------------------------------------------------
+
+def _http_path(host):
+    return os.path.join(HAR_DIR, f"http-{_slug(host)}.har")
+
+
+def _har_log(entries):
+    return {'log': {'version': '1.2', 'creator': {'name': 'scrape_orchestrator', 'version': '1'},
+                    'entries': entries}}
+
+
+def record_http(host, url, response):
+    """Append one http_fetch response to its host's HAR file (record mode)."""
+    entry = {
+        'request': {'method': 'GET', 'url': url, 'headers': []},
+        'response': {
+            'status': response.status_code,
+            'headers': [{'name': k, 'value': v} for k, v in response.headers.items()],
+            'content': {'mimeType': response.headers.get('Content-Type', ''), 'text': response.text},
+        },
+    }
+    with _lock:
+        entries = _http_entries.setdefault(host, [])
+        entries.append(entry)
+        os.makedirs(HAR_DIR, exist_ok=True)
+        # Rewritten on every entry so an interrupted recording keeps what it fetched
+        with open(_http_path(host), 'w') as f:
+            json.dump(_har_log(entries), f)
+
+
+def replay_http(url):
+    """Recorded (status, headers, body text) for a URL, or None if it isn't in the snapshot."""
+    global _http_replay
+    with _lock:
+        if _http_replay is None:
+            _http_replay = {}
+            for path in glob.glob(os.path.join(HAR_DIR, 'http-*.har')):
+                try:
+                    with open(path) as f:
+                        entries = json.load(f)['log']['entries']
+                except (OSError, ValueError, KeyError):
+                    continue
+                for entry in entries:
+                    # Last recording of a URL wins
+                    _http_replay[entry['request']['url']] = entry['response']
+        response = _http_replay.get(url)
+
+    if response is None:
+        return None
+    headers = {h['name']: h['value'] for h in response.get('headers', [])}
+    return response['status'], headers, response.get('content', {}).get('text', '')
+
+
+# -- orchestrator ----------------------------------------------------------------
+
+def start_recording():
+    """Clear a previous snapshot's archives from HAR_DIR (record mode, orchestrator only)."""
+    os.makedirs(HAR_DIR, exist_ok=True)
+    for pattern in ('*.har.zip', 'http-*.har', INVENTORY_FILE):
+        for path in glob.glob(os.path.join(HAR_DIR, pattern)):
+            os.remove(path)
+    print(f"Recording HAR snapshot to {HAR_DIR}")
+
+
+def save_inventory(cigars):
+    """Keep the recorded run's inventory with its snapshot."""
+    with open(os.path.join(HAR_DIR, INVENTORY_FILE), 'w') as f:
+        json.dump(cigars, f, indent=2)
+
+
+def load_inventory():
+    """The inventory saved with the snapshot ([] if there is none)."""
+    path = os.path.join(HAR_DIR, INVENTORY_FILE)
+    print(f"Replaying HAR snapshot from {HAR_DIR}")
+    try:
+        with open(path) as f:
+            cigars = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  ERROR: no recorded inventory ({e})")
+        return []
+    print(f"  Found {len(cigars)} unique cigars")
+    return cigars
+
+
+def output_dir():
+    """Where a run writes prices.json and metrics (SCRAPE_HAR_DIR/replay when replaying)."""
+    if not REPLAY:
+        return '.'
+    directory = os.path.join(HAR_DIR, REPLAY_OUTPUT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return directory
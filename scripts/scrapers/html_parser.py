@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backend
+===================
+One place that turns page HTML into the BeautifulSoup trees the scrapers
+read, using the fastest parser available and - when the caller says which
+parts of the page it reads - building a tree for those parts only.
+
+    soup = html_parser.parse(html, only='li.product, .page-numbers')
+
+`only` is a comma-separated list of simple CSS selectors (tag, .class,
+tag.class, tag[attr*="text"]). Every element matching one of them is kept
+with its whole subtree; headers, menus, inline scripts and footers never
+become Python objects. The caller then runs its usual soup.select() calls,
+so `only` must cover every element (and the ancestors named by any
+descendant selector) the caller looks at.
+
+Backends (SCRAPE_HTML_PARSER, default: the first one installed):
+- selectolax: the lexbor HTML5 parser finds the subtrees, and only their
+  markup is handed to BeautifulSoup
+- lxml: libxml2 finds the subtrees (and builds BeautifulSoup trees)
+- html.parser: the pure-Python parser, restricted with a SoupStrainer when
+  every selector names a class; full parse otherwise
+
+SCRAPE_HTML_PARSER=html.parser with `only` ignored (SCRAPE_HTML_SUBTREES=0)
+is exactly the old behaviour, for comparing results.
+"""
+
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+
+def available_backends():
+    """Backends usable in this environment, fastest first."""
+    installed = {'selectolax': LexborHTMLParser is not None, 'lxml': lxml is not None, 'html.parser': True}
+    return [b for b in BACKENDS if installed[b]]
+
+
+BACKEND = os.environ.get('SCRAPE_HTML_PARSER', '') or available_backends()[0]
+if BACKEND not in available_backends():
+    print(f"  HTML parser '{BACKEND}' unavailable - using html.parser")
+    BACKEND = 'html.parser'
+
+SUBTREES = os.environ.get('SCRAPE_HTML_SUBTREES', '1') != '0'
+
+# tag, .class, tag.class.other, tag[attr*="text"]
+SIMPLE_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<classes>(?:\.[\w-]+)*)(?:\[(?P<attr>[\w-]+)\*=["\']?(?P<text>[^"\'\]]*)["\']?\])?$'
+)
+
+
+def _selectors(only):
+    """Parsed simple selectors of an `only` string (ValueError if one isn't simple)."""
+    parsed = []
+    for selector in only.split(','):
+        selector = selector.strip()
+        m = SIMPLE_SELECTOR_RE.match(selector)
+        if not selector or not m:
+            raise ValueError(f"unsupported subtree selector: {selector!r}")
+        parsed.append({
+            'tag': m.group('tag') if m.group('tag') not in (None, '*') else None,
+            'classes': [c for c in m.group('classes').split('.') if c],
+            'attr': m.group('attr'),
+            'text': m.group('text'),
+        })
+    return parsed
+
+
+def _xpath(selectors):
+    """XPath union equivalent to a list of simple selectors."""
+    parts = []
+    for s in selectors:
+        tests = [f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in s['classes']]
+        if s['attr']:
+            tests.append(f"contains(@{s['attr']}, '{s['text']}')")
+        parts.append(f"//{s['tag'] or '*'}" + ''.join(f'[{t}]' for t in tests))
+    return ' | '.join(parts)
+
+
+def _outermost(nodes, ancestors, key):
+    """Matched nodes that aren't inside another matched node, in document order."""
+    selected = {key(n) for n in nodes}
+    return [n for n in nodes if not any(key(a) in selected for a in ancestors(n))]
+
+
+def _selectolax_ancestors(node):
+    parent = node.parent
+    while parent is not None:
+        yield parent
+        parent = parent.parent
+
+
+def _fragments_selectolax(html, only):
+    nodes = LexborHTMLParser(html).css(only)
+    return [n.html for n in _outermost(nodes, _selectolax_ancestors, lambda n: n.mem_id)]
+
+
+def _fragments_lxml(html, selectors):
+    doc = lxml.html.fromstring(html)
+    nodes = doc.xpath(_xpath(selectors))
+    return [lxml.html.tostring(n, encoding='unicode', with_tail=False)
+            for n in _outermost(nodes, lambda n: n.iterancestors(), id)]
+
+
+def _strainer(selectors):
+    """SoupStrainer keeping every element with one of the selectors' classes (None if a selector has none)."""
+    classes = []
+    for s in selectors:
+        if not s['classes']:
+            return None
+        # A class-only strainer keeps a superset of the matches - the caller's select() narrows it
+        classes.append(re.escape(s['classes'][0]))
+    # While parsing, class is still the raw attribute string - match one of its words
+    return SoupStrainer(class_=re.compile(r'(?:^|\s)(?:' + '|'.join(classes) + r')(?:\s|$)'))
+
+
+def _tree_builder():
+    return 'lxml' if lxml is not None else 'html.parser'
+
+
+def parse(html, only=None):
+    """BeautifulSoup tree of html, limited to the subtrees matching `only` if given."""
+    if not only or not SUBTREES:
+        return BeautifulSoup(html, 'html.parser' if BACKEND == 'html.parser' else _tree_builder())
+
+    selectors = _selectors(only)
+    try:
+        if BACKEND == 'selectolax':
+            return BeautifulSoup(''.join(_fragments_selectolax(html, only)), _tree_builder())
+        if BACKEND == 'lxml':
+            return BeautifulSoup(''.join(_fragments_lxml(html, selectors)), 'lxml')
+    except Exception as e:
+        # Markup the fast parser rejects (e.g. an XML declaration) - parse it whole
+        print(f"    {BACKEND} subtree parse failed ({e}) - parsing the whole page")
+        return BeautifulSoup(html, _tree_builder())
+
+    strainer = _strainer(selectors)
+    if strainer is None:
+        return BeautifulSoup(html, 'html.parser')
+    return BeautifulSoup(html, 'html.parser', parse_only=strainer)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Plain HTTP Fetching
+===================
+Browser-free GETs for the endpoints that don't need a rendered page
+(WooCommerce Store API JSON, static listing HTML).
+
+One requests.Session is kept per host so connections are reused, and every
+request to a host holds one of that host's slots: at most HOST_CONCURRENCY
+requests are in flight against any single site, however many pages a
+scraper asks for at once. fetch_all() runs a batch of fetches concurrently
+under that limit. Every request is also paced by the per-host rate
+scheduler (rate_scheduler.py), and failed requests are reported to the
+running lookup (lookup_status.py).
+
+With SCRAPE_HAR=record every response is also written to the run's HAR
+snapshot, and with SCRAPE_HAR=replay get() answers from that snapshot
+without touching the network (see har.py).
+"""
+
+import os
+import time
+import threading
+import contextvars
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from scrapers import rate_scheduler, metrics, har, lookup_status
+
+
+# Requests in flight per host (override with SCRAPE_HOST_CONCURRENCY)
+HOST_CONCURRENCY = int(os.environ.get('SCRAPE_HOST_CONCURRENCY', '4'))
+
+TIMEOUT = 30
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-GB,en;q=0.9',
+}
+
+
+# Per-host sessions and slots
+_sessions = {}
+_slots = {}
+_lock = threading.Lock()
+
+
+def _host_state(host):
+    with _lock:
+        if host not in _sessions:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            _sessions[host] = session
+            _slots[host] = threading.BoundedSemaphore(max(1, HOST_CONCURRENCY))
+        return _sessions[host], _slots[host]
+
+
+def get(url, headers=None, timeout=TIMEOUT, phase='json'):
+    """
+    GET a URL under its host's concurrency limit. Raises on HTTP errors.
+    
+    The request is timed into the given run-metrics phase.
+    """
+    host = urlparse(url).hostname or ''
+    if har.REPLAY:
+        return _replayed(url, phase)
+    
+    session, slot = _host_state(host)
+    rate_scheduler.wait(url)
+    with slot:
+        started = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except Exception as e:
+            rate_scheduler.record(url, time.perf_counter() - started, error=e)
+            lookup_status.fetched(url, error=e)
+            raise
+    rate_scheduler.record(url, time.perf_counter() - started, response.status_code, headers=response.headers)
+    lookup_status.fetched(url, response.status_code)
+    metrics.observe(phase, time.perf_counter() - started)
+    if har.RECORD:
+        har.record_http(host, url, response)
+    response.raise_for_status()
+    return response
+
+
+def _replayed(url, phase):
+    """A requests.Response rebuilt from the HAR snapshot (raises if the URL wasn't recorded)."""
+    started = time.perf_counter()
+    recorded = har.replay_http(url)
+    if recorded is None:
+        error = requests.ConnectionError(f"not in HAR snapshot: {url}")
+        lookup_status.fetched(url, error=error)
+        raise error
+    
+    status, headers, text = recorded
+    lookup_status.fetched(url, status)
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers)
+    response._content = text.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = url
+    metrics.observe(phase, time.perf_counter() - started)
+    response.raise_for_status()
+    return response
+
+
+def fetch_all(fetch, items):
+    """
+    Run fetch(item) for every item concurrently (per-host limits still apply).
+
+    Returns results in the order of items; the first exception is re-raised.
+    Each fetch runs in a copy of the caller's context, so its failures
+    count against the caller's lookup.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [fetch(item) for item in items]
+
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=max(1, HOST_CONCURRENCY)) as pool:
+        return list(pool.map(lambda context, item: context.run(fetch, item), contexts, items))
+
+
+def close():
+    """Close every pooled session."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _slots.clear()
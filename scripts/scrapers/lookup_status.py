@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Lookup Status
+=============
+Tells a lookup that found nothing apart from one whose fetches failed.
+
+The scrapers catch navigation and HTTP errors and carry on, returning None
+or [] (and remembering the failed page for the rest of the run), so a
+lookup made while a site is down looks just like "checked, not stocked".
+
+The orchestrator runs each cigar lookup inside track(). Meanwhile:
+- the fetch layer (readiness.goto()/goto_async(), http_fetch.get())
+  reports every request's outcome through fetched()
+- ScrapeCache reports reads of entries remembered after a failed fetch
+
+A lookup that found no price while any of its fetches failed raises
+FetchFailed from check(), so it's retried rather than recorded as not found.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+
+# Statuses that mean the page is gone, not unavailable - a real "not found"
+GONE_STATUSES = (404, 410)
+
+# Failures of the lookup running in this thread or asyncio task
+_failures = contextvars.ContextVar('lookup_failures', default=None)
+
+
+class FetchFailed(Exception):
+    """A lookup found no price and at least one of its fetches failed."""
+
+
+@contextmanager
+def track():
+    """Collect the fetch failures of the lookup run inside the block (yields the list)."""
+    failures = []
+    token = _failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _failures.reset(token)
+
+
+def failed(reason):
+    """Note a failed fetch against the current lookup (ignored outside track())."""
+    failures = _failures.get()
+    if failures is not None:
+        failures.append(reason)
+
+
+def fetched(url, status=None, error=None):
+    """Note one request's outcome - errors and HTTP error statuses are failures."""
+    if error is not None:
+        message = str(error).split('\n')[0][:120] or type(error).__name__
+        failed(f"{url}: {message}")
+    elif status is not None and status >= 400 and status not in GONE_STATUSES:
+        failed(f"{url}: HTTP {status}")
+
+
+def check(result, failures):
+    """The lookup's result, or FetchFailed if it has no price and a fetch failed."""
+    if failures and not (result and result.get('price')):
+        raise FetchFailed(f"{len(failures)} failed fetch(es), last {failures[-1]}")
+    return result
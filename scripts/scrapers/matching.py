@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared Matching Core
+====================
+Name normalization, stemming, box-size extraction and cigar match
+signatures shared by every retailer scraper.
+
+Each scraper declares its own name-noise and box-size patterns as
+MATCH_RULES = match_rules(...), compiled once at import. Product-side
+helpers are memoized on the product name, so a product seen by several
+cigars (or in several search results) is normalized only once per process.
+
+The cigar side of every match rule (brand forms, roman numerals, years,
+Behike number, vitola word and its variants, key words) is computed once
+per inventory cigar into an immutable MatchSignature by match_signature().
+The scrapers' match_product() functions keep their own retailer-specific
+decision rules but read everything from the signature.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+MEMO_SIZE = 65536
+
+# -- patterns ----------------------------------------------------------------
+
+ROMAN_RE = re.compile(r'\b(i{1,3}|iv|v|vi{1,3}|ix|x{1,3})\b')
+YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+BEHIKE_RE = re.compile(r'behike\s*(\d+)')
+NON_WORD_RE = re.compile(r'[^\w\s]')
+
+MIN_BOX_SIZE = 3
+MAX_BOX_SIZE = 50
+
+# A retailer's name-noise and box-size rules, compiled once by match_rules()
+MatchRules = namedtuple('MatchRules', [
+    'noise',            # patterns removed, in order, before comparing names
+    'box_patterns',     # box-size patterns, most explicit first; group 1 is the count
+    'box_range',        # (min, max) accepted count, or None for any
+    'single',           # pattern marking a single cigar, or None
+    'single_unless',    # pattern that vetoes single (tubes sold singly), or None
+])
+
+
+def match_rules(noise, box_patterns, box_range=(MIN_BOX_SIZE, MAX_BOX_SIZE), single=None, single_unless=None):
+    """
+    Compile a retailer's matching rules.
+
+    Each retailer names its products differently ("Box of 25", "- 25s",
+    "(25)", "Cabinet 50"), so every scraper keeps its own rules; only the
+    code that applies them is shared.
+    """
+    return MatchRules(
+        noise=tuple(re.compile(p) for p in noise),
+        box_patterns=tuple(re.compile(p) for p in box_patterns),
+        box_range=box_range,
+        single=re.compile(single) if single else None,
+        single_unless=re.compile(single_unless) if single_unless else None,
+    )
+
+
+# Words that are never the vitola even when they end the cigar name
+ROMAN_WORDS = frozenset({'i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x'})
+NON_VITOLA_WORDS = frozenset({'box', 'of', 'cigars', 'cigar', '52', '54', '56'})
+
+# Common brand spellings on product names
+BRAND_VARIANTS = {
+    'montecristo': ('monte cristo', 'monte-cristo'),
+    'romeo y julieta': ('romeo', 'ryj'),
+    'hoyo de monterrey': ('hoyo',),
+    'por larranaga': ('por larrañaga',),
+    'san cristobal': ('san cristóbal',),
+    'ramon allones': ('ramón allones',),
+}
+
+
+# -- text helpers ------------------------------------------------------------
+
+@lru_cache(maxsize=MEMO_SIZE)
+def get_stem(word):
+    """Get word stem by removing common endings."""
+    w = word.lower().strip()
+    if w.endswith('os'):
+        return w[:-1]  # robustos -> robusto
+    if w.endswith('es') and len(w) > 3:
+        return w[:-1]  # brillantes -> brillante
+    if w.endswith('s') and len(w) > 3:
+        return w[:-1]  # cigars -> cigar
+    return w
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize_name(text, rules):
+    """
+    Normalize a product/cigar name for comparison.
+
+    Strips the retailer's box-size and packaging text, then punctuation
+    and extra whitespace.
+    """
+    t = text.lower()
+    for pattern in rules.noise:
+        t = pattern.sub('', t)
+    t = NON_WORD_RE.sub(' ', t)
+    return ' '.join(t.split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def extract_box_size(text, rules):
+    """
+    Box size from a product name, variant title or option label.
+
+    Returns 1 for singles, None if no clear box size is found.
+    """
+    t = text.lower().strip()
+
+    for pattern in rules.box_patterns:
+        match = pattern.search(t)
+        if match:
+            size = int(match.group(1))
+            if rules.box_range is None or rules.box_range[0] <= size <= rules.box_range[1]:
+                return size
+
+    if rules.single and rules.single.search(t):
+        if not (rules.single_unless and rules.single_unless.search(t)):
+            return 1
+
+    return None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def romans(text):
+    """Roman numeral words in a (lowercase) name."""
+    return frozenset(ROMAN_RE.findall(text))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def years(text):
+    """Four-digit years in a (lowercase) name."""
+    return frozenset(YEAR_RE.findall(text))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def words(text):
+    """Whitespace-separated words of a normalized name."""
+    return tuple(text.split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def word_stems(text):
+    """Stems of the words of a normalized name."""
+    return frozenset(get_stem(w) for w in text.split())
+
+
+def vowel_swaps(word):
+    """Single e<->a swaps of a word (leyenda -> layenda, leyanda)."""
+    swaps = []
+    for i, char in enumerate(word):
+        if char == 'e':
+            swaps.append(word[:i] + 'a' + word[i+1:])
+        elif char == 'a':
+            swaps.append(word[:i] + 'e' + word[i+1:])
+    return tuple(swaps)
+
+
+# -- cigar signatures --------------------------------------------------------
+
+MatchSignature = namedtuple('MatchSignature', [
+    'brand',            # lowercase brand
+    'brand_first',      # first word of the brand
+    'brand_forms',      # brand spellings to look for (full, variants)
+    'name',             # lowercase cigar name
+    'normalized',       # normalize_name(name, rules)
+    'romans',           # roman numerals in the name
+    'years',            # years in the name
+    'behike',           # Behike number as a string, or None
+    'last_word',        # last word of the raw name (vitola), or ''
+    'last_stem',        # get_stem(last_word)
+    'last_swaps',       # e<->a variants of last_word
+    'check_vitola',     # False when last_word is a roman numeral / non-vitola word
+    'key_words',        # normalized words longer than 2 chars
+    'key_stems',        # get_stem() of each key word
+    'min_key_matches',  # key words that must be found
+])
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def match_signature(brand, cigar_name, rules):
+    """Immutable, memoized cigar side of every match rule, normalized by the retailer's rules."""
+    brand_lower = brand.lower()
+    name = cigar_name.lower()
+    normalized = normalize_name(name, rules)
+
+    behike = BEHIKE_RE.search(name) if 'behike' in name else None
+
+    raw_words = name.split()
+    last_word = raw_words[-1] if raw_words else ''
+
+    key_words = tuple(w for w in normalized.split() if len(w) > 2)
+    if len(key_words) > 2:
+        min_key_matches = max(1, len(key_words) // 2)
+    else:
+        min_key_matches = len(key_words)
+
+    return MatchSignature(
+        brand=brand_lower,
+        brand_first=brand_lower.split()[0] if brand_lower.split() else brand_lower,
+        brand_forms=(brand_lower,) + BRAND_VARIANTS.get(brand_lower, ()),
+        name=name,
+        normalized=normalized,
+        romans=romans(name),
+        years=years(name),
+        behike=behike.group(1) if behike else None,
+        last_word=last_word,
+        last_stem=get_stem(last_word) if last_word else '',
+        last_swaps=vowel_swaps(last_word),
+        check_vitola=bool(last_word) and last_word not in ROMAN_WORDS and last_word not in NON_VITOLA_WORDS,
+        key_words=key_words,
+        key_stems=tuple(get_stem(w) for w in key_words),
+        min_key_matches=min_key_matches,
+    )
+
+
+def key_word_matches(sig, prod_name):
+    """Number of the cigar's key words (or their stems) found in a product name."""
+    return sum(1 for word, stem in zip(sig.key_words, sig.key_stems) if word in prod_name or stem in prod_name)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+===========
+Where a scrape run spends its time, per retailer.
+
+Latency histograms are kept per phase:
+- search: search / listing navigations (readiness rules with 'phase': 'search',
+  or http_fetch.get(..., phase='search'))
+- product: product page loads
+- json: JSON endpoint loads (browser or plain HTTP)
+- parse: HTML/JSON parsing (functions decorated with @timed('parse'))
+- match: match_product() calls
+- lookup: one whole cigar lookup, from the orchestrator
+
+Each retailer runs in its own process (or one after another in this one),
+so the orchestrator calls reset() before a retailer and stores snapshot()
+in its retailer_stats. write_reports() turns retailer_stats into
+scrape_metrics.json and a Prometheus text-format scrape_metrics.prom next to
+prices.json.
+
+Progress tracks live throughput: cigars per minute and an ETA, printed as
+the run goes.
+
+Time to first scrape is measured from the orchestrator's start, which
+mark_run_start() publishes in the environment so worker processes can
+measure against it too.
+"""
+
+import os
+import json
+import time
+import threading
+from functools import wraps
+
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le' labels)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+JSON_REPORT = 'scrape_metrics.json'
+PROMETHEUS_REPORT = 'scrape_metrics.prom'
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+# Phases being timed by @timed on this thread
+_active = threading.local()
+
+
+def _new_histogram():
+    return {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(BUCKETS)}
+
+
+def observe(phase, seconds):
+    """Record one duration for a phase."""
+    with _lock:
+        h = _histograms.get(phase)
+        if h is None:
+            h = _histograms[phase] = _new_histogram()
+        h['count'] += 1
+        h['sum'] += seconds
+        h['max'] = max(h['max'], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h['buckets'][i] += 1
+                break
+
+
+class timer:
+    """Context manager timing a block into a phase."""
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.phase, time.perf_counter() - self.started)
+        return False
+
+
+def timed(phase):
+    """
+    Decorator timing every call of a function into a phase.
+    
+    Only the outermost timed call per phase counts, so a parser calling
+    another parser isn't timed twice.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            active = _active.__dict__.setdefault('phases', set())
+            if phase in active:
+                return fn(*args, **kwargs)
+            active.add(phase)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                active.discard(phase)
+                observe(phase, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def reset():
+    """Forget every histogram (called before each retailer)."""
+    with _lock:
+        _histograms.clear()
+
+
+def _quantile(h, q):
+    """Upper bucket bound holding the q-quantile (None if empty)."""
+    if not h['count']:
+        return None
+    target = q * h['count']
+    seen = 0
+    for bound, count in zip(BUCKETS, h['buckets']):
+        seen += count
+        if seen >= target:
+            return bound
+    return h['max']
+
+
+def snapshot():
+    """Histograms with count, total, average, p50/p95 bounds and max per phase."""
+    with _lock:
+        histograms = {phase: dict(h, buckets=list(h['buckets'])) for phase, h in _histograms.items()}
+
+    for h in histograms.values():
+        h['sum'] = round(h['sum'], 6)
+        h['max'] = round(h['max'], 6)
+        h['avg_ms'] = round(h['sum'] / h['count'] * 1000, 2) if h['count'] else None
+        h['p50'] = _quantile(h, 0.5)
+        h['p95'] = _quantile(h, 0.95)
+    return histograms
+
+
+# -- live throughput ---------------------------------------------------------
+
+class Progress:
+    """Cigars per minute and ETA for one retailer's work list."""
+
+    REPORT_EVERY = 30.0
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.lock = threading.Lock()
+
+    def rate(self):
+        """Cigars per minute so far."""
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed * 60 if elapsed > 0 else 0.0
+
+    def eta(self):
+        """Seconds left at the current rate (None before the first cigar)."""
+        rate = self.rate()
+        return (self.total - self.done) / rate * 60 if rate else None
+
+    def step(self):
+        """Count one finished cigar, printing progress every REPORT_EVERY seconds."""
+        with self.lock:
+            self.done += 1
+            now = time.perf_counter()
+            if now - self.last_report < self.REPORT_EVERY and self.done < self.total:
+                return
+            self.last_report = now
+        eta = self.eta()
+        eta_text = f", ETA {format_duration(eta)}" if eta is not None and self.done < self.total else ''
+        print(f"  Progress: {self.done}/{self.total} cigars, {self.rate():.1f}/min{eta_text}")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {'cigars': self.done, 'seconds': round(elapsed, 1), 'cigars_per_min': round(self.rate(), 2)}
+
+
+def format_duration(seconds):
+    """Compact h/m/s text for a duration."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+# -- startup -----------------------------------------------------------------
+
+RUN_STARTED_ENV = 'SCRAPE_RUN_STARTED'
+
+
+def mark_run_start(started=None):
+    """Publish the run's start time (epoch seconds) to this process and its workers."""
+    os.environ[RUN_STARTED_ENV] = repr(started or time.time())
+
+
+def since_run_start():
+    """Seconds since the run started (None if no start was marked)."""
+    started = os.environ.get(RUN_STARTED_ENV)
+    return round(time.time() - float(started), 2) if started else None
+
+
+# -- reports -----------------------------------------------------------------
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def prometheus_text(retailer_stats):
+    """Prometheus text exposition of every retailer's metrics."""
+    lines = [
+        '# HELP scrape_phase_seconds Time spent per scrape phase.',
+        '# TYPE scrape_phase_seconds histogram',
+    ]
+    for retailer, stats in retailer_stats.items():
+        for phase, h in stats.get('metrics', {}).items():
+            labels = f'retailer="{_label(retailer)}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, h['buckets']):
+                cumulative += count
+                lines.append(f'scrape_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'scrape_phase_seconds_bucket{{{labels},le="+Inf"}} {h["count"]}')
+            lines.append(f'scrape_phase_seconds_sum{{{labels}}} {h["sum"]}')
+            lines.append(f'scrape_phase_seconds_count{{{labels}}} {h["count"]}')
+
+    gauges = [
+        ('scrape_cigars_found', 'Cigars priced per retailer.', lambda s: s.get('found')),
+        ('scrape_cigars_total', 'Cigars in the inventory per retailer.', lambda s: s.get('total')),
+        ('scrape_cigars_per_minute', 'Lookup throughput per retailer.',
+         lambda s: (s.get('progress') or {}).get('cigars_per_min')),
+        ('scrape_retailer_seconds', 'Wall time per retailer.', lambda s: (s.get('progress') or {}).get('seconds')),
+        ('scrape_cache_hits', 'Scrape cache hits per retailer.', lambda s: (s.get('cache') or {}).get('hits')),
+        ('scrape_cache_misses', 'Scrape cache misses per retailer.', lambda s: (s.get('cache') or {}).get('misses')),
+        ('scrape_cache_hit_ratio', 'Scrape cache hit rate per retailer.',
+         lambda s: (s.get('cache') or {}).get('hit_rate')),
+        ('scrape_circuit_open', '1 if the retailer circuit breaker tripped.', lambda s: int(bool(s.get('breaker')))),
+        ('scrape_first_lookup_seconds', 'Seconds from run start to the retailer\'s first lookup.',
+         lambda s: s.get('first_lookup_s')),
+    ]
+    for name, help_text, value in gauges:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for retailer, stats in retailer_stats.items():
+            v = value(stats)
+            if v is not None:
+                lines.append(f'{name}{{retailer="{_label(retailer)}"}} {v}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_reports(retailer_stats, directory='.', startup=None):
+    """Write scrape_metrics.json and scrape_metrics.prom into directory."""
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'buckets': list(BUCKETS),
+        'startup': startup or {},
+        'retailers': {
+            retailer: {k: stats.get(k) for k in ('found', 'total', 'reused', 'resumed', 'first_lookup_s', 'progress',
+                                                  'metrics', 'cache', 'hosts', 'resources', 'search_plan', 'breaker')
+                       if stats.get(k) is not None}
+            for retailer, stats in retailer_stats.items()
+        },
+    }
+
+    with open(os.path.join(directory, JSON_REPORT), 'w') as f:
+        json.dump(report, f, indent=2)
+    with open(os.path.join(directory, PROMETHEUS_REPORT), 'w') as f:
+        f.write(prometheus_text(retailer_stats))
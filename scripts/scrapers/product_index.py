@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Product Index
+=============
+Postings index over normalized product names, used to narrow a large
+product list (a full catalogue or brand listing) to the few products a
+cigar could possibly match before running the module's match_product().
+
+Two kinds of postings are kept:
+- word tokens (\\w+ runs) for exact-word rules such as roman numerals and years
+- character trigrams for the substring rules (brand, vitola and its
+  stem / vowel-swap variants)
+
+Lookups only ever narrow the list to a superset of the products that would
+pass the corresponding rule, and candidates come back in the original list
+order, so running match_product() over them gives exactly the decisions of
+a linear scan.
+
+Usage:
+    index = ProductIndex(products)
+    ids = index.intersect(index.containing_any([brand]), index.tokens_all(romans))
+    for product in index.select(ids):
+        is_match, reason = match_product(product, brand, cigar_name)
+"""
+
+import re
+from collections import defaultdict
+
+
+def trigrams(text):
+    """All character trigrams of a string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ProductIndex:
+    """Token and trigram postings over product[field]."""
+
+    def __init__(self, products, field='normalized'):
+        self.products = list(products)
+        self.field = field
+        self._tokens = defaultdict(set)
+        self._trigrams = defaultdict(set)
+
+        for i, product in enumerate(self.products):
+            name = product.get(field) or ''
+            for token in re.findall(r'\w+', name):
+                self._tokens[token].add(i)
+            for gram in trigrams(name):
+                self._trigrams[gram].add(i)
+
+    def __len__(self):
+        return len(self.products)
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def containing(self, text):
+        """Ids of products whose name contains text (None = no constraint)."""
+        if len(text) < 3:
+            # Too short to index - every product is a candidate
+            return None
+
+        postings = sorted((self._trigrams.get(g, set()) for g in trigrams(text)), key=len)
+        ids = set(postings[0])
+        for p in postings[1:]:
+            ids &= p
+            if not ids:
+                break
+
+        # Trigram hits are a superset - confirm the actual substring
+        return {i for i in ids if text in self.products[i][self.field]}
+
+    def containing_any(self, texts):
+        """Ids of products containing at least one of texts (None = no constraint)."""
+        ids = set()
+        for text in texts:
+            hits = self.containing(text)
+            if hits is None:
+                return None
+            ids |= hits
+        return ids
+
+    def tokens_all(self, tokens):
+        """Ids of products having every token as a whole word (None = no constraint)."""
+        ids = None
+        for token in tokens:
+            hits = self._tokens.get(token, set())
+            ids = set(hits) if ids is None else ids & hits
+        return ids
+
+    def tokens_any(self, tokens):
+        """Ids of products having at least one token as a whole word (None = no constraint)."""
+        if not tokens:
+            return None
+        ids = set()
+        for token in tokens:
+            ids |= self._tokens.get(token, set())
+        return ids
+
+    def intersect(self, *id_sets):
+        """Combine lookups - None entries add no constraint."""
+        ids = None
+        for s in id_sets:
+            if s is not None:
+                ids = set(s) if ids is None else ids & s
+        return ids
+
+    def select(self, ids):
+        """Products for ids in original list order (all products if ids is None)."""
+        if ids is None:
+            return list(self.products)
+        return [self.products[i] for i in sorted(ids)]
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Per-Host Rate Scheduler
+=======================
+Adaptive politeness for every request the scrapers make, replacing the
+random sleeps before each search and product fetch.
+
+Each host gets a token bucket. A request waits only when the bucket is
+empty, so an idle host is hit straight away. The bucket's rate adapts
+AIMD-style to what the host tells us:
+- fast successful responses add RATE_INCREASE requests/sec (up to MAX_RATE)
+- responses much slower than the host's usual latency scale the rate by
+  SLOW_DECREASE
+- 429/503 responses and timeouts scale it by THROTTLE_DECREASE and put the
+  host in a cooldown (Retry-After if given, otherwise doubling from
+  COOLDOWN up to MAX_COOLDOWN)
+
+Waits are per host: async callers sleep with asyncio.sleep and sync callers
+only block their own thread, so other hosts (other retailers' workers, or
+other tasks in the same event loop) keep going while one host cools down.
+
+Navigations are scheduled by readiness.goto()/goto_async() and plain HTTP
+requests by http_fetch.get(), so scrapers never call this directly.
+
+Replaying a HAR snapshot (SCRAPE_HAR=replay) never waits - no request
+reaches a host.
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+from scrapers import har
+
+
+# Requests/sec per host at the start of a run (override with SCRAPE_RATE)
+INITIAL_RATE = float(os.environ.get('SCRAPE_RATE', '1.5'))
+MIN_RATE = 0.1
+MAX_RATE = float(os.environ.get('SCRAPE_MAX_RATE', '6'))
+BURST = 2
+
+RATE_INCREASE = 0.1
+SLOW_DECREASE = 0.8
+THROTTLE_DECREASE = 0.5
+
+# A response is slow if it takes this long, or this many times the host's usual latency
+SLOW_SECONDS = 8.0
+SLOW_FACTOR = 2.5
+
+COOLDOWN = 10.0
+MAX_COOLDOWN = 120.0
+
+THROTTLE_STATUSES = (429, 503)
+
+# Fraction of each wait added at random, so requests don't tick like a metronome
+JITTER = 0.3
+
+
+class HostBucket:
+    """Token bucket and AIMD state for one host."""
+
+    def __init__(self, host):
+        self.host = host
+        self.rate = INITIAL_RATE
+        self.tokens = float(BURST)
+        self.updated = time.monotonic()
+        self.cooldown_until = 0.0
+        self.throttle_streak = 0
+        self.latency = None
+        self.failure_streak = 0
+        self.last_failure = ''
+        self.lock = threading.Lock()
+        self.counters = new_counters()
+
+    def _refill(self, now):
+        self.tokens = min(BURST, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(now, self.updated)
+
+    def reserve(self):
+        """Take a token, returning how long to wait (seconds) before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+
+            delay = max(0.0, self.cooldown_until - now) + max(0.0, -self.tokens) / self.rate
+            if har.REPLAY:
+                delay = 0.0
+            if delay:
+                delay *= 1 + random.uniform(0, JITTER)
+            self.counters['requests'] += 1
+            self.counters['waited'] += delay
+            return delay
+
+    def record(self, latency, status=None, error=None, retry_after=None):
+        """Adapt the rate to one request's outcome."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            timed_out = error is not None and 'timeout' in f"{type(error).__name__} {error}".lower()
+
+            if status in THROTTLE_STATUSES or timed_out or error is not None or (status or 0) >= 500:
+                self.failure_streak += 1
+                self.last_failure = str(error).split('\n')[0][:120] if error is not None else f"HTTP {status}"
+            else:
+                self.failure_streak = 0
+            
+            if status in THROTTLE_STATUSES or timed_out:
+                self.rate = max(MIN_RATE, self.rate * THROTTLE_DECREASE)
+                self.throttle_streak += 1
+                cooldown = retry_after or min(MAX_COOLDOWN, COOLDOWN * 2 ** (self.throttle_streak - 1))
+                self.cooldown_until = max(self.cooldown_until, now + cooldown)
+                # Nothing accrues while cooling down - one request may go when it ends
+                self.tokens = min(self.tokens, 1.0)
+                self.updated = self.cooldown_until
+                self.counters['timeouts' if timed_out else 'throttled'] += 1
+                self.counters['cooldown'] += cooldown
+                print(f"    {self.host}: {'timeout' if timed_out else status} - cooling down {cooldown:.0f}s, "
+                      f"rate {self.rate:.2f}/s")
+                return
+
+            if error is not None or (status or 0) >= 500:
+                self.rate = max(MIN_RATE, self.rate * SLOW_DECREASE)
+                self.counters['errors'] += 1
+                return
+
+            self.throttle_streak = 0
+            usual = self.latency
+            self.latency = latency if usual is None else 0.8 * usual + 0.2 * latency
+
+            if latency > SLOW_SECONDS or (usual and latency > usual * SLOW_FACTOR):
+                self.rate = max(MIN_RATE, self.rate * SLOW_DECREASE)
+                self.counters['slow'] += 1
+            else:
+                self.rate = min(MAX_RATE, self.rate + RATE_INCREASE)
+
+
+def new_counters():
+    return {'requests': 0, 'waited': 0.0, 'throttled': 0, 'timeouts': 0, 'errors': 0,
+            'slow': 0, 'cooldown': 0.0}
+
+
+_buckets = {}
+_lock = threading.Lock()
+
+
+def host_of(url):
+    """Host a URL's requests are scheduled under."""
+    return (urlparse(url).hostname or '').lower()
+
+
+def bucket(url):
+    """The HostBucket for a URL's host."""
+    host = host_of(url)
+    with _lock:
+        if host not in _buckets:
+            _buckets[host] = HostBucket(host)
+        return _buckets[host]
+
+
+def retry_after(headers):
+    """Seconds from a Retry-After header (None if absent or a date)."""
+    try:
+        value = {k.lower(): v for k, v in (headers or {}).items()}.get('retry-after')
+        return min(MAX_COOLDOWN, float(value)) if value else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def wait(url):
+    """Block this thread until the URL's host may be requested."""
+    delay = bucket(url).reserve()
+    if delay:
+        time.sleep(delay)
+
+
+async def wait_async(url):
+    """Async version of wait() - other tasks keep running meanwhile."""
+    delay = bucket(url).reserve()
+    if delay:
+        await asyncio.sleep(delay)
+
+
+def record(url, latency, status=None, error=None, headers=None):
+    """Feed one request's outcome back into its host's rate."""
+    bucket(url).record(latency, status, error, retry_after(headers) if status in THROTTLE_STATUSES else None)
+
+
+def failing_hosts(threshold):
+    """{host: (consecutive failed requests, last failure)} for hosts at or over threshold."""
+    with _lock:
+        buckets = list(_buckets.values())
+    return {b.host: (b.failure_streak, b.last_failure) for b in buckets if b.failure_streak >= threshold}
+
+
+def reset_counters():
+    """Start a fresh set of counters and failure streaks (rates are kept)."""
+    with _lock:
+        for b in _buckets.values():
+            b.counters = new_counters()
+            b.failure_streak = 0
+
+
+def stats():
+    """Per-host rate and counters for this process."""
+    with _lock:
+        buckets = list(_buckets.values())
+    return {
+        b.host: dict(b.counters,
+                     rate=round(b.rate, 2),
+                     waited=round(b.counters['waited'], 1),
+                     cooldown=round(b.counters['cooldown'], 1),
+                     latency_ms=round(b.latency * 1000) if b.latency else None)
+        for b in buckets if b.counters['requests']
+    }
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Page Readiness
+==============
+Event-driven waits that replace networkidle and fixed sleeps.
+
+Each scraper module declares what "ready" means for each of its page
+types in a READINESS dict:
+
+    READINESS = {
+        'search': {'selector': '.product-item'},
+        'product': {'selector': 'select, .price', 'timeout': 5000},
+        'price': {'text_change': '.price', 'timeout': 1000},
+        'product_json': {'response': r'/products/.+\\.json'},
+    }
+
+Rule keys:
+- wait_until: load state the navigation itself waits for (default
+  'domcontentloaded' - never 'networkidle', which hangs on long-polling
+  widgets)
+- selector: CSS selector that must be attached to the DOM
+- text_change: CSS selector whose text must differ from its text before
+  the action (used after select_option and similar)
+- response: regex a response URL must match (waited on around the action)
+- fallback: load state to wait for if the condition times out
+- timeout: milliseconds to wait for the condition (default 5000)
+- phase: run-metrics phase the navigation is timed under ('search',
+  'product' or 'json'; see metrics.py)
+
+Navigations return as soon as the condition holds. A condition that
+never holds is not an error - the caller parses whatever is on the page,
+as it did after the old fixed waits.
+
+goto() and goto_async() also pace every navigation through the per-host
+rate scheduler and report its latency and status back to it, report
+failed navigations to the running lookup (see lookup_status.py), and time
+navigation-to-ready into the rule's metrics phase.
+"""
+
+import re
+import time
+
+from scrapers import rate_scheduler, metrics, lookup_status
+
+
+DEFAULT_TIMEOUT = 5000
+NAVIGATION_TIMEOUT = 30000
+
+TEXT_CHANGED_JS = '''([sel, before]) => {
+    const el = document.querySelector(sel);
+    return !!el && el.textContent.trim() !== before;
+}'''
+
+TEXT_JS = '''(sel) => {
+    const el = document.querySelector(sel);
+    return el ? el.textContent.trim() : null;
+}'''
+
+
+def _outcome(response):
+    """(status, headers) of a navigation response for the rate scheduler."""
+    if response is None:
+        return None, None
+    try:
+        return response.status, response.headers
+    except Exception:
+        return None, None
+
+
+def _response_matcher(rule):
+    pattern = re.compile(rule['response'])
+    return lambda response: bool(pattern.search(response.url))
+
+
+# -- sync --------------------------------------------------------------------
+
+def wait_ready(page, rule, before=None):
+    """Wait for a rule's condition on a sync page. Returns True if it held."""
+    timeout = rule.get('timeout', DEFAULT_TIMEOUT)
+    try:
+        if rule.get('selector'):
+            page.wait_for_selector(rule['selector'], state='attached', timeout=timeout)
+        if rule.get('text_change'):
+            page.wait_for_function(TEXT_CHANGED_JS, arg=[rule['text_change'], before], timeout=timeout)
+        return True
+    except Exception:
+        if rule.get('fallback'):
+            try:
+                page.wait_for_load_state(rule['fallback'], timeout=timeout)
+            except Exception:
+                pass
+        return False
+
+
+def perform(page, rule, action):
+    """Run action() (a navigation, click or select) and wait until the page is ready."""
+    before = page.evaluate(TEXT_JS, rule['text_change']) if rule.get('text_change') else None
+
+    if rule.get('response'):
+        failed = []
+        try:
+            with page.expect_response(_response_matcher(rule), timeout=rule.get('timeout', DEFAULT_TIMEOUT)):
+                try:
+                    action()
+                except Exception as e:
+                    failed.append(e)
+        except Exception:
+            # No matching response in time - carry on like any other timeout
+            if not failed:
+                return False
+        if failed:
+            raise failed[0]
+    else:
+        action()
+    return wait_ready(page, rule, before)
+
+
+def goto(page, url, rule, timeout=NAVIGATION_TIMEOUT):
+    """Navigate a sync page and return once the page type's readiness rule holds."""
+    wait_until = rule.get('wait_until', 'domcontentloaded')
+    
+    started = []
+    
+    def navigate():
+        rate_scheduler.wait(url)
+        started.append(time.perf_counter())
+        try:
+            response = page.goto(url, wait_until=wait_until, timeout=timeout)
+        except Exception as e:
+            rate_scheduler.record(url, time.perf_counter() - started[0], error=e)
+            lookup_status.fetched(url, error=e)
+            raise
+        status, headers = _outcome(response)
+        rate_scheduler.record(url, time.perf_counter() - started[0], status, headers=headers)
+        lookup_status.fetched(url, status)
+    
+    try:
+        return perform(page, rule, navigate)
+    finally:
+        if started and rule.get('phase'):
+            metrics.observe(rule['phase'], time.perf_counter() - started[0])
+
+
+# -- async -------------------------------------------------------------------
+
+async def wait_ready_async(page, rule, before=None):
+    """Async version of wait_ready()."""
+    timeout = rule.get('timeout', DEFAULT_TIMEOUT)
+    try:
+        if rule.get('selector'):
+            await page.wait_for_selector(rule['selector'], state='attached', timeout=timeout)
+        if rule.get('text_change'):
+            await page.wait_for_function(TEXT_CHANGED_JS, arg=[rule['text_change'], before], timeout=timeout)
+        return True
+    except Exception:
+        if rule.get('fallback'):
+            try:
+                await page.wait_for_load_state(rule['fallback'], timeout=timeout)
+            except Exception:
+                pass
+        return False
+
+
+async def perform_async(page, rule, action):
+    """Async version of perform() - action is a coroutine function."""
+    before = await page.evaluate(TEXT_JS, rule['text_change']) if rule.get('text_change') else None
+
+    if rule.get('response'):
+        failed = []
+        try:
+            async with page.expect_response(_response_matcher(rule), timeout=rule.get('timeout', DEFAULT_TIMEOUT)):
+                try:
+                    await action()
+                except Exception as e:
+                    failed.append(e)
+        except Exception:
+            if not failed:
+                return False
+        if failed:
+            raise failed[0]
+    else:
+        await action()
+    return await wait_ready_async(page, rule, before)
+
+
+async def goto_async(page, url, rule, timeout=NAVIGATION_TIMEOUT):
+    """Async version of goto()."""
+    wait_until = rule.get('wait_until', 'domcontentloaded')
+    
+    started = []
+    
+    async def navigate():
+        await rate_scheduler.wait_async(url)
+        started.append(time.perf_counter())
+        try:
+            response = await page.goto(url, wait_until=wait_until, timeout=timeout)
+        except Exception as e:
+            rate_scheduler.record(url, time.perf_counter() - started[0], error=e)
+            lookup_status.fetched(url, error=e)
+            raise
+        status, headers = _outcome(response)
+        rate_scheduler.record(url, time.perf_counter() - started[0], status, headers=headers)
+        lookup_status.fetched(url, status)
+    
+    try:
+        return await perform_async(page, rule, navigate)
+    finally:
+        if started and rule.get('phase'):
+            metrics.observe(rule['phase'], time.perf_counter() - started[0])
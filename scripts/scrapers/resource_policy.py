@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Resource Policy
+===============
+Playwright request routing that keeps retailer pages down to what the
+scrapers actually read.
+
+The scrapers only need the HTML (and the JSON/inline scripts some pages
+carry), so by default every context aborts images, media, fonts and
+stylesheets, plus requests to known analytics, advertising and chat-widget
+hosts. Each scraper module describes its retailer in a RESOURCE_POLICY
+dict:
+
+    RESOURCE_POLICY = {
+        'retailer': 'JJ Fox',
+        'page_types': [('search', r'/search/'), ('product', r'.')],
+        'block_hosts': [...],   # extra hosts to abort (optional)
+        'allow_hosts': [...],   # hosts never aborted (optional)
+        'block_types': [...],   # replaces BLOCK_TYPES (optional)
+    }
+
+Every request is attributed to a page type (first pattern matching the
+URL of the page that issued it) and counted per retailer: requests made,
+requests blocked, bytes transferred and time to the load event of each
+page. SCRAPE_BLOCK_RESOURCES=0 turns blocking off but keeps the
+accounting, so the two runs can be compared.
+"""
+
+import os
+import re
+import time
+import threading
+from urllib.parse import urlparse
+
+
+BLOCK_RESOURCES = os.environ.get('SCRAPE_BLOCK_RESOURCES', '1') != '0'
+
+# Playwright resource types the scrapers never read
+BLOCK_TYPES = ['image', 'media', 'font', 'stylesheet']
+
+# Third-party hosts (analytics, ads, chat, reviews, consent) aborted everywhere
+BLOCK_HOSTS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googleadservices.com', 'googlesyndication.com', 'facebook.net',
+    'facebook.com', 'connect.facebook.net', 'hotjar.com', 'clarity.ms',
+    'bing.com', 'tiktok.com', 'pinterest.com', 'snapchat.com',
+    'klaviyo.com', 'tawk.to', 'zendesk.com', 'zopim.com', 'intercom.io',
+    'livechatinc.com', 'trustpilot.com', 'feefo.com', 'reviews.io',
+    'yotpo.com', 'cookiebot.com', 'onetrust.com', 'cookielaw.org',
+    'newrelic.com', 'nr-data.net', 'sentry.io', 'criteo.com',
+]
+
+DEFAULT_PAGE_TYPE = 'other'
+
+
+# Per-process accounting: (retailer, page type) -> counters
+_stats = {}
+_lock = threading.Lock()
+
+
+def _counters(retailer, page_type):
+    key = (retailer, page_type)
+    if key not in _stats:
+        _stats[key] = {'requests': 0, 'blocked': 0, 'bytes': 0, 'pages': 0, 'load_ms': 0.0,
+                       'blocked_by_type': {}}
+    return _stats[key]
+
+
+def host_matches(host, hosts):
+    """True if host is one of hosts or a subdomain of one."""
+    return any(host == h or host.endswith('.' + h) for h in hosts)
+
+
+def page_type(policy, url):
+    """Page type of a URL under a retailer's policy."""
+    for name, pattern in policy.get('page_types', []):
+        if re.search(pattern, url or ''):
+            return name
+    return DEFAULT_PAGE_TYPE
+
+
+def block_reason(policy, resource_type, url, is_navigation=False):
+    """Why a request should be aborted under a policy ('' to let it through)."""
+    if not BLOCK_RESOURCES or is_navigation:
+        return ''
+
+    host = urlparse(url).hostname or ''
+    if host_matches(host, policy.get('allow_hosts', [])):
+        return ''
+    if host_matches(host, BLOCK_HOSTS + list(policy.get('block_hosts', []))):
+        return 'host'
+    if resource_type in policy.get('block_types', BLOCK_TYPES):
+        return resource_type
+    return ''
+
+
+def _request_page_type(policy, request):
+    """Page type for a request - the navigation URL, or the URL of its frame."""
+    try:
+        if request.is_navigation_request():
+            return page_type(policy, request.url)
+        return page_type(policy, request.frame.url)
+    except Exception:
+        # Service worker requests have no frame
+        return DEFAULT_PAGE_TYPE
+
+
+def _record_blocked(retailer, kind, reason):
+    with _lock:
+        counters = _counters(retailer, kind)
+        counters['requests'] += 1
+        counters['blocked'] += 1
+        counters['blocked_by_type'][reason] = counters['blocked_by_type'].get(reason, 0) + 1
+
+
+def _record_finished(retailer, kind, sizes):
+    with _lock:
+        counters = _counters(retailer, kind)
+        counters['requests'] += 1
+        counters['bytes'] += sum(max(0, sizes.get(k, 0)) for k in ('responseBodySize', 'responseHeadersSize'))
+
+
+def _record_load(retailer, kind, started):
+    with _lock:
+        counters = _counters(retailer, kind)
+        counters['pages'] += 1
+        counters['load_ms'] += (time.perf_counter() - started) * 1000
+
+
+def install(context, policy):
+    """Route and account every request of a sync BrowserContext under a policy."""
+    if not policy:
+        return
+    retailer = policy['retailer']
+    nav_started = {}
+
+    def handle(route):
+        request = route.request
+        reason = block_reason(policy, request.resource_type, request.url, request.is_navigation_request())
+        if reason:
+            _record_blocked(retailer, _request_page_type(policy, request), reason)
+            route.abort()
+        else:
+            route.continue_()
+
+    def on_request(request):
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            nav_started[request.frame.page] = (page_type(policy, request.url), time.perf_counter())
+
+    def on_finished(request):
+        try:
+            sizes = request.sizes()
+        except Exception:
+            sizes = {}
+        _record_finished(retailer, _request_page_type(policy, request), sizes)
+
+    def on_page(page):
+        def on_load(_):
+            started = nav_started.pop(page, None)
+            if started:
+                _record_load(retailer, *started)
+        page.on('load', on_load)
+
+    context.route('**/*', handle)
+    context.on('request', on_request)
+    context.on('requestfinished', on_finished)
+    context.on('page', on_page)
+
+
+async def install_async(context, policy):
+    """Async counterpart of install() for an async_playwright BrowserContext."""
+    if not policy:
+        return
+    retailer = policy['retailer']
+    nav_started = {}
+
+    async def handle(route):
+        request = route.request
+        reason = block_reason(policy, request.resource_type, request.url, request.is_navigation_request())
+        if reason:
+            _record_blocked(retailer, _request_page_type(policy, request), reason)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def on_request(request):
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            nav_started[request.frame.page] = (page_type(policy, request.url), time.perf_counter())
+
+    async def on_finished(request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            sizes = {}
+        _record_finished(retailer, _request_page_type(policy, request), sizes)
+
+    def on_page(page):
+        def on_load(_):
+            started = nav_started.pop(page, None)
+            if started:
+                _record_load(retailer, *started)
+        page.on('load', on_load)
+
+    await context.route('**/*', handle)
+    context.on('request', on_request)
+    context.on('requestfinished', on_finished)
+    context.on('page', on_page)
+
+
+def stats(retailer):
+    """Accounting for one retailer in this process, by page type and in total."""
+    with _lock:
+        by_type = {kind: dict(c, blocked_by_type=dict(c['blocked_by_type']))
+                   for (name, kind), c in _stats.items() if name == retailer}
+
+    total = {'requests': 0, 'blocked': 0, 'bytes': 0, 'pages': 0, 'load_ms': 0.0}
+    for counters in by_type.values():
+        for k in total:
+            total[k] += counters[k]
+    for counters in by_type.values():
+        counters['avg_load_ms'] = round(counters['load_ms'] / counters['pages'], 1) if counters['pages'] else None
+    total['avg_load_ms'] = round(total['load_ms'] / total['pages'], 1) if total['pages'] else None
+    total['blocking'] = BLOCK_RESOURCES
+    total['by_page_type'] = by_type
+    return total
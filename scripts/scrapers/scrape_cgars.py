@@ -12,79 +12,164 @@ CGars product naming patterns:
 - "Brand Name - Cabinet of 25"
 
 Price format: "£1,234.00" or "1234.00"
+
+Crawl mode (default): every .product-listing-box on a listing page already
+carries name, price, box size and stock, so instead of one keyword search
+per search term per cigar we walk each brand's keyword listing (the brand
+name searched on its own, with pagination) once and match all of that
+brand's cigars against the resulting in-memory index. Cigars the brand
+listing doesn't surface (sub-brands, line names, other spellings) fall back
+to the per-cigar search terms. CGARS_CRAWL=0 uses per-cigar keyword search
+only.
 """
 
+import os
 import re
 import sys
-import time
-import random
 from urllib.parse import quote_plus
 
-def install(pkg):
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
+# Make the shared scrapers package importable when run standalone
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    install("playwright")
-    from playwright.sync_api import sync_playwright
+from scrapers import browser
+from scrapers import readiness
+from scrapers import metrics
+from scrapers.cache import ScrapeCache
+from scrapers.product_index import ProductIndex
+from scrapers.matching import (
+    match_rules, normalize_name, get_stem, extract_box_size, match_signature, romans, years, words, word_stems
+)
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    install("beautifulsoup4")
-    from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup
 
-try:
-    import requests
-except ImportError:
-    install("requests")
-    import requests
+from scrapers import html_parser
 
 
 # Module state
-_playwright = None
-_browser = None
 _context = None
 _page = None
-_cache = {}
+_cache = ScrapeCache()
+
+# Term -> shared query from the orchestrator's search plan
+_search_aliases = {}
+
+# Browser context settings (shared by the sync page and the async engine)
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+}
+
+# Requests to abort and how to label pages for byte accounting (see resource_policy.py)
+RESOURCE_POLICY = {
+    'retailer': 'CGars',
+    'page_types': [
+        ('search', r'advanced_search_result'),
+        ('product', r'.'),
+    ],
+}
+
+# What "loaded" means per page type (see readiness.py)
+READINESS = {
+    'listing': {'selector': '.product-listing-box', 'phase': 'search'},
+}
+
+# Page parts each parser reads - the rest of the page is never parsed (see html_parser.py)
+SUBTREES = {
+    'search': '.product-listing-box',
+    'listing': '.product-listing-box, a[href*="page="]',
+}
+
+# Pages in flight at once in async mode
+CONCURRENCY = 3
+
+# Preflight canary: a known search (or brand listing) that must return
+# products that parse (see preflight())
+CANARY_TERM = 'Montecristo'
+
+# Name noise and box-size forms on CGars product names, most explicit first
+MATCH_RULES = match_rules(
+    noise=(
+        r'\s*-?\s*box\s*of\s*\d+',
+        r'\s*-?\s*cabinet\s*of\s*\d+',
+        r'\s*-?\s*slb\s*\d*',
+        r'\s*-?\s*vslb\s*\d*',
+        r'\s*\(\d+\)',
+        r'\s*-\s*\d+\s*cigars?',
+    ),
+    box_patterns=(
+        r'box\s*of\s*(\d+)',
+        r'cabinet\s*of\s*(\d+)',
+        r'-\s*cabinet\s*of\s*(\d+)',
+        r'slb\s*of\s*(\d+)',
+        r'vslb\s*of\s*(\d+)',
+        r'slb\s*(\d+)',
+        r'vslb\s*(\d+)',
+        r'-\s*box\s*(\d+)',
+        r'(\d+)\s*box',
+        r'\(box\s*of\s*(\d+)\)',
+        r'\((\d+)\s*cigars?\)',
+        r'\((\d+)\)',
+        r'-\s*(\d+)\s*cigars?',
+        r'(\d+)\s*cigars?\s*(?:box|cab)',
+        r'pack\s*of\s*(\d+)',
+        r'-\s*pack\s*of\s*(\d+)',
+    ),
+    single=r'\bsingle\b|individual|\b1\s*cigar',
+)
+
+# Walk brand listing pages once instead of searching per cigar
+CRAWL_MODE = os.environ.get('CGARS_CRAWL', '1') != '0'
+CRAWL_MAX_PAGES = 30
+
+# Listing index for this run (brand -> ProductIndex)
+_listings = {}
+
+# Brands whose listing crawl hit an error this run (their index may be partial)
+_failed_listings = set()
 
 
 def init():
     """Initialize the browser for this scraper."""
-    global _playwright, _browser, _context, _page
+    global _context, _page
     if _page:
         return
     
-    print("  Starting browser...")
-    _playwright = sync_playwright().start()
-    
-    _browser = _playwright.chromium.launch(
-        headless=True,
-        args=['--disable-blink-features=AutomationControlled', '--no-sandbox']
-    )
+    print("  Opening browser context...")
     
-    _context = _browser.new_context(
-        viewport={'width': 1920, 'height': 1080},
-        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    )
-    
-    _page = _context.new_page()
-    print("  Browser ready")
+    try:
+        # Own context on the shared browser - keeps this retailer's fingerprint
+        _context = browser.new_context(CONTEXT_OPTIONS, resource_policy=RESOURCE_POLICY)
+        _page = _context.new_page()
+        print("  Browser ready")
+    except Exception as e:
+        print(f"  Browser init error: {e}")
+        raise
 
 
 def cleanup():
     """Clean up browser resources."""
-    global _playwright, _browser, _context, _page
-    try:
-        if _browser:
-            _browser.close()
-        if _playwright:
-            _playwright.stop()
-    except:
-        pass
-    _playwright = _browser = _context = _page = None
+    global _context, _page
+    if _context:
+        browser.close_context(_context)
+    _context = _page = None
+
+
+def create_engine():
+    """Create an async page-pool engine configured like init()'s context."""
+    from scrapers.async_engine import AsyncEngine
+    return AsyncEngine(
+        concurrency=CONCURRENCY,
+        context_options=CONTEXT_OPTIONS,
+        resource_policy=RESOURCE_POLICY,
+    )
+
+
+def set_search_plan(aliases):
+    """Route search terms through the orchestrator's inventory-wide search plan."""
+    _search_aliases.clear()
+    _search_aliases.update(aliases)
 
 
 def parse_price(price_str):
@@ -107,78 +192,6 @@ def parse_price(price_str):
     return None
 
 
-def extract_box_size(text):
-    """
-    Extract box size from product name with strict patterns.
-    Returns None if no clear box size found.
-    """
-    t = text.lower()
-    
-    # Explicit box patterns (most reliable)
-    patterns = [
-        (r'box\s*of\s*(\d+)', 'box of N'),
-        (r'cabinet\s*of\s*(\d+)', 'cabinet of N'),
-        (r'-\s*cabinet\s*of\s*(\d+)', '- cabinet of N'),
-        (r'slb\s*of\s*(\d+)', 'SLB of N'),
-        (r'vslb\s*of\s*(\d+)', 'VSLB of N'),
-        (r'slb\s*(\d+)', 'SLB N'),
-        (r'vslb\s*(\d+)', 'VSLB N'),
-        (r'-\s*box\s*(\d+)', '- box N'),
-        (r'(\d+)\s*box', 'N box'),
-        (r'\(box\s*of\s*(\d+)\)', '(box of N)'),
-        (r'\((\d+)\s*cigars?\)', '(N cigars)'),
-        (r'\((\d+)\)', '(N)'),  # Only if clearly at end of product name
-        (r'-\s*(\d+)\s*cigars?', '- N cigars'),
-        (r'(\d+)\s*cigars?\s*(?:box|cab)', 'N cigars box'),
-        (r'pack\s*of\s*(\d+)', 'pack of N'),
-        (r'-\s*pack\s*of\s*(\d+)', '- pack of N'),
-    ]
-    
-    for pattern, desc in patterns:
-        match = re.search(pattern, t)
-        if match:
-            size = int(match.group(1))
-            # Valid Cuban cigar box sizes
-            if size in [3, 5, 8, 10, 15, 18, 20, 25, 50]:
-                return size
-            # Also accept other reasonable sizes
-            if 3 <= size <= 50:
-                return size
-    
-    # Check for "single" or "1 cigar"
-    if re.search(r'\bsingle\b|individual|\b1\s*cigar', t):
-        return 1
-    
-    return None
-
-
-def normalize_name(text):
-    """Normalize product/cigar name for comparison."""
-    # Remove box size info and common suffixes
-    t = text.lower()
-    t = re.sub(r'\s*-?\s*box\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*cabinet\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*slb\s*\d*', '', t)
-    t = re.sub(r'\s*-?\s*vslb\s*\d*', '', t)
-    t = re.sub(r'\s*\(\d+\)', '', t)
-    t = re.sub(r'\s*-\s*\d+\s*cigars?', '', t)
-    t = re.sub(r'[^\w\s]', ' ', t)
-    return ' '.join(t.split())
-
-
-def get_stem(word):
-    """Get word stem by removing common endings."""
-    w = word.lower().strip()
-    # Spanish/cigar-specific endings
-    if w.endswith('os'):
-        return w[:-1]  # robustos -> robusto
-    if w.endswith('es') and len(w) > 3:
-        return w[:-1]  # brillantes -> brillante
-    if w.endswith('s') and len(w) > 3:
-        return w[:-1]  # cigars -> cigar
-    return w
-
-
 def get_search_terms(brand, name):
     """Generate search terms from most to least specific."""
     terms = []
@@ -217,80 +230,226 @@ def get_search_terms(brand, name):
     return terms
 
 
+def search_url(term):
+    """Search results URL for a term."""
+    return f"https://www.cgarsltd.co.uk/advanced_search_result.php?keywords={quote_plus(term)}"
+
+
+def brand_listing_url(brand, page_num=1):
+    """Keyword listing page URL for a brand."""
+    url = search_url(brand)
+    if page_num > 1:
+        url += f"&page={page_num}"
+    return url
+
+
+def has_next_page(soup):
+    """True if a listing page links to a following page."""
+    for link in soup.select('a[href*="page="]'):
+        label = f"{link.get('title', '')} {link.get_text()}".lower()
+        if 'next' in label or '>>' in label:
+            return True
+    return False
+
+
+@metrics.timed('parse')
+def parse_listing_page(html):
+    """Parse a listing page into (products, has_next)."""
+    soup = html_parser.parse(html, SUBTREES['listing'])
+    return parse_search_results(soup), has_next_page(soup)
+
+
+@metrics.timed('parse')
+def parse_search_results(html):
+    """Parse .product-listing-box entries from a listing/search page (HTML or soup)."""
+    products = []
+    soup = html if isinstance(html, BeautifulSoup) else html_parser.parse(html, SUBTREES['search'])
+    
+    for box in soup.select('.product-listing-box'):
+        try:
+            name_el = box.select_one('.product-name')
+            # Try both price selectors
+            price_el = box.select_one('.now_price') or box.select_one('.new_price')
+            # Get product URL
+            link_el = box.select_one('a[href]')
+            
+            if not name_el:
+                continue
+            
+            name = name_el.get_text(strip=True)
+            price = parse_price(price_el.get_text() if price_el else '')
+            url = link_el.get('href', '') if link_el else ''
+            
+            # Check stock status
+            box_text = box.get_text().lower()
+            in_stock = 'sold out' not in box_text and 'out of stock' not in box_text
+            
+            # Skip non-cigar products
+            skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'case', 
+                          'holder', 'pouch', 'sampler', 'gift', 'accessory']
+            if any(w in name.lower() for w in skip_words):
+                continue
+            
+            # Extract box size
+            box_size = extract_box_size(name, MATCH_RULES)
+            
+            if name and price and price > 20:
+                products.append({
+                    'name': name,
+                    'price': price,
+                    'box_size': box_size,
+                    'normalized': normalize_name(name, MATCH_RULES),
+                    'url': url,
+                    'in_stock': in_stock
+                })
+        except Exception as e:
+            continue
+    
+    return products
+
+
 def search_products(term):
     """Search CGars for products matching term."""
+    term = _search_aliases.get(term, term)
     cache_key = f"cgars:{term}"
     if cache_key in _cache:
         return _cache[cache_key]
     
-    url = f"https://www.cgarsltd.co.uk/advanced_search_result.php?keywords={quote_plus(term)}"
+    url = search_url(term)
     products = []
     
     try:
-        # Add small delay to be polite
-        time.sleep(random.uniform(0.5, 1.0))
-        
         init()  # Ensure browser is ready
-        _page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        readiness.goto(_page, url, READINESS['listing'])
         
-        # Wait for products to load
-        try:
-            _page.wait_for_selector('.product-listing-box', timeout=5000)
-        except:
-            pass
-        
-        html = _page.content()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        for box in soup.select('.product-listing-box'):
-            try:
-                name_el = box.select_one('.product-name')
-                # Try both price selectors
-                price_el = box.select_one('.now_price') or box.select_one('.new_price')
-                # Get product URL
-                link_el = box.select_one('a[href]')
-                
-                if not name_el:
-                    continue
-                
-                name = name_el.get_text(strip=True)
-                price = parse_price(price_el.get_text() if price_el else '')
-                url = link_el.get('href', '') if link_el else ''
-                
-                # Check stock status
-                box_text = box.get_text().lower()
-                in_stock = 'sold out' not in box_text and 'out of stock' not in box_text
-                
-                # Skip non-cigar products
-                skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'case', 
-                              'holder', 'pouch', 'sampler', 'gift', 'accessory']
-                if any(w in name.lower() for w in skip_words):
-                    continue
-                
-                # Extract box size
-                box_size = extract_box_size(name)
-                
-                if name and price and price > 20:
-                    products.append({
-                        'name': name,
-                        'price': price,
-                        'box_size': box_size,
-                        'normalized': normalize_name(name),
-                        'url': url,
-                        'in_stock': in_stock
-                    })
-            except Exception as e:
-                continue
+        products = parse_search_results(_page.content())
         
         print(f"    CGars '{term}': {len(products)} products")
         
     except Exception as e:
         print(f"    CGars search error: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, products)
+        return products
     
     _cache[cache_key] = products
     return products
 
 
+async def search_products_async(engine, term):
+    """Async version of search_products() using a page from the engine pool."""
+    term = _search_aliases.get(term, term)
+    cache_key = f"cgars:{term}"
+    
+    async def fetch():
+        products = []
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, search_url(term), READINESS['listing'])
+                html = await page.content()
+            
+            products = parse_search_results(html)
+            print(f"    CGars '{term}': {len(products)} products")
+        except Exception as e:
+            print(f"    CGars search error: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, products)
+            return products
+        
+        _cache[cache_key] = products
+        return products
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+def fetch_listing_page(brand, page_num):
+    """Fetch one brand listing page through the browser. Returns (products, has_next)."""
+    cache_key = f"cgars_brand:{brand.lower()}:{page_num}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    init()
+    readiness.goto(_page, brand_listing_url(brand, page_num), READINESS['listing'])
+    
+    result = parse_listing_page(_page.content())
+    _cache[cache_key] = result
+    return result
+
+
+def add_listing(index, products):
+    """Add listing products to a brand index, skipping duplicates seen on earlier pages."""
+    seen = {(p['url'], p['name']) for p in index}
+    for p in products:
+        if (p['url'], p['name']) not in seen:
+            seen.add((p['url'], p['name']))
+            index.append(p)
+
+
+def load_brand_listing(brand):
+    """Crawl every listing page for a brand once per run and return its product index."""
+    key = brand.lower()
+    if key in _listings:
+        return _listings[key]
+    
+    index = []
+    pages = 0
+    try:
+        for page_num in range(1, CRAWL_MAX_PAGES + 1):
+            products, has_next = fetch_listing_page(brand, page_num)
+            pages += 1
+            add_listing(index, products)
+            if not has_next or not products:
+                break
+    except Exception as e:
+        print(f"    CGars listing error for {brand}: {e}")
+        _failed_listings.add(key)
+    
+    print(f"    CGars '{brand}' listing: {len(index)} products from {pages} pages")
+    _listings[key] = ProductIndex(index)
+    return _listings[key]
+
+
+async def fetch_listing_page_async(engine, brand, page_num):
+    """Async version of fetch_listing_page()."""
+    cache_key = f"cgars_brand:{brand.lower()}:{page_num}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    async with engine.page() as page:
+        await readiness.goto_async(page, brand_listing_url(brand, page_num), READINESS['listing'])
+        html = await page.content()
+    
+    result = parse_listing_page(html)
+    _cache[cache_key] = result
+    return result
+
+
+async def load_brand_listing_async(engine, brand):
+    """Async version of load_brand_listing() - concurrent cigars of a brand share one crawl."""
+    key = brand.lower()
+    
+    async def fetch():
+        index = []
+        pages = 0
+        try:
+            for page_num in range(1, CRAWL_MAX_PAGES + 1):
+                products, has_next = await fetch_listing_page_async(engine, brand, page_num)
+                pages += 1
+                add_listing(index, products)
+                if not has_next or not products:
+                    break
+        except Exception as e:
+            print(f"    CGars listing error for {brand}: {e}")
+            _failed_listings.add(key)
+        
+        print(f"    CGars '{brand}' listing: {len(index)} products from {pages} pages")
+        _listings[key] = ProductIndex(index)
+        return _listings[key]
+    
+    return await engine.cached(_listings, key, fetch)
+
+
+@metrics.timed('match')
 def match_product(product, brand, cigar_name, target_box_size):
     """
     Check if product matches the cigar we're looking for.
@@ -298,97 +457,55 @@ def match_product(product, brand, cigar_name, target_box_size):
     """
     prod_name = product['normalized']
     prod_box = product['box_size']
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
     
     # STRICT BOX SIZE CHECK
     if prod_box is not None:
         if prod_box != target_box_size:
             return False, f"box mismatch ({prod_box} vs {target_box_size})"
     
-    # Brand must be present
-    brand_lower = brand.lower()
-    if brand_lower not in prod_name:
-        # Try common brand variations
-        brand_variants = {
-            'montecristo': ['monte cristo', 'monte-cristo'],
-            'romeo y julieta': ['romeo', 'ryj'],
-            'hoyo de monterrey': ['hoyo'],
-            'por larranaga': ['por larrañaga'],
-            'san cristobal': ['san cristóbal'],
-            'ramon allones': ['ramón allones'],
-        }
-        found_brand = False
-        for variant_list in brand_variants.get(brand_lower, []):
-            if variant_list in prod_name:
-                found_brand = True
-                break
-        if not found_brand and brand_lower.split()[0] not in prod_name:
-            return False, "brand not found"
-    
-    # Cigar name matching
-    cigar_lower = cigar_name.lower()
-    cigar_normalized = normalize_name(cigar_lower)
-    
-    # Check for key words from cigar name
-    key_words = [w for w in cigar_normalized.split() if len(w) > 2]
+    # Brand must be present (full name, a common variation, or its first word)
+    if not any(form in prod_name for form in sig.brand_forms) and sig.brand_first not in prod_name:
+        return False, "brand not found"
     
     # Roman numerals are critical - must match exactly
-    roman_pattern = r'\b(i{1,3}|iv|v|vi{1,3}|ix|x{1,3})\b'
-    cigar_romans = set(re.findall(roman_pattern, cigar_lower))
-    prod_romans = set(re.findall(roman_pattern, prod_name))
-    
     # If cigar name has roman numerals, product must have matching ones
-    if cigar_romans:
+    if sig.romans:
+        prod_romans = romans(prod_name)
         if not prod_romans:
-            return False, f"missing roman numeral (expected {cigar_romans})"
-        if cigar_romans != prod_romans:
-            return False, f"roman numeral mismatch ({cigar_romans} vs {prod_romans})"
+            return False, f"missing roman numeral (expected {set(sig.romans)})"
+        if sig.romans != prod_romans:
+            return False, f"roman numeral mismatch ({set(sig.romans)} vs {set(prod_romans)})"
     
     # Check for year numbers (1935, etc)
-    year_pattern = r'\b(19\d{2}|20\d{2})\b'
-    cigar_years = set(re.findall(year_pattern, cigar_lower))
-    prod_years = set(re.findall(year_pattern, prod_name))
-    
-    if cigar_years:
-        if not cigar_years.intersection(prod_years):
-            return False, f"year mismatch ({cigar_years} vs {prod_years})"
+    if sig.years:
+        prod_years = years(prod_name)
+        if not sig.years.intersection(prod_years):
+            return False, f"year mismatch ({set(sig.years)} vs {set(prod_years)})"
     
     # Key words matching - the last word (vitola name) is most important
-    if key_words:
+    if sig.key_words:
         # Last word is typically the vitola name (Maestros, Robusto, etc) - must match
-        last_word = key_words[-1]
-        last_word_stem = get_stem(last_word)
-        
-        # Check if last word or its stem is in product name
-        last_word_found = False
-        if last_word in prod_name or last_word_stem in prod_name:
-            last_word_found = True
-        else:
-            # Check each word in product name for stem match
-            for pw in prod_name.split():
-                pw_stem = get_stem(pw)
-                if last_word_stem == pw_stem or last_word in pw or pw in last_word:
-                    last_word_found = True
-                    break
+        last_word = sig.key_words[-1]
+        last_word_stem = sig.key_stems[-1]
         
+        # Check if last word or its stem is in product name, or any product
+        # word shares its stem / contains it / is contained in it
+        last_word_found = (
+            last_word in prod_name or last_word_stem in prod_name
+            or last_word_stem in word_stems(prod_name)
+            or any(last_word in pw or pw in last_word for pw in words(prod_name))
+        )
         if not last_word_found:
             return False, f"vitola mismatch (expected '{last_word}')"
         
         # Also need at least one other key word to match (if there are multiple)
-        if len(key_words) > 1:
-            other_matched = False
-            for word in key_words[:-1]:
-                word_stem = get_stem(word)
-                if word in prod_name or word_stem in prod_name:
-                    other_matched = True
-                    break
-                for pw in prod_name.split():
-                    pw_stem = get_stem(pw)
-                    if word_stem == pw_stem:
-                        other_matched = True
-                        break
-                if other_matched:
-                    break
-            
+        if len(sig.key_words) > 1:
+            prod_stems = word_stems(prod_name)
+            other_matched = any(
+                word in prod_name or stem in prod_name or stem in prod_stems
+                for word, stem in zip(sig.key_words[:-1], sig.key_stems[:-1])
+            )
             if not other_matched:
                 return False, "no other key words matched"
     
@@ -396,6 +513,73 @@ def match_product(product, brand, cigar_name, target_box_size):
     return True, "matched"
 
 
+def candidate_products(index, brand, cigar_name):
+    """
+    Products from a ProductIndex that could pass match_product(), in index order.
+    
+    Narrows by the brand (or a known variation), roman numerals and years;
+    the result is always a superset of the matches.
+    """
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
+    
+    # The full brand contains its first word, so first word + variations covers the brand check
+    ids = index.containing_any((sig.brand_first,) + sig.brand_forms[1:])
+    ids = index.intersect(ids, index.tokens_all(sig.romans), index.tokens_any(sig.years))
+    
+    return index.select(ids)
+
+
+def find_match(products, brand, cigar_name, box_size, log_rejections=True):
+    """Return a scrape() result for the first matching product, or None."""
+    for product in products:
+        is_match, reason = match_product(product, brand, cigar_name, box_size)
+        
+        if is_match:
+            return {
+                'price': product['price'],
+                'box_size': product['box_size'],
+                'product_name': product['name'],
+                'retailer': 'CGars',
+                'url': product.get('url', ''),
+                'in_stock': product.get('in_stock', True)
+            }
+        elif log_rejections:  # Log rejection reasons for debugging
+            print(f"      Rejected '{product['name'][:50]}...' - {reason}")
+    
+    return None
+
+
+def match_listing(listing, brand, cigar_name, box_size):
+    """
+    Match a cigar against its brand's crawled listing.
+    
+    Returns (result, search): search is True when the keyword searches
+    should still run - the crawl failed, or nothing in the listing is this
+    cigar at any box size (one the brand listing doesn't surface). A cigar
+    listed only in other box sizes isn't searched for again.
+    """
+    candidates = candidate_products(listing, brand, cigar_name)
+    result = find_match(candidates, brand, cigar_name, box_size, log_rejections=False)
+    if result:
+        return result, False
+    if not listing or brand.lower() in _failed_listings:
+        return None, True
+    # Box size taken from each product, so only brand and name are compared
+    listed = any(match_product(p, brand, cigar_name, p['box_size'])[0] for p in candidates)
+    return None, not listed
+
+
+def preflight():
+    """Canary run before any cigar: '' if listing parsing works, else the reason."""
+    # Listing boxes carry the price, so products parsed means prices parsed
+    if CRAWL_MODE:
+        if not len(load_brand_listing(CANARY_TERM)):
+            return f"'{CANARY_TERM}' listing returned no priced products"
+    elif not search_products(CANARY_TERM):
+        return f"search '{CANARY_TERM}' returned no priced products"
+    return ''
+
+
 def scrape(brand, cigar_name, box_size):
     """
     Main entry point: Find price for a specific cigar.
@@ -408,25 +592,46 @@ def scrape(brand, cigar_name, box_size):
     Returns:
         dict with 'price' and 'box_size' if found, or None
     """
+    if CRAWL_MODE:
+        # Keyword searches only if the crawl failed or the listing doesn't have the cigar
+        result, search = match_listing(load_brand_listing(brand), brand, cigar_name, box_size)
+        if not search:
+            return result
+    
     search_terms = get_search_terms(brand, cigar_name)
     
     for term in search_terms:
-        products = search_products(term)
-        
-        for product in products:
-            is_match, reason = match_product(product, brand, cigar_name, box_size)
-            
-            if is_match:
-                return {
-                    'price': product['price'],
-                    'box_size': product['box_size'],
-                    'product_name': product['name'],
-                    'retailer': 'CGars',
-                    'url': product.get('url', ''),
-                    'in_stock': product.get('in_stock', True)
-                }
-            elif products:  # Log first rejection reason for debugging
-                print(f"      Rejected '{product['name'][:50]}...' - {reason}")
+        result = find_match(search_products(term), brand, cigar_name, box_size)
+        if result:
+            return result
+    
+    return None
+
+
+async def preflight_async(engine):
+    """Async version of preflight()."""
+    if CRAWL_MODE:
+        if not len(await load_brand_listing_async(engine, CANARY_TERM)):
+            return f"'{CANARY_TERM}' listing returned no priced products"
+    elif not await search_products_async(engine, CANARY_TERM):
+        return f"search '{CANARY_TERM}' returned no priced products"
+    return ''
+
+
+async def scrape_async(engine, brand, cigar_name, box_size):
+    """Async version of scrape()."""
+    if CRAWL_MODE:
+        listing = await load_brand_listing_async(engine, brand)
+        result, search = match_listing(listing, brand, cigar_name, box_size)
+        if not search:
+            return result
+    
+    search_terms = get_search_terms(brand, cigar_name)
+    
+    for term in search_terms:
+        result = find_match(await search_products_async(engine, term), brand, cigar_name, box_size)
+        if result:
+            return result
     
     return None
 
@@ -9,76 +9,146 @@ box size options with individual prices and stock status.
 
 URL pattern: /?post_type=product&s=term
 Product variants in: .product-feature divs
+
+Catalogue mode (default): the site is WooCommerce, so the whole catalogue
+is pulled as JSON from the Store API (/wp-json/wc/store/v1/products, plus
+type=variation for box-size prices and stock) with plain HTTP requests
+(see woocommerce.py).
+Lookups are answered from the resulting index without opening a browser
+or parsing page text. CIGARCLUB_CATALOGUE=0 restores search mode, which is
+also the fallback if the API can't be read.
 """
 
+import os
 import re
 import sys
-import time
-import random
+import asyncio
 from urllib.parse import quote_plus
 
-def install(pkg):
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
+# Make the shared scrapers package importable when run standalone
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from scrapers import browser
+from scrapers import readiness
+from scrapers import metrics
+from scrapers import woocommerce
+from scrapers.cache import ScrapeCache
+from scrapers.product_index import ProductIndex
+from scrapers.matching import (
+    match_rules, normalize_name, get_stem, extract_box_size, match_signature, romans, key_word_matches
+)
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    install("playwright")
-    from playwright.sync_api import sync_playwright
+from scrapers import html_parser
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    install("beautifulsoup4")
-    from bs4 import BeautifulSoup
 
 
 # Module state
-_playwright = None
-_browser = None
 _context = None
 _page = None
-_cache = {}
+_cache = ScrapeCache()
+
+# Term -> shared query from the orchestrator's search plan
+_search_aliases = {}
+
+# Browser context settings (shared by the sync page and the async engine)
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'locale': 'en-GB',
+    'timezone_id': 'Europe/London',
+}
+
+# Hide webdriver property
+INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    window.chrome = { runtime: {} };
+"""
 
+# Requests to abort and how to label pages for byte accounting (see resource_policy.py)
+RESOURCE_POLICY = {
+    'retailer': 'Cigar Club',
+    'page_types': [
+        ('search', r'[?&]s='),
+        ('product', r'/product/'),
+    ],
+}
+
+# What "loaded" means per page type (see readiness.py). A search can
+# redirect straight to the product page, so 'search' accepts either.
+READINESS = {
+    'search': {'selector': 'li.product, .products li, .product-feature, .product-features', 'phase': 'search'},
+    'product': {'selector': '.product-feature, .product-features, .price', 'timeout': 8000, 'fallback': 'load',
+                'phase': 'product'},
+}
+
+# Page parts each parser reads - the rest of the page is never parsed (see html_parser.py)
+# Product pages are read as a whole (prices are also found in the page text).
+SUBTREES = {
+    'search': 'li.product',
+    'direct': 'h1',
+}
+
+# Pages in flight at once in async mode
+CONCURRENCY = 3
+
+# Preflight canary: a known search (or brand listing) that must return
+# products that parse (see preflight())
+CANARY_TERM = 'Montecristo'
+
+# Name noise and box-size forms on Cigar Club product and variant names
+MATCH_RULES = match_rules(
+    noise=(
+        r'\s*-?\s*box\s*of\s*\d+',
+        r'\s*-?\s*cabinet\s*of?\s*\d+',
+        r'\s*-?\s*pack\s*of\s*\d+',
+        r'\s*\(\d+\)',
+        r'\s*-\s*\d+s?\s*$',
+    ),
+    box_patterns=(
+        r'box\s*of\s*(\d+)',
+        r'cabinet\s*of\s*(\d+)',
+        r'pack\s*of\s*(\d+)',
+        r'(\d+)s\b',
+        r'-\s*(\d+)\s*$',
+    ),
+    single='single',
+    single_unless='tube',
+)
 
-def init():
-    """Initialize the browser with stealth settings."""
-    global _playwright, _browser, _context, _page
-    if _page:
+BASE_URL = "https://www.cigar-club.com"
+
+# Answer lookups from the Store API catalogue instead of searching
+CATALOGUE_MODE = os.environ.get('CIGARCLUB_CATALOGUE', '1') != '0'
+
+# Words that mark a product as an accessory rather than cigars
+SKIP_WORDS = ['humidor', 'ashtray', 'cutter', 'lighter', 'case', 'holder',
+              'pouch', 'gift', 'accessory']
+
+# Catalogue index for this run ({'products': ProductIndex} once loaded)
+_catalogue = {}
+
+
+def init(force=False):
+    """
+    Initialize the browser with stealth settings.
+    
+    In catalogue mode the browser is only opened once a lookup has to fall
+    back to search (force=True).
+    """
+    global _context, _page
+    if _page or (CATALOGUE_MODE and not force):
         return
     
-    print("  Starting browser...")
+    print("  Opening browser context...")
     
     try:
-        _playwright = sync_playwright().start()
-        
-        _browser = _playwright.chromium.launch(
-            headless=True,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-            ]
-        )
-        
-        _context = _browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            locale='en-GB',
-            timezone_id='Europe/London',
-        )
-        
+        # Own context on the shared browser - keeps this retailer's fingerprint
+        _context = browser.new_context(CONTEXT_OPTIONS, INIT_SCRIPT, RESOURCE_POLICY)
         _page = _context.new_page()
-        
-        # Hide webdriver property
-        _page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            window.chrome = { runtime: {} };
-        """)
-        
         print("  Browser ready")
     except Exception as e:
         print(f"  Browser init error: {e}")
@@ -87,15 +157,28 @@ def init():
 
 def cleanup():
     """Clean up browser resources."""
-    global _playwright, _browser, _context, _page
-    try:
-        if _browser:
-            _browser.close()
-        if _playwright:
-            _playwright.stop()
-    except:
-        pass
-    _playwright = _browser = _context = _page = None
+    global _context, _page
+    if _context:
+        browser.close_context(_context)
+    _context = _page = None
+
+
+def create_engine():
+    """Create an async page-pool engine configured like init()'s context."""
+    from scrapers.async_engine import AsyncEngine
+    return AsyncEngine(
+        concurrency=CONCURRENCY,
+        context_options=CONTEXT_OPTIONS,
+        init_script=INIT_SCRIPT,
+        resource_policy=RESOURCE_POLICY,
+        lazy=CATALOGUE_MODE,
+    )
+
+
+def set_search_plan(aliases):
+    """Route search terms through the orchestrator's inventory-wide search plan."""
+    _search_aliases.clear()
+    _search_aliases.update(aliases)
 
 
 def parse_price(price_str):
@@ -110,56 +193,6 @@ def parse_price(price_str):
     return None
 
 
-def extract_box_size(text):
-    """Extract box size from variant name."""
-    t = text.lower().strip()
-    
-    # Explicit patterns
-    patterns = [
-        r'box\s*of\s*(\d+)',
-        r'cabinet\s*of\s*(\d+)',
-        r'pack\s*of\s*(\d+)',
-        r'(\d+)s\b',
-        r'-\s*(\d+)\s*$',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, t)
-        if match:
-            size = int(match.group(1))
-            if 3 <= size <= 50:
-                return size
-    
-    if 'single' in t and 'tube' not in t:
-        return 1
-    
-    return None
-
-
-def normalize_name(text):
-    """Normalize product name for comparison."""
-    t = text.lower()
-    t = re.sub(r'\s*-?\s*box\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*cabinet\s*of?\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*pack\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*\(\d+\)', '', t)
-    t = re.sub(r'\s*-\s*\d+s?\s*$', '', t)
-    t = re.sub(r'[^\w\s]', ' ', t)
-    return ' '.join(t.split())
-
-
-def get_stem(word):
-    """Get word stem by removing common endings."""
-    w = word.lower().strip()
-    if w.endswith('os'):
-        return w[:-1]
-    if w.endswith('es') and len(w) > 3:
-        return w[:-1]
-    if w.endswith('s') and len(w) > 3:
-        return w[:-1]
-    return w
-
-
 def get_search_terms(brand, name):
     """Generate search terms."""
     terms = []
@@ -193,293 +226,460 @@ def get_search_terms(brand, name):
     return terms
 
 
+def search_url(term):
+    """Search results URL for a term."""
+    return f"https://www.cigar-club.com/?post_type=product&s={quote_plus(term)}"
+
+
+def is_direct_product(current_url, search_url):
+    """True if a search was redirected straight to a product page."""
+    return '/shop/' in current_url and '/product/' not in search_url
+
+
+@metrics.timed('parse')
+def parse_direct_product(html, current_url):
+    """Extract the product from a page we were redirected to (single result)."""
+    soup = html_parser.parse(html, SUBTREES['direct'])
+    
+    title_el = soup.select_one('h1.product_title, h1')
+    if title_el:
+        name = title_el.get_text(strip=True)
+        return [{
+            'name': name,
+            'url': current_url,
+            'normalized': normalize_name(name, MATCH_RULES)
+        }]
+    return []
+
+
+@metrics.timed('parse')
+def parse_search_results(html):
+    """Parse product links from a search results page."""
+    products = []
+    soup = html_parser.parse(html, SUBTREES['search'])
+    
+    # Find product links
+    product_elements = soup.select('li.product')
+    
+    for item in product_elements:
+        try:
+            name_el = item.select_one('.woocommerce-loop-product__title, h2, h3')
+            link_el = item.select_one('a[href*="/shop/"]')
+            
+            if not name_el or not link_el:
+                continue
+            
+            name = name_el.get_text(strip=True)
+            product_url = link_el.get('href', '')
+            
+            # Skip non-cigars
+            if any(w in name.lower() for w in SKIP_WORDS):
+                continue
+            
+            if name and product_url:
+                products.append({
+                    'name': name,
+                    'url': product_url,
+                    'normalized': normalize_name(name, MATCH_RULES)
+                })
+        except:
+            continue
+    
+    return products
+
+
 def search_products(term):
     """Search Cigar Club for products."""
+    term = _search_aliases.get(term, term)
     cache_key = f"cigarclub:{term}"
     if cache_key in _cache:
         return _cache[cache_key]
     
-    url = f"https://www.cigar-club.com/?post_type=product&s={quote_plus(term)}"
+    url = search_url(term)
     products = []
     
     try:
-        time.sleep(random.uniform(0.5, 1.0))
-        init()
+        init(force=True)
         
-        _page.goto(url, wait_until='networkidle', timeout=30000)
+        readiness.goto(_page, url, READINESS['search'])
         
         # Check if we were redirected to a product page (single result)
         current_url = _page.url
-        if '/shop/' in current_url and '/product/' not in url:
-            # We were redirected to a product page - extract product info
-            html = _page.content()
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            title_el = soup.select_one('h1.product_title, h1')
-            if title_el:
-                name = title_el.get_text(strip=True)
-                products.append({
-                    'name': name,
-                    'url': current_url,
-                    'normalized': normalize_name(name)
-                })
+        if is_direct_product(current_url, url):
+            products = parse_direct_product(_page.content(), current_url)
+            if products:
                 print(f"    Cigar Club '{term}': 1 product (direct)")
                 _cache[cache_key] = products
                 return products
         
-        # Wait for products on search results page
-        try:
-            _page.wait_for_selector('li.product, .products li', timeout=5000)
-        except:
-            pass
-        
-        html = _page.content()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Find product links
-        product_elements = soup.select('li.product')
-        
-        for item in product_elements:
-            try:
-                name_el = item.select_one('.woocommerce-loop-product__title, h2, h3')
-                link_el = item.select_one('a[href*="/shop/"]')
-                
-                if not name_el or not link_el:
-                    continue
-                
-                name = name_el.get_text(strip=True)
-                product_url = link_el.get('href', '')
-                
-                # Skip non-cigars
-                skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'case', 'holder', 
-                              'pouch', 'gift', 'accessory']
-                if any(w in name.lower() for w in skip_words):
-                    continue
-                
-                if name and product_url:
-                    products.append({
-                        'name': name,
-                        'url': product_url,
-                        'normalized': normalize_name(name)
-                    })
-            except:
-                continue
+        products = parse_search_results(_page.content())
         
         print(f"    Cigar Club '{term}': {len(products)} products")
         
     except Exception as e:
         print(f"    Cigar Club search error: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, products)
+        return products
     
     _cache[cache_key] = products
     return products
 
 
-def get_product_variants(product_url):
-    """Fetch product page and extract all box size variants with prices."""
-    cache_key = f"cigarclub_variants:{product_url}"
-    if cache_key in _cache:
-        return _cache[cache_key]
-    
+@metrics.timed('parse')
+def parse_product_page(html, product_url):
+    """Extract all box size variants with prices from a product page."""
     variants = []
+    soup = html_parser.parse(html)
+    page_text = soup.get_text()
     
-    try:
-        time.sleep(random.uniform(0.3, 0.6))
-        _page.goto(product_url, wait_until='networkidle', timeout=30000)
-        
-        # Wait for page to load
+    # Method 1: Look for .product-feature elements (variable products)
+    features = soup.select('.product-feature')
+    
+    for feature in features:
         try:
-            _page.wait_for_selector('.product-feature, .product-features, .price', timeout=8000)
+            text = feature.get_text(separator=' ', strip=True)
+            
+            name_el = feature.select_one('span')
+            if not name_el:
+                continue
+                
+            variant_name = name_el.get_text(strip=True)
+            box_size = extract_box_size(variant_name, MATCH_RULES)
+            
+            price_match = re.search(r'£([\d,]+\.?\d*)', text)
+            price = float(price_match.group(1).replace(',', '')) if price_match else None
+            
+            in_stock = 'out of stock' not in text.lower()
+            
+            if box_size and price and price > 20:
+                variants.append({
+                    'variant_name': variant_name,
+                    'box_size': box_size,
+                    'price': price,
+                    'in_stock': in_stock,
+                    'url': product_url
+                })
         except:
-            time.sleep(2)
+            continue
+    
+    # Method 2: Text-based extraction for variable products
+    if not variants:
+        box_patterns = [
+            (r'Box of (\d+)\s*£([\d,]+\.?\d*)', 'Box of {}'),
+            (r'Box of (\d+)[^\d£]*?£([\d,]+\.?\d*)', 'Box of {}'),
+            (r'Cabinet of (\d+)\s*£([\d,]+\.?\d*)', 'Cabinet of {}'),
+        ]
         
-        html = _page.content()
-        soup = BeautifulSoup(html, 'html.parser')
-        page_text = soup.get_text()
+        for pattern, name_fmt in box_patterns:
+            matches = re.findall(pattern, page_text, re.IGNORECASE | re.DOTALL)
+            for match in matches:
+                try:
+                    box_size = int(match[0])
+                    price = float(match[1].replace(',', ''))
+                    variant_name = name_fmt.format(box_size)
+                    
+                    if price > 20 and not any(v['box_size'] == box_size for v in variants):
+                        variants.append({
+                            'variant_name': variant_name,
+                            'box_size': box_size,
+                            'price': price,
+                            'in_stock': True,
+                            'url': product_url
+                        })
+                except:
+                    continue
+    
+    # Method 3: Simple product - single price with box size in details or URL
+    if not variants:
+        # Find the main product price
+        price = None
+        price_el = soup.select_one('.product-feature .price, .summary .price .woocommerce-Price-amount')
+        price_text = price_el.get_text() if price_el else ''
+        price_match = re.search(r'£([\d,]+\.?\d*)', price_text)
         
-        # Method 1: Look for .product-feature elements (variable products)
-        features = soup.select('.product-feature')
+        if not price_match:
+            # Try finding price in product-feature area specifically
+            feature_area = soup.select_one('.product-features, .product-feature')
+            if feature_area:
+                feature_text = feature_area.get_text()
+                price_match = re.search(r'£([\d,]+\.?\d*)', feature_text)
         
-        for feature in features:
-            try:
-                text = feature.get_text(separator=' ', strip=True)
-                
-                name_el = feature.select_one('span')
-                if not name_el:
-                    continue
-                    
-                variant_name = name_el.get_text(strip=True)
-                box_size = extract_box_size(variant_name)
-                
-                price_match = re.search(r'£([\d,]+\.?\d*)', text)
-                price = float(price_match.group(1).replace(',', '')) if price_match else None
-                
-                in_stock = 'out of stock' not in text.lower()
-                
-                if box_size and price and price > 20:
-                    variants.append({
-                        'variant_name': variant_name,
-                        'box_size': box_size,
-                        'price': price,
-                        'in_stock': in_stock,
-                        'url': product_url
-                    })
-            except:
-                continue
+        # Fallback: find first substantial price in page text
+        if not price_match:
+            all_prices = re.findall(r'£([\d,]+\.?\d*)', page_text)
+            for p in all_prices:
+                val = float(p.replace(',', ''))
+                if val > 50:  # Skip cart prices like £0.00
+                    price = val
+                    break
         
-        # Method 2: Text-based extraction for variable products
-        if not variants:
-            box_patterns = [
-                (r'Box of (\d+)\s*£([\d,]+\.?\d*)', 'Box of {}'),
-                (r'Box of (\d+)[^\d£]*?£([\d,]+\.?\d*)', 'Box of {}'),
-                (r'Cabinet of (\d+)\s*£([\d,]+\.?\d*)', 'Cabinet of {}'),
-            ]
-            
-            for pattern, name_fmt in box_patterns:
-                matches = re.findall(pattern, page_text, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    try:
-                        box_size = int(match[0])
-                        price = float(match[1].replace(',', ''))
-                        variant_name = name_fmt.format(box_size)
-                        
-                        if price > 20 and not any(v['box_size'] == box_size for v in variants):
-                            variants.append({
-                                'variant_name': variant_name,
-                                'box_size': box_size,
-                                'price': price,
-                                'in_stock': True,
-                                'url': product_url
-                            })
-                    except:
-                        continue
+        if price_match:
+            price = float(price_match.group(1).replace(',', ''))
         
-        # Method 3: Simple product - single price with box size in details or URL
-        if not variants:
-            # Find the main product price
-            price = None
-            price_el = soup.select_one('.product-feature .price, .summary .price .woocommerce-Price-amount')
-            price_text = price_el.get_text() if price_el else ''
-            price_match = re.search(r'£([\d,]+\.?\d*)', price_text)
+        if price:
             
-            if not price_match:
-                # Try finding price in product-feature area specifically
-                feature_area = soup.select_one('.product-features, .product-feature')
-                if feature_area:
-                    feature_text = feature_area.get_text()
-                    price_match = re.search(r'£([\d,]+\.?\d*)', feature_text)
+            # Find box size from various sources
+            box_size = None
             
-            # Fallback: find first substantial price in page text
-            if not price_match:
-                all_prices = re.findall(r'£([\d,]+\.?\d*)', page_text)
-                for p in all_prices:
-                    val = float(p.replace(',', ''))
-                    if val > 50:  # Skip cart prices like £0.00
-                        price = val
-                        break
+            # Check "Packaging: Box of X"
+            packaging_match = re.search(r'Packaging[:\s]+Box of (\d+)', page_text, re.IGNORECASE)
+            if packaging_match:
+                box_size = int(packaging_match.group(1))
             
-            if price_match:
-                price = float(price_match.group(1).replace(',', ''))
+            # Check for "box of X" or "boxes of X" anywhere in text (more flexible)
+            if not box_size:
+                box_match = re.search(r'box(?:es)? of (\d+)', page_text, re.IGNORECASE)
+                if box_match:
+                    box_size = int(box_match.group(1))
             
-            if price:
-                
-                # Find box size from various sources
-                box_size = None
-                
-                # Check "Packaging: Box of X"
-                packaging_match = re.search(r'Packaging[:\s]+Box of (\d+)', page_text, re.IGNORECASE)
-                if packaging_match:
-                    box_size = int(packaging_match.group(1))
-                
-                # Check for "box of X" or "boxes of X" anywhere in text (more flexible)
-                if not box_size:
-                    box_match = re.search(r'box(?:es)? of (\d+)', page_text, re.IGNORECASE)
-                    if box_match:
-                        box_size = int(box_match.group(1))
-                
-                # Check URL for box size
-                if not box_size:
-                    url_match = re.search(r'box[- ]?of?[- ]?(\d+)', product_url, re.IGNORECASE)
-                    if url_match:
-                        box_size = int(url_match.group(1))
-                
-                # Check product title for box size
-                if not box_size:
-                    title_el = soup.select_one('h1, .product_title')
-                    if title_el:
-                        title = title_el.get_text()
-                        title_match = re.search(r'Box\s*(?:of\s*)?(\d+)', title, re.IGNORECASE)
-                        if title_match:
-                            box_size = int(title_match.group(1))
-                
-                # Check for X cigars pattern
-                if not box_size:
-                    cigars_match = re.search(r'(\d+)\s*cigars', page_text, re.IGNORECASE)
-                    if cigars_match:
-                        potential_size = int(cigars_match.group(1))
-                        if 5 <= potential_size <= 50:
-                            box_size = potential_size
-                
-                # Validate price is reasonable for the box size
-                # Minimum prices: ~£15 per cigar for premium Cubans (lowered for safety)
-                min_price = box_size * 15 if box_size else 50
-                
-                if box_size and price >= min_price:
-                    in_stock = 'out of stock' not in page_text.lower()
-                    variants.append({
-                        'variant_name': f'Box of {box_size}',
-                        'box_size': box_size,
-                        'price': price,
-                        'in_stock': in_stock,
-                        'url': product_url
-                    })
+            # Check URL for box size
+            if not box_size:
+                url_match = re.search(r'box[- ]?of?[- ]?(\d+)', product_url, re.IGNORECASE)
+                if url_match:
+                    box_size = int(url_match.group(1))
+            
+            # Check product title for box size
+            if not box_size:
+                title_el = soup.select_one('h1, .product_title')
+                if title_el:
+                    title = title_el.get_text()
+                    title_match = re.search(r'Box\s*(?:of\s*)?(\d+)', title, re.IGNORECASE)
+                    if title_match:
+                        box_size = int(title_match.group(1))
+            
+            # Check for X cigars pattern
+            if not box_size:
+                cigars_match = re.search(r'(\d+)\s*cigars', page_text, re.IGNORECASE)
+                if cigars_match:
+                    potential_size = int(cigars_match.group(1))
+                    if 5 <= potential_size <= 50:
+                        box_size = potential_size
+            
+            # Validate price is reasonable for the box size
+            # Minimum prices: ~£15 per cigar for premium Cubans (lowered for safety)
+            min_price = box_size * 15 if box_size else 50
+            
+            if box_size and price >= min_price:
+                in_stock = 'out of stock' not in page_text.lower()
+                variants.append({
+                    'variant_name': f'Box of {box_size}',
+                    'box_size': box_size,
+                    'price': price,
+                    'in_stock': in_stock,
+                    'url': product_url
+                })
+    
+    return variants
+
+
+def get_product_variants(product_url):
+    """Fetch product page and extract all box size variants with prices."""
+    cache_key = f"cigarclub_variants:{product_url}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    variants = []
+    
+    try:
+        # Search results may come from the cache, so the browser may not be open yet
+        init(force=True)
+
+        # Falls back to the load event if the price/features never appear
+        readiness.goto(_page, product_url, READINESS['product'])
+        
+        variants = parse_product_page(_page.content(), product_url)
         
     except Exception as e:
         print(f"    Error fetching variants: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, variants)
+        return variants
     
     _cache[cache_key] = variants
     return variants
 
 
+def catalogue_variants(product, variations):
+    """Box-size variants of a catalogue product, in parse_product_page() form."""
+    variants = []
+    
+    if product['variations']:
+        for v in product['variations']:
+            detail = variations.get(v['id'])
+            if not detail or not detail['price']:
+                continue
+            for label in (v['label'], detail['variation'], detail['name']):
+                box_size = extract_box_size(label, MATCH_RULES) if label else None
+                if box_size:
+                    break
+            if box_size and detail['price'] > 20:
+                variants.append({
+                    'variant_name': v['label'] or detail['variation'] or f'Box of {box_size}',
+                    'box_size': box_size,
+                    'price': detail['price'],
+                    'in_stock': detail['in_stock'],
+                    'url': product['url']
+                })
+    else:
+        # Simple product - the box size is in its name
+        box_size = extract_box_size(product['name'], MATCH_RULES)
+        if box_size and product['price'] and product['price'] >= box_size * 15:
+            variants.append({
+                'variant_name': f'Box of {box_size}',
+                'box_size': box_size,
+                'price': product['price'],
+                'in_stock': product['in_stock'],
+                'url': product['url']
+            })
+    
+    return variants
+
+
+def build_catalogue(products, variations):
+    """Build the local product/variant index (a ProductIndex) from Store API entries."""
+    by_id = {v['id']: v for v in variations}
+    index = []
+    seen = set()
+    
+    for p in products:
+        name = p['name']
+        if not name or not p['url'] or p['id'] in seen or p['type'] == 'variation':
+            continue
+        if any(w in name.lower() for w in SKIP_WORDS):
+            continue
+        seen.add(p['id'])
+        
+        index.append({
+            'name': name,
+            'url': p['url'],
+            'normalized': normalize_name(name, MATCH_RULES),
+            'variants': catalogue_variants(p, by_id),
+        })
+    
+    return ProductIndex(index)
+
+
+def load_catalogue():
+    """
+    Pull the full catalogue and its variations once per run and index them.
+    
+    Returns the product index, or None if the Store API couldn't be read
+    (callers fall back to search mode).
+    """
+    if 'products' in _catalogue:
+        return _catalogue['products']
+    
+    try:
+        products = woocommerce.fetch_collection(BASE_URL, _cache, 'cigarclub_catalogue')
+        if any(p['variations'] for p in products):
+            variations = woocommerce.fetch_collection(BASE_URL, _cache, 'cigarclub_catalogue', 'variation')
+        else:
+            variations = []
+    except Exception as e:
+        print(f"    Cigar Club catalogue error: {e} - falling back to search")
+        _catalogue['products'] = None
+        return None
+    
+    _catalogue['products'] = build_catalogue(products, variations) if products else None
+    if _catalogue['products']:
+        print(f"    Cigar Club catalogue: {len(_catalogue['products'])} products, {len(variations)} variations")
+    return _catalogue['products']
+
+
+@metrics.timed('match')
 def match_product(product, brand, cigar_name):
     """Check if product matches brand and cigar name (box size checked separately)."""
     prod_name = product['normalized']
-    prod_name_original = product['name'].lower()
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
     
     # Brand check
-    brand_lower = brand.lower()
-    brand_first = brand_lower.split()[0]
-    if brand_first not in prod_name and brand_lower not in prod_name:
+    if sig.brand_first not in prod_name and sig.brand not in prod_name:
         return False, "brand not found"
     
-    # Cigar name matching
-    cigar_normalized = normalize_name(cigar_name.lower())
-    
     # Roman numerals must match exactly
-    roman_pattern = r'\b(i{1,3}|iv|v|vi{1,3}|ix|x{1,3})\b'
-    cigar_romans = set(re.findall(roman_pattern, cigar_name.lower()))
-    prod_romans = set(re.findall(roman_pattern, prod_name))
-    
-    if cigar_romans:
+    if sig.romans:
+        prod_romans = romans(prod_name)
         if not prod_romans:
-            return False, f"missing roman numeral (expected {cigar_romans})"
-        if cigar_romans != prod_romans:
-            return False, f"roman numeral mismatch ({cigar_romans} vs {prod_romans})"
+            return False, f"missing roman numeral (expected {set(sig.romans)})"
+        if sig.romans != prod_romans:
+            return False, f"roman numeral mismatch ({set(sig.romans)} vs {set(prod_romans)})"
     
     # Key words matching
-    key_words = [w for w in cigar_normalized.split() if len(w) > 2]
+    # (product may have additional words like "Year of the Dragon"); need at
+    # least half the key words to match, or all if only 1-2 words
+    if sig.key_words:
+        matched_words = key_word_matches(sig, prod_name)
+        if matched_words < sig.min_key_matches:
+            return False, f"insufficient word matches ({matched_words}/{len(sig.key_words)})"
     
-    if key_words:
-        # Check if the product contains all key words from cigar name
-        # (product may have additional words like "Year of the Dragon")
-        matched_words = sum(1 for word in key_words if word in prod_name or get_stem(word) in prod_name)
-        
-        # Need at least half the key words to match, or all if only 1-2 words
-        min_matches = max(1, len(key_words) // 2) if len(key_words) > 2 else len(key_words)
+    return True, "matched"
+
+
+def candidate_products(index, brand, cigar_name):
+    """
+    Products from a ProductIndex that could pass match_product(), in index order.
+    
+    Mirrors match_product()'s brand and roman-numeral rules as postings
+    lookups; the result is always a superset of the matches.
+    """
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
+    # brand_first is a substring of the full brand, so it covers both checks
+    ids = index.containing(sig.brand_first)
+    ids = index.intersect(ids, index.tokens_all(sig.romans))
+    return index.select(ids)
+
+
+def variant_result(product, variants, box_size):
+    """Return a scrape() result for the variant matching box_size, or None."""
+    # Find the variant matching our box size
+    for variant in variants:
+        if variant['box_size'] == box_size:
+            return {
+                'price': variant['price'],
+                'box_size': variant['box_size'],
+                'product_name': f"{product['name']} - {variant['variant_name']}",
+                'retailer': 'Cigar Club',
+                'url': variant['url'],
+                'in_stock': variant['in_stock']
+            }
+    
+    # Log if we found the product but not the right box size
+    available_sizes = [v['box_size'] for v in variants]
+    print(f"      {product['name']}: no box {box_size} (available: {available_sizes})")
+    return None
+
+
+def scrape_catalogue(catalogue, brand, cigar_name, box_size):
+    """Answer a lookup from the catalogue index - no network access."""
+    for product in candidate_products(catalogue, brand, cigar_name):
+        is_match, reason = match_product(product, brand, cigar_name)
         
-        if matched_words < min_matches:
-            return False, f"insufficient word matches ({matched_words}/{len(key_words)})"
+        if is_match:
+            if not product['variants']:
+                print(f"      No variants found for {product['name']}")
+                continue
+            
+            result = variant_result(product, product['variants'], box_size)
+            if result:
+                return result
     
-    return True, "matched"
+    return None
+
+
+def preflight():
+    """Canary run before any cigar: '' if listing and product parsing work, else the reason."""
+    if CATALOGUE_MODE:
+        catalogue = load_catalogue()
+        if catalogue:
+            return '' if any(p['variants'] for p in catalogue) else "catalogue parsed no variants"
+    
+    products = search_products(CANARY_TERM)
+    if not products:
+        return f"search '{CANARY_TERM}' returned no products"
+    if not get_product_variants(products[0]['url']):
+        return f"product '{products[0]['name']}' parsed no variants"
+    return ''
 
 
 def scrape(brand, cigar_name, box_size):
@@ -494,6 +694,11 @@ def scrape(brand, cigar_name, box_size):
     Returns:
         dict with 'price', 'box_size', 'url', 'in_stock' if found, or None
     """
+    if CATALOGUE_MODE:
+        catalogue = load_catalogue()
+        if catalogue:
+            return scrape_catalogue(catalogue, brand, cigar_name, box_size)
+    
     search_terms = get_search_terms(brand, cigar_name)
     
     for term in search_terms:
@@ -510,27 +715,128 @@ def scrape(brand, cigar_name, box_size):
                     print(f"      No variants found for {product['name']}")
                     continue
                 
-                # Find the variant matching our box size
-                for variant in variants:
-                    if variant['box_size'] == box_size:
-                        return {
-                            'price': variant['price'],
-                            'box_size': variant['box_size'],
-                            'product_name': f"{product['name']} - {variant['variant_name']}",
-                            'retailer': 'Cigar Club',
-                            'url': variant['url'],
-                            'in_stock': variant['in_stock']
-                        }
-                
-                # Log if we found the product but not the right box size
-                available_sizes = [v['box_size'] for v in variants]
-                print(f"      {product['name']}: no box {box_size} (available: {available_sizes})")
+                result = variant_result(product, variants, box_size)
+                if result:
+                    return result
             else:
                 pass  # Don't log rejections to keep output clean
     
     return None
 
 
+# ---------------------------------------------------------------------------
+# Async engine (several cigars in flight through a bounded page pool)
+# ---------------------------------------------------------------------------
+
+async def search_products_async(engine, term):
+    """Async version of search_products() using a page from the engine pool."""
+    term = _search_aliases.get(term, term)
+    cache_key = f"cigarclub:{term}"
+    
+    async def fetch():
+        url = search_url(term)
+        products = []
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, url, READINESS['search'])
+                
+                current_url = page.url
+                if is_direct_product(current_url, url):
+                    products = parse_direct_product(await page.content(), current_url)
+                
+                if products:
+                    print(f"    Cigar Club '{term}': 1 product (direct)")
+                else:
+                    products = parse_search_results(await page.content())
+                    print(f"    Cigar Club '{term}': {len(products)} products")
+        except Exception as e:
+            print(f"    Cigar Club search error: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, products)
+            return products
+        
+        _cache[cache_key] = products
+        return products
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def get_product_variants_async(engine, product_url):
+    """Async version of get_product_variants()."""
+    cache_key = f"cigarclub_variants:{product_url}"
+    
+    async def fetch():
+        variants = []
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, product_url, READINESS['product'])
+                html = await page.content()
+            
+            variants = parse_product_page(html, product_url)
+        except Exception as e:
+            print(f"    Error fetching variants: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, variants)
+            return variants
+        
+        _cache[cache_key] = variants
+        return variants
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def load_catalogue_async(engine):
+    """Async version of load_catalogue() - the HTTP fetches run in a worker thread."""
+    async def fetch():
+        return await asyncio.to_thread(load_catalogue)
+    
+    return await engine.cached(_catalogue, 'products', fetch)
+
+
+async def preflight_async(engine):
+    """Async version of preflight()."""
+    if CATALOGUE_MODE:
+        catalogue = await load_catalogue_async(engine)
+        if catalogue:
+            return '' if any(p['variants'] for p in catalogue) else "catalogue parsed no variants"
+    
+    products = await search_products_async(engine, CANARY_TERM)
+    if not products:
+        return f"search '{CANARY_TERM}' returned no products"
+    if not await get_product_variants_async(engine, products[0]['url']):
+        return f"product '{products[0]['name']}' parsed no variants"
+    return ''
+
+
+async def scrape_async(engine, brand, cigar_name, box_size):
+    """Async version of scrape()."""
+    if CATALOGUE_MODE:
+        catalogue = await load_catalogue_async(engine)
+        if catalogue:
+            return scrape_catalogue(catalogue, brand, cigar_name, box_size)
+    
+    search_terms = get_search_terms(brand, cigar_name)
+    
+    for term in search_terms:
+        products = await search_products_async(engine, term)
+        
+        for product in products:
+            is_match, reason = match_product(product, brand, cigar_name)
+            
+            if is_match:
+                variants = await get_product_variants_async(engine, product['url'])
+                
+                if not variants:
+                    print(f"      No variants found for {product['name']}")
+                    continue
+                
+                result = variant_result(product, variants, box_size)
+                if result:
+                    return result
+    
+    return None
+
+
 if __name__ == '__main__':
     print("Cigar Club Scraper - Test Mode")
     print("=" * 40)
@@ -12,88 +12,162 @@ Havana House product naming patterns:
 
 Price format: "£1,234.00"
 URL pattern: /search?q=term
+
+Catalogue mode (default): the full product listing is pulled once per run,
+as JSON from the WooCommerce Store API or, if that is unavailable, as the
+shop's HTML listing pages. Pages are fetched concurrently over plain HTTP
+under the per-host limit in http_fetch.py, and every lookup is answered
+from the resulting local index. HAVANAHOUSE_CATALOGUE=0 restores per-term
+search, which is also the fallback if neither listing can be read.
 """
 
+import os
 import re
 import sys
-import time
-import random
+import asyncio
 from urllib.parse import quote_plus
 
-def install(pkg):
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
+# Make the shared scrapers package importable when run standalone
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    install("playwright")
-    from playwright.sync_api import sync_playwright
+from scrapers import browser
+from scrapers import readiness
+from scrapers import metrics
+from scrapers import http_fetch
+from scrapers import woocommerce
+from scrapers.cache import ScrapeCache
+from scrapers.product_index import ProductIndex
+from scrapers.matching import (
+    match_rules, normalize_name, get_stem, extract_box_size, match_signature, romans, years
+)
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    install("beautifulsoup4")
-    from bs4 import BeautifulSoup
+from scrapers import html_parser
 
 
 # Module state
-_playwright = None
-_browser = None
 _context = None
 _page = None
-_cache = {}
+_cache = ScrapeCache()
+
+# Term -> shared query from the orchestrator's search plan
+_search_aliases = {}
+
+# Browser context settings (shared by the sync page and the async engine)
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'locale': 'en-GB',
+    'timezone_id': 'Europe/London',
+}
+
+# Hide webdriver property
+INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Hide automation indicators
+    window.chrome = { runtime: {} };
+    
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-GB', 'en-US', 'en']
+    });
+"""
+
+# Requests to abort and how to label pages for byte accounting (see resource_policy.py)
+RESOURCE_POLICY = {
+    'retailer': 'Havana House',
+    'page_types': [
+        ('search', r'[?&]s='),
+        ('product', r'.'),
+    ],
+}
 
+# What "loaded" means per page type (see readiness.py)
+READINESS = {
+    'search': {'selector': 'li.product, ul.products > li', 'phase': 'search'},
+}
 
-def init():
-    """Initialize the browser with stealth settings."""
-    global _playwright, _browser, _context, _page
-    if _page:
+# Page parts each parser reads - the rest of the page is never parsed (see html_parser.py)
+SUBTREES = {
+    # Product tiles with their list (for 'ul.products > li') plus pagination
+    'search': 'ul.products, li.product, .page-numbers, a.next',
+    'pagination': '.page-numbers',
+}
+
+# Pages in flight at once in async mode
+CONCURRENCY = 3
+
+# Preflight canary: a known search (or brand listing) that must return
+# products that parse (see preflight())
+CANARY_TERM = 'Montecristo'
+
+# Name noise and box-size forms on Havana House product names, most explicit first
+MATCH_RULES = match_rules(
+    noise=(
+        r'\s*-?\s*box\s*of\s*\d+',
+        r'\s*-?\s*cabinet\s*of?\s*\d+',
+        r'\s*-?\s*(?:v?slb)\s*\d*',
+        r'\s*\(\d+\)',
+        r'\s*-\s*\d+s?\s*$',
+    ),
+    box_patterns=(
+        r'box\s*of\s*(\d+)',
+        r'cabinet\s*of\s*(\d+)',
+        r'cabinet\s*(\d+)',
+        r'slb\s*of\s*(\d+)',
+        r'slb\s*(\d+)',
+        r'vslb\s*of\s*(\d+)',
+        r'vslb\s*(\d+)',
+        r'\(box\s*(\d+)\)',
+        r'\((\d+)\s*box\)',
+        r'\((\d+)\)',
+        r'-\s*(\d+)s\b',         # "- 25s"
+        r'(\d+)s\s*box',
+        r'(\d+)\s*cigars?\s*box',
+        r'box\s*(\d+)\b',
+        r'-\s*(\d+)\s*$',        # ends with "- 25"
+    ),
+    single=r'\bsingle\b|\bindividual\b',
+)
+
+BASE_URL = "https://www.havanahouse.co.uk"
+
+# Answer lookups from the full product listing instead of searching
+CATALOGUE_MODE = os.environ.get('HAVANAHOUSE_CATALOGUE', '1') != '0'
+LISTING_MAX_PAGES = 60
+
+# Words that mark a product as an accessory rather than cigars
+SKIP_WORDS = ['humidor', 'ashtray', 'cutter', 'lighter', 'case', 'holder',
+              'pouch', 'sampler', 'gift', 'accessory', 'membership']
+
+# Catalogue index for this run ({'products': ProductIndex} once loaded)
+_catalogue = {}
+
+
+def init(force=False):
+    """
+    Initialize the browser with stealth settings.
+    
+    In catalogue mode the browser is only opened once a lookup has to fall
+    back to search (force=True).
+    """
+    global _context, _page
+    if _page or (CATALOGUE_MODE and not force):
         return
     
-    print("  Starting browser...")
+    print("  Opening browser context...")
     
     try:
-        _playwright = sync_playwright().start()
-        
-        _browser = _playwright.chromium.launch(
-            headless=True,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=IsolateOrigins,site-per-process'
-            ]
-        )
-        
-        _context = _browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            locale='en-GB',
-            timezone_id='Europe/London',
-        )
-        
+        # Own context on the shared browser - keeps this retailer's fingerprint
+        _context = browser.new_context(CONTEXT_OPTIONS, INIT_SCRIPT, RESOURCE_POLICY)
         _page = _context.new_page()
-        
-        # Hide webdriver property
-        _page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            // Hide automation indicators
-            window.chrome = { runtime: {} };
-            
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-            
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-GB', 'en-US', 'en']
-            });
-        """)
-        
         print("  Browser ready")
     except Exception as e:
         print(f"  Browser init error: {e}")
@@ -102,15 +176,28 @@ def init():
 
 def cleanup():
     """Clean up browser resources."""
-    global _playwright, _browser, _context, _page
-    try:
-        if _browser:
-            _browser.close()
-        if _playwright:
-            _playwright.stop()
-    except:
-        pass
-    _playwright = _browser = _context = _page = None
+    global _context, _page
+    if _context:
+        browser.close_context(_context)
+    _context = _page = None
+
+
+def create_engine():
+    """Create an async page-pool engine configured like init()'s context."""
+    from scrapers.async_engine import AsyncEngine
+    return AsyncEngine(
+        concurrency=CONCURRENCY,
+        context_options=CONTEXT_OPTIONS,
+        init_script=INIT_SCRIPT,
+        resource_policy=RESOURCE_POLICY,
+        lazy=CATALOGUE_MODE,
+    )
+
+
+def set_search_plan(aliases):
+    """Route search terms through the orchestrator's inventory-wide search plan."""
+    _search_aliases.clear()
+    _search_aliases.update(aliases)
 
 
 def parse_price(price_str):
@@ -128,69 +215,6 @@ def parse_price(price_str):
     return None
 
 
-def extract_box_size(text):
-    """
-    Extract box size from product name with strict patterns.
-    """
-    t = text.lower()
-    
-    # Explicit patterns - order matters (more specific first)
-    patterns = [
-        r'box\s*of\s*(\d+)',
-        r'cabinet\s*of\s*(\d+)',
-        r'cabinet\s*(\d+)',
-        r'slb\s*of\s*(\d+)',
-        r'slb\s*(\d+)',
-        r'vslb\s*of\s*(\d+)',
-        r'vslb\s*(\d+)',
-        r'\(box\s*(\d+)\)',
-        r'\((\d+)\s*box\)',
-        r'\((\d+)\)',
-        r'-\s*(\d+)s\b',  # "- 25s"
-        r'(\d+)s\s*box',
-        r'(\d+)\s*cigars?\s*box',
-        r'box\s*(\d+)\b',
-        r'-\s*(\d+)\s*$',  # Ends with "- 25"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, t)
-        if match:
-            size = int(match.group(1))
-            if 3 <= size <= 50:
-                return size
-    
-    if re.search(r'\bsingle\b|\bindividual\b', t):
-        return 1
-    
-    return None
-
-
-def normalize_name(text):
-    """Normalize product name for comparison."""
-    t = text.lower()
-    # Remove box size patterns
-    t = re.sub(r'\s*-?\s*box\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*cabinet\s*of?\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*(?:v?slb)\s*\d*', '', t)
-    t = re.sub(r'\s*\(\d+\)', '', t)
-    t = re.sub(r'\s*-\s*\d+s?\s*$', '', t)
-    t = re.sub(r'[^\w\s]', ' ', t)
-    return ' '.join(t.split())
-
-
-def get_stem(word):
-    """Get word stem by removing common endings."""
-    w = word.lower().strip()
-    if w.endswith('os'):
-        return w[:-1]  # robustos -> robusto
-    if w.endswith('es') and len(w) > 3:
-        return w[:-1]  # brillantes -> brillante
-    if w.endswith('s') and len(w) > 3:
-        return w[:-1]
-    return w
-
-
 def get_search_terms(brand, name):
     """Generate search terms."""
     terms = []
@@ -217,8 +241,87 @@ def get_search_terms(brand, name):
     return terms
 
 
+def search_url(term, page_num=1):
+    """Search results URL for a term and results page."""
+    if page_num == 1:
+        return f"{BASE_URL}/?s={quote_plus(term)}&post_type=product"
+    return f"{BASE_URL}/page/{page_num}/?s={quote_plus(term)}&post_type=product"
+
+
+def listing_url(page_num=1):
+    """Shop listing URL for a page of the full product list."""
+    if page_num == 1:
+        return f"{BASE_URL}/shop/"
+    return f"{BASE_URL}/shop/page/{page_num}/"
+
+
+@metrics.timed('parse')
+def parse_search_results(html):
+    """
+    Parse WooCommerce product tiles from a results page.
+    
+    Returns (products, has_next_page).
+    """
+    products = []
+    soup = html_parser.parse(html, SUBTREES['search'])
+    
+    # WooCommerce product selectors
+    product_elements = soup.select('li.product, ul.products > li')
+    
+    for item in product_elements:
+        try:
+            # Find product name
+            name_el = item.select_one('.woocommerce-loop-product__title, h2.woocommerce-loop-product__title')
+            # Find price
+            price_el = item.select_one('.price .woocommerce-Price-amount, .price')
+            # Find URL
+            link_el = item.select_one('a.woocommerce-LoopProduct-link, a[href*="/product/"]')
+            
+            if not name_el:
+                continue
+            
+            name = name_el.get_text(strip=True)
+            price_text = price_el.get_text() if price_el else ''
+            price = parse_price(price_text)
+            url = link_el.get('href', '') if link_el else ''
+            
+            # Check stock status
+            is_out_of_stock = bool(item.select_one('.out-of-stock, .sold-out, .outofstock')) or 'outofstock' in ' '.join(item.get('class', []))
+            in_stock = not is_out_of_stock
+            
+            # Skip non-cigars
+            if any(w in name.lower() for w in SKIP_WORDS):
+                continue
+            
+            box_size = extract_box_size(name, MATCH_RULES)
+            
+            if name and price and price > 20:
+                products.append({
+                    'name': name,
+                    'price': price,
+                    'box_size': box_size,
+                    'normalized': normalize_name(name, MATCH_RULES),
+                    'url': url,
+                    'in_stock': in_stock
+                })
+        except:
+            continue
+    
+    # Check if there's a next page
+    has_next = bool(product_elements) and bool(soup.select('.page-numbers .next, a.next'))
+    return products, has_next
+
+
+def add_unique(products, page_products):
+    """Append products not already seen on earlier pages (by name)."""
+    for product in page_products:
+        if not any(p['name'] == product['name'] for p in products):
+            products.append(product)
+
+
 def search_products(term):
     """Search Havana House for products."""
+    term = _search_aliases.get(term, term)
     cache_key = f"havanahouse:{term}"
     if cache_key in _cache:
         return _cache[cache_key]
@@ -226,97 +329,191 @@ def search_products(term):
     products = []
     
     try:
-        time.sleep(random.uniform(0.5, 1.0))
-        init()
+        init(force=True)
         
         # Search up to 3 pages
         for page_num in range(1, 4):
-            if page_num == 1:
-                url = f"https://www.havanahouse.co.uk/?s={quote_plus(term)}&post_type=product"
-            else:
-                url = f"https://www.havanahouse.co.uk/page/{page_num}/?s={quote_plus(term)}&post_type=product"
-            
-            _page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            
-            # Wait for products to load
-            try:
-                _page.wait_for_selector('li.product, ul.products > li', timeout=5000)
-            except:
+            if not readiness.goto(_page, search_url(term, page_num), READINESS['search']):
                 break  # No products on this page
             
-            html = _page.content()
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # WooCommerce product selectors
-            product_elements = soup.select('li.product, ul.products > li')
-            
-            if not product_elements:
-                break  # No more pages
-            
-            for item in product_elements:
-                try:
-                    # Find product name
-                    name_el = item.select_one('.woocommerce-loop-product__title, h2.woocommerce-loop-product__title')
-                    # Find price
-                    price_el = item.select_one('.price .woocommerce-Price-amount, .price')
-                    # Find URL
-                    link_el = item.select_one('a.woocommerce-LoopProduct-link, a[href*="/product/"]')
-                    
-                    if not name_el:
-                        continue
-                    
-                    name = name_el.get_text(strip=True)
-                    price_text = price_el.get_text() if price_el else ''
-                    price = parse_price(price_text)
-                    url = link_el.get('href', '') if link_el else ''
-                    
-                    # Check stock status
-                    is_out_of_stock = bool(item.select_one('.out-of-stock, .sold-out, .outofstock')) or 'outofstock' in ' '.join(item.get('class', []))
-                    in_stock = not is_out_of_stock
-                    
-                    # Skip non-cigars
-                    skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'case', 'holder', 
-                                  'pouch', 'sampler', 'gift', 'accessory', 'membership']
-                    if any(w in name.lower() for w in skip_words):
-                        continue
-                    
-                    box_size = extract_box_size(name)
-                    
-                    if name and price and price > 20:
-                        # Avoid duplicates
-                        if not any(p['name'] == name for p in products):
-                            products.append({
-                                'name': name,
-                                'price': price,
-                                'box_size': box_size,
-                                'normalized': normalize_name(name),
-                                'url': url,
-                                'in_stock': in_stock
-                            })
-                except:
-                    continue
+            page_products, has_next = parse_search_results(_page.content())
+            add_unique(products, page_products)
             
-            # Check if there's a next page
-            if not soup.select('.page-numbers .next, a.next'):
+            if not has_next:
                 break
-            
-            time.sleep(random.uniform(0.3, 0.6))
         
         print(f"    Havana House '{term}': {len(products)} products")
         
     except Exception as e:
         print(f"    Havana House search error: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, products)
+        return products
     
     _cache[cache_key] = products
     return products
 
 
+async def search_products_async(engine, term):
+    """Async version of search_products() using a page from the engine pool."""
+    term = _search_aliases.get(term, term)
+    cache_key = f"havanahouse:{term}"
+    
+    async def fetch():
+        products = []
+        try:
+            async with engine.page() as page:
+                for page_num in range(1, 4):
+                    if not await readiness.goto_async(page, search_url(term, page_num), READINESS['search']):
+                        break
+                    
+                    page_products, has_next = parse_search_results(await page.content())
+                    add_unique(products, page_products)
+                    
+                    if not has_next:
+                        break
+            
+            print(f"    Havana House '{term}': {len(products)} products")
+        except Exception as e:
+            print(f"    Havana House search error: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, products)
+            return products
+        
+        _cache[cache_key] = products
+        return products
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+def page_count(html):
+    """Highest page number in a listing page's pagination links (1 if none)."""
+    soup = html_parser.parse(html, SUBTREES['pagination'])
+    numbers = [int(el.get_text(strip=True)) for el in soup.select('.page-numbers')
+               if el.get_text(strip=True).isdigit()]
+    return max(numbers, default=1)
+
+
+def store_products(products, variations):
+    """Listing products (parse_search_results() form) from Store API entries."""
+    by_id = {v['id']: v for v in variations}
+    listing = []
+    
+    for p in products:
+        if p['type'] == 'variation':
+            continue
+        
+        # Variable products list one entry per box-size variation
+        entries = [(p['name'], p['price'], p['in_stock'])]
+        if p['variations']:
+            entries = [
+                (f"{p['name']} - {v['label']}", by_id[v['id']]['price'], by_id[v['id']]['in_stock'])
+                for v in p['variations'] if v['id'] in by_id
+            ]
+        
+        for name, price, in_stock in entries:
+            if not name or any(w in name.lower() for w in SKIP_WORDS):
+                continue
+            if price and price > 20:
+                listing.append({
+                    'name': name,
+                    'price': price,
+                    'box_size': extract_box_size(name, MATCH_RULES),
+                    'normalized': normalize_name(name, MATCH_RULES),
+                    'url': p['url'],
+                    'in_stock': in_stock
+                })
+    
+    return listing
+
+
+def fetch_store_listing():
+    """Full product listing from the WooCommerce Store API."""
+    products = woocommerce.fetch_collection(BASE_URL, _cache, 'havanahouse_catalogue')
+    variations = []
+    if any(p['variations'] for p in products):
+        variations = woocommerce.fetch_collection(BASE_URL, _cache, 'havanahouse_catalogue', 'variation')
+    return store_products(products, variations)
+
+
+def fetch_listing_page(page_num):
+    """Fetch and parse one HTML listing page over HTTP (cached). Returns (products, pages)."""
+    cache_key = f"havanahouse_catalogue:html:{page_num}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    html = http_fetch.get(listing_url(page_num), phase='search').text
+    products, _ = parse_search_results(html)
+    entry = [products, page_count(html)]
+    
+    _cache[cache_key] = entry
+    return entry
+
+
+def fetch_html_listing():
+    """Full product listing from the shop's HTML listing pages."""
+    products, pages = fetch_listing_page(1)
+    listing = list(products)
+    
+    # Page count is known from page 1 - fetch the rest concurrently
+    rest = range(2, min(pages, LISTING_MAX_PAGES) + 1)
+    for page_products, _ in http_fetch.fetch_all(fetch_listing_page, rest):
+        listing.extend(page_products)
+    return listing
+
+
+def build_catalogue(listing):
+    """Build the local product index (a ProductIndex), first entry per name."""
+    by_name = {}
+    for product in listing:
+        by_name.setdefault(product['name'], product)
+    return ProductIndex(by_name.values())
+
+
+def load_catalogue():
+    """
+    Pull the full product listing once per run and index it.
+    
+    Returns the product index, or None if no listing could be read
+    (callers fall back to search mode).
+    """
+    if 'products' in _catalogue:
+        return _catalogue['products']
+    
+    listing = []
+    for source, fetch in (('JSON', fetch_store_listing), ('HTML', fetch_html_listing)):
+        try:
+            listing = fetch()
+        except Exception as e:
+            print(f"    Havana House {source} listing error: {e}")
+            continue
+        if listing:
+            break
+    
+    _catalogue['products'] = build_catalogue(listing) if listing else None
+    if _catalogue['products']:
+        print(f"    Havana House catalogue ({source}): {len(_catalogue['products'])} products")
+    else:
+        print("    Havana House catalogue unavailable - falling back to search")
+    return _catalogue['products']
+
+
+async def load_catalogue_async(engine):
+    """Async version of load_catalogue() - the HTTP fetches run in a worker thread."""
+    async def fetch():
+        return await asyncio.to_thread(load_catalogue)
+    
+    return await engine.cached(_catalogue, 'products', fetch)
+
+
+@metrics.timed('match')
 def match_product(product, brand, cigar_name, target_box_size):
     """
     Check if product matches with STRICT box size validation.
     """
     prod_name = product['normalized']
     prod_box = product['box_size']
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
     
     # STRICT BOX SIZE CHECK
     if prod_box is not None:
@@ -324,55 +521,81 @@ def match_product(product, brand, cigar_name, target_box_size):
             return False, f"box mismatch ({prod_box} vs {target_box_size})"
     
     # Brand check
-    brand_lower = brand.lower()
-    brand_first = brand_lower.split()[0]
-    if brand_first not in prod_name and brand_lower not in prod_name:
+    if sig.brand_first not in prod_name and sig.brand not in prod_name:
         return False, "brand not found"
     
-    # Cigar name matching
-    cigar_normalized = normalize_name(cigar_name.lower())
-    
     # Roman numerals must match exactly
-    roman_pattern = r'\b(i{1,3}|iv|v|vi{1,3}|ix|x{1,3})\b'
-    cigar_romans = set(re.findall(roman_pattern, cigar_name.lower()))
-    prod_romans = set(re.findall(roman_pattern, prod_name))
-    
     # If cigar name has roman numerals, product must have matching ones
-    if cigar_romans:
+    if sig.romans:
+        prod_romans = romans(prod_name)
         if not prod_romans:
-            return False, f"missing roman numeral (expected {cigar_romans})"
-        if cigar_romans != prod_romans:
-            return False, f"roman numeral mismatch ({cigar_romans} vs {prod_romans})"
+            return False, f"missing roman numeral (expected {set(sig.romans)})"
+        if sig.romans != prod_romans:
+            return False, f"roman numeral mismatch ({set(sig.romans)} vs {set(prod_romans)})"
     
     # Year numbers must match if present
-    year_pattern = r'\b(19\d{2}|20\d{2})\b'
-    cigar_years = set(re.findall(year_pattern, cigar_name.lower()))
-    prod_years = set(re.findall(year_pattern, prod_name))
-    
-    if cigar_years and not cigar_years.intersection(prod_years):
+    if sig.years and not sig.years.intersection(years(prod_name)):
         return False, "year mismatch"
     
     # Key words matching - the last word (vitola name) is most important
-    key_words = [w for w in cigar_normalized.split() if len(w) > 2]
-    
-    if key_words:
+    if sig.key_words:
         # Last word is typically the vitola name (Maestros, Robusto, etc) - must match
-        last_word = key_words[-1]
-        last_word_stem = get_stem(last_word)
-        
-        # Check if last word or its stem is in product name
-        if last_word not in prod_name and last_word_stem not in prod_name:
+        last_word = sig.key_words[-1]
+        if last_word not in prod_name and sig.key_stems[-1] not in prod_name:
             return False, f"vitola mismatch (expected '{last_word}')"
         
         # Also need at least one other key word to match (if there are multiple)
-        if len(key_words) > 1:
-            other_words = key_words[:-1]
-            if not any(word in prod_name for word in other_words):
+        if len(sig.key_words) > 1:
+            if not any(word in prod_name for word in sig.key_words[:-1]):
                 return False, "no other key words matched"
     
     return True, "matched"
 
 
+def candidate_products(index, brand, cigar_name):
+    """
+    Products from a ProductIndex that could pass match_product(), in index order.
+    
+    Mirrors match_product()'s brand, roman-numeral, year and vitola rules as
+    postings lookups; the result is always a superset of the matches.
+    """
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
+    # brand_first is a substring of the full brand, so it covers both checks
+    ids = index.containing(sig.brand_first)
+    ids = index.intersect(ids, index.tokens_all(sig.romans), index.tokens_any(sig.years))
+    if sig.key_words:
+        ids = index.intersect(ids, index.containing_any([sig.key_words[-1], sig.key_stems[-1]]))
+    return index.select(ids)
+
+
+def find_match(products, brand, cigar_name, box_size):
+    """Return a scrape() result for the first matching product, or None."""
+    for product in products:
+        is_match, reason = match_product(product, brand, cigar_name, box_size)
+        
+        if is_match:
+            return {
+                'price': product['price'],
+                'box_size': product['box_size'],
+                'product_name': product['name'],
+                'retailer': 'Havana House',
+                'url': product.get('url', ''),
+                'in_stock': product.get('in_stock', True)
+            }
+    
+    return None
+
+
+def preflight():
+    """Canary run before any cigar: '' if listing parsing works, else the reason."""
+    # Listing tiles carry the price, so products parsed means prices parsed
+    if CATALOGUE_MODE and load_catalogue():
+        return ''
+    if not search_products(CANARY_TERM):
+        return f"search '{CANARY_TERM}' returned no priced products"
+    return ''
+
+
 def scrape(brand, cigar_name, box_size):
     """
     Main entry point: Find price for a specific cigar.
@@ -385,23 +608,43 @@ def scrape(brand, cigar_name, box_size):
     Returns:
         dict with 'price' and 'box_size' if found, or None
     """
+    if CATALOGUE_MODE:
+        catalogue = load_catalogue()
+        if catalogue:
+            return find_match(candidate_products(catalogue, brand, cigar_name), brand, cigar_name, box_size)
+    
     search_terms = get_search_terms(brand, cigar_name)
     
     for term in search_terms:
-        products = search_products(term)
-        
-        for product in products:
-            is_match, reason = match_product(product, brand, cigar_name, box_size)
-            
-            if is_match:
-                return {
-                    'price': product['price'],
-                    'box_size': product['box_size'],
-                    'product_name': product['name'],
-                    'retailer': 'Havana House',
-                    'url': product.get('url', ''),
-                    'in_stock': product.get('in_stock', True)
-                }
+        result = find_match(search_products(term), brand, cigar_name, box_size)
+        if result:
+            return result
+    
+    return None
+
+
+async def preflight_async(engine):
+    """Async version of preflight()."""
+    if CATALOGUE_MODE and await load_catalogue_async(engine):
+        return ''
+    if not await search_products_async(engine, CANARY_TERM):
+        return f"search '{CANARY_TERM}' returned no priced products"
+    return ''
+
+
+async def scrape_async(engine, brand, cigar_name, box_size):
+    """Async version of scrape()."""
+    if CATALOGUE_MODE:
+        catalogue = await load_catalogue_async(engine)
+        if catalogue:
+            return find_match(candidate_products(catalogue, brand, cigar_name), brand, cigar_name, box_size)
+    
+    search_terms = get_search_terms(brand, cigar_name)
+    
+    for term in search_terms:
+        result = find_match(await search_products_async(engine, term), brand, cigar_name, box_size)
+        if result:
+            return result
     
     return None
 
@@ -9,74 +9,123 @@ that update price dynamically when selected.
 
 URL pattern: /search/{search_term}
 Product page: Select dropdown for sizes, price updates on selection
+
+The page also embeds Magento's configurable-product config (spConfig /
+jsonConfig) with every option label, price and salable flag. It is parsed
+once per product URL and all box sizes are served from it; selecting
+dropdown options is only the fallback for pages without that config.
 """
 
+import os
 import re
+import json
 import sys
-import time
-import random
 from urllib.parse import quote_plus
 
-def install(pkg):
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
+# Make the shared scrapers package importable when run standalone
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    install("playwright")
-    from playwright.sync_api import sync_playwright
+from scrapers import browser
+from scrapers import readiness
+from scrapers import metrics
+from scrapers.cache import ScrapeCache
+from scrapers.matching import (
+    match_rules, normalize_name, get_stem, extract_box_size, match_signature, romans, key_word_matches
+)
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    install("beautifulsoup4")
-    from bs4 import BeautifulSoup
+from scrapers import html_parser
 
 
 # Module state
-_playwright = None
-_browser = None
 _context = None
 _page = None
-_cache = {}
+_cache = ScrapeCache()
+
+# Product URL _page currently shows, so a dropdown read can reuse the load
+_loaded_url = None
+
+# Term -> shared query from the orchestrator's search plan
+_search_aliases = {}
+
+# Browser context settings (shared by the sync page and the async engine)
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'locale': 'en-GB',
+    'timezone_id': 'Europe/London',
+}
+
+# Hide webdriver
+INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+    window.chrome = { runtime: {} };
+"""
+
+# Behike number in a product name ("Behike 52" or "Behike BHK 52")
+BEHIKE_RE = re.compile(r'behike\s*(?:bhk\s*)?(\d+)')
+
+# Requests to abort and how to label pages for byte accounting (see resource_policy.py)
+RESOURCE_POLICY = {
+    'retailer': 'JJ Fox',
+    'page_types': [
+        ('search', r'/search/'),
+        ('product', r'.'),
+    ],
+}
+
+# What "loaded" means per page type (see readiness.py). After a box size
+# is picked the price node is re-rendered - wait for its text to change
+# (capped at the 1s the old fixed sleep used, for options priced the same).
+READINESS = {
+    'search': {'selector': '.product-item', 'phase': 'search'},
+    'product': {'selector': 'select, .price', 'phase': 'product'},
+    'price': {'text_change': '.price', 'timeout': 1000},
+}
+
+# Page parts each parser reads - the rest of the page is never parsed (see html_parser.py)
+SUBTREES = {
+    'search': '.product-item',
+}
+
+# Pages in flight at once in async mode
+CONCURRENCY = 3
+
+# Preflight canary: a known search (or brand listing) that must return
+# products that parse (see preflight())
+CANARY_TERM = 'Montecristo'
+
+# Name noise on JJ Fox product names (bracketed text dropped) and the
+# box-size forms of its size dropdown ('BOX OF 25', 'CABINET OF 25')
+MATCH_RULES = match_rules(
+    noise=(
+        r'\s*-?\s*box\s*of\s*\d+',
+        r'\s*-?\s*cabinet\s*of?\s*\d+',
+        r'\s*\(.*?\)',
+    ),
+    box_patterns=(
+        r'box of (\d+)',
+        r'cabinet of (\d+)',
+        r'pack of (\d+)',
+    ),
+    box_range=None,
+    single='single',
+)
 
 
 def init():
     """Initialize the browser."""
-    global _playwright, _browser, _context, _page
+    global _context, _page
     if _page:
         return
     
-    print("  Starting browser...")
+    print("  Opening browser context...")
     
     try:
-        _playwright = sync_playwright().start()
-        
-        _browser = _playwright.chromium.launch(
-            headless=True,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-            ]
-        )
-        
-        _context = _browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            locale='en-GB',
-            timezone_id='Europe/London',
-        )
-        
+        # Own context on the shared browser - keeps this retailer's fingerprint
+        _context = browser.new_context(CONTEXT_OPTIONS, INIT_SCRIPT, RESOURCE_POLICY)
         _page = _context.new_page()
-        
-        # Hide webdriver
-        _page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-            window.chrome = { runtime: {} };
-        """)
-        
         print("  Browser ready")
     except Exception as e:
         print(f"  Browser init error: {e}")
@@ -85,58 +134,27 @@ def init():
 
 def cleanup():
     """Clean up browser resources."""
-    global _playwright, _browser, _context, _page
-    try:
-        if _browser:
-            _browser.close()
-        if _playwright:
-            _playwright.stop()
-    except:
-        pass
-    _playwright = _browser = _context = _page = None
-
-
-def normalize_name(text):
-    """Normalize product name for comparison."""
-    t = text.lower()
-    t = re.sub(r'\s*-?\s*box\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*cabinet\s*of?\s*\d+', '', t)
-    t = re.sub(r'\s*\(.*?\)', '', t)  # Remove parenthetical text
-    t = re.sub(r'[^\w\s]', ' ', t)
-    return ' '.join(t.split())
-
-
-def get_stem(word):
-    """Get word stem by removing common endings."""
-    w = word.lower().strip()
-    if w.endswith('os'):
-        return w[:-1]
-    if w.endswith('es') and len(w) > 3:
-        return w[:-1]
-    if w.endswith('s') and len(w) > 3:
-        return w[:-1]
-    return w
-
-
-def extract_box_size_from_option(text):
-    """Extract box size from dropdown option text like 'BOX OF 25' or 'CABINET OF 25'."""
-    t = text.upper()
-    
-    patterns = [
-        r'BOX OF (\d+)',
-        r'CABINET OF (\d+)',
-        r'PACK OF (\d+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, t)
-        if match:
-            return int(match.group(1))
-    
-    if 'SINGLE' in t:
-        return 1
-    
-    return None
+    global _context, _page, _loaded_url
+    if _context:
+        browser.close_context(_context)
+    _context = _page = _loaded_url = None
+
+
+def create_engine():
+    """Create an async page-pool engine configured like init()'s context."""
+    from scrapers.async_engine import AsyncEngine
+    return AsyncEngine(
+        concurrency=CONCURRENCY,
+        context_options=CONTEXT_OPTIONS,
+        init_script=INIT_SCRIPT,
+        resource_policy=RESOURCE_POLICY,
+    )
+
+
+def set_search_plan(aliases):
+    """Route search terms through the orchestrator's inventory-wide search plan."""
+    _search_aliases.clear()
+    _search_aliases.update(aliases)
 
 
 def get_search_terms(brand, name):
@@ -170,288 +188,444 @@ def get_search_terms(brand, name):
     return terms
 
 
+def search_url(term):
+    """Search results URL for a term."""
+    return f"https://www.jjfox.co.uk/search/{quote_plus(term)}"
+
+
+@metrics.timed('parse')
+def parse_search_results(html):
+    """Parse product items from a search results page."""
+    products = []
+    soup = html_parser.parse(html, SUBTREES['search'])
+    
+    # Find product items
+    items = soup.select('.product-item')
+    
+    for item in items:
+        try:
+            # Find product name and URL from links
+            links = item.select('a')
+            name = ''
+            product_url = ''
+            
+            for link in links:
+                text = link.get_text(strip=True)
+                href = link.get('href', '')
+                if text and len(text) > 3 and 'QUICK' not in text.upper() and 'VIEW' not in text.upper():
+                    name = text
+                    product_url = href
+                    break
+            
+            if not name or not product_url:
+                continue
+            
+            # Skip non-cigars
+            skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'candle', 'case', 
+                          'pouch', 'gift', 'accessory', 'dupont', 'boveda']
+            if any(w in name.lower() for w in skip_words):
+                continue
+            
+            # Get stock status
+            stock_el = item.select_one('.stock')
+            stock_text = stock_el.get_text(strip=True) if stock_el else ''
+            
+            products.append({
+                'name': name,
+                'url': product_url,
+                'normalized': normalize_name(name, MATCH_RULES),
+                'stock': stock_text
+            })
+        except:
+            continue
+    
+    return products
+
+
 def search_products(term):
     """Search JJ Fox for products."""
+    term = _search_aliases.get(term, term)
     cache_key = f"jjfox:{term}"
     if cache_key in _cache:
         return _cache[cache_key]
     
-    url = f"https://www.jjfox.co.uk/search/{quote_plus(term)}"
+    url = search_url(term)
     products = []
     
     try:
-        time.sleep(random.uniform(0.5, 1.0))
         init()
         
-        _page.goto(url, wait_until='networkidle', timeout=30000)
-        
-        # Wait for products
-        try:
-            _page.wait_for_selector('.product-item', timeout=5000)
-        except:
-            pass
+        readiness.goto(_page, url, READINESS['search'])
         
-        html = _page.content()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Find product items
-        items = soup.select('.product-item')
-        
-        for item in items:
-            try:
-                # Find product name and URL from links
-                links = item.select('a')
-                name = ''
-                product_url = ''
-                
-                for link in links:
-                    text = link.get_text(strip=True)
-                    href = link.get('href', '')
-                    if text and len(text) > 3 and 'QUICK' not in text.upper() and 'VIEW' not in text.upper():
-                        name = text
-                        product_url = href
-                        break
-                
-                if not name or not product_url:
-                    continue
-                
-                # Skip non-cigars
-                skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'candle', 'case', 
-                              'pouch', 'gift', 'accessory', 'dupont', 'boveda']
-                if any(w in name.lower() for w in skip_words):
-                    continue
-                
-                # Get stock status
-                stock_el = item.select_one('.stock')
-                stock_text = stock_el.get_text(strip=True) if stock_el else ''
-                
-                products.append({
-                    'name': name,
-                    'url': product_url,
-                    'normalized': normalize_name(name),
-                    'stock': stock_text
-                })
-            except:
-                continue
+        products = parse_search_results(_page.content())
         
         print(f"    JJ Fox '{term}': {len(products)} products")
         
     except Exception as e:
         print(f"    JJ Fox search error: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, products)
+        return products
     
     _cache[cache_key] = products
     return products
 
 
-def get_product_price(product_url, target_box_size):
+def parse_price_text(text):
+    """Extract a £ price from element text."""
+    price_match = re.search(r'£([\d,]+\.?\d*)', text or '')
+    if price_match:
+        return float(price_match.group(1).replace(',', ''))
+    return None
+
+
+def box_price_result(price, target_box_size, in_stock, product_url):
+    """Build a price result, rejecting prices too low for the box size."""
+    # Validate price is reasonable for the box size
+    # Minimum ~£15 per cigar for premium Cubans
+    min_price = target_box_size * 15
+    
+    if price >= min_price:
+        return {
+            'price': price,
+            'box_size': target_box_size,
+            'in_stock': in_stock,
+            'url': product_url
+        }
+    
+    # Price too low - likely showing single cigar price for all-OOS product
+    # Return special marker indicating product exists but price unavailable
+    return {
+        'price': None,
+        'box_size': target_box_size,
+        'in_stock': False,
+        'url': product_url,
+        'price_unavailable': True
+    }
+
+
+def box_not_available_result(target_box_size, product_url):
+    """Marker for a product that doesn't come in the requested box size."""
+    return {
+        'price': None,
+        'box_size': target_box_size,
+        'in_stock': False,
+        'url': product_url,
+        'box_not_available': True
+    }
+
+
+def find_option(options, target_box_size):
+    """Find the dropdown option matching the target box size."""
+    for opt in options:
+        box_size = extract_box_size(opt['text'], MATCH_RULES)
+        if box_size == target_box_size:
+            return opt
+    return None
+
+
+SIZE_SELECT = 'select.super-attribute-select, select[id*="attribute"]'
+
+OPTIONS_JS = '''(sel) => {
+    return Array.from(sel.options).map(o => ({
+        value: o.value,
+        text: o.textContent.trim()
+    }));
+}'''
+
+
+CONFIG_KEYS = ('"spConfig"', '"jsonConfig"')
+
+
+def find_product_config(html):
+    """Return the first embedded spConfig/jsonConfig object in a page, or None."""
+    decoder = json.JSONDecoder()
+    for key in CONFIG_KEYS:
+        pos = html.find(key)
+        while pos != -1:
+            start = html.find('{', pos + len(key))
+            try:
+                config, _ = decoder.raw_decode(html, start)
+                if isinstance(config, dict) and config.get('attributes'):
+                    return config
+            except ValueError:
+                pass
+            pos = html.find(key, pos + len(key))
+    return None
+
+
+def _amount(value):
+    """Price amount from a Magento price entry ({'amount': x} or a number)."""
+    if isinstance(value, dict):
+        value = value.get('amount')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@metrics.timed('parse')
+def parse_product_config(html):
     """
-    Fetch product page and get price for specific box size.
-    Returns dict with price info or None.
+    Read every box-size option from the page's configurable-product config.
+    
+    Returns {box_size (str): {'price', 'in_stock', 'label'}}, or {} if the
+    page has no config with box-size options.
     """
-    cache_key = f"jjfox_price:{product_url}:{target_box_size}"
+    config = find_product_config(html)
+    if not config:
+        return {}
+    
+    option_prices = config.get('optionPrices', {})
+    salable = config.get('salable')
+    base_price = _amount(config.get('prices', {}).get('finalPrice')) or _amount(config.get('basePrice'))
+    
+    for attr_id, attr in config['attributes'].items():
+        options = {}
+        for opt in attr.get('options', []):
+            box_size = extract_box_size(opt.get('label', ''), MATCH_RULES)
+            if not box_size:
+                continue
+            
+            products = opt.get('products', [])
+            prices = [_amount(option_prices.get(str(pid), {}).get('finalPrice')) for pid in products]
+            prices = [p for p in prices if p]
+            
+            if prices:
+                price = min(prices)
+            elif 'price' in opt and config.get('basePrice') is not None:
+                # Older configs carry price deltas on the option
+                price = (_amount(config['basePrice']) or 0) + (_amount(opt['price']) or 0)
+            else:
+                # No salable child - the page would show the parent's price
+                price = base_price
+            
+            if salable is not None:
+                in_stock = bool(salable.get(str(attr_id), {}).get(str(opt.get('id')), []))
+            else:
+                in_stock = bool(products) and 'out of stock' not in opt.get('label', '').lower()
+            
+            options.setdefault(str(box_size), {'price': price, 'in_stock': in_stock, 'label': opt.get('label', '')})
+        
+        # The box size attribute is the one whose labels carry box sizes
+        if options:
+            return options
+    
+    return {}
+
+
+def config_price_result(options, target_box_size, product_url):
+    """Price info for one box size from parse_product_config() output."""
+    option = options.get(str(target_box_size))
+    if option is None:
+        # Box size option doesn't exist for this product
+        return box_not_available_result(target_box_size, product_url)
+    if not option['price']:
+        return None
+    return box_price_result(option['price'], target_box_size, option['in_stock'], product_url)
+
+
+def get_product_config(product_url):
+    """Load a product page once and cache all of its box-size prices ({} if none)."""
+    global _loaded_url
+    cache_key = f"jjfox_prices:{product_url}"
     if cache_key in _cache:
         return _cache[cache_key]
     
-    result = None
-    
     try:
-        time.sleep(random.uniform(0.3, 0.6))
-        _page.goto(product_url, wait_until='networkidle', timeout=30000)
-        
-        # Wait for page to load
-        try:
-            _page.wait_for_selector('select, .price', timeout=5000)
-        except:
-            pass
-        
-        # Find the size dropdown
-        select = _page.query_selector('select.super-attribute-select, select[id*="attribute"]')
+        _loaded_url = None
+        readiness.goto(_page, product_url, READINESS['product'])
+        _loaded_url = product_url
+        options = parse_product_config(_page.content())
+    except Exception as e:
+        print(f"    Error getting product config: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, {})
+        return {}
+    
+    _cache[cache_key] = options
+    return options
+
+
+def read_dropdown_price(page, product_url, target_box_size):
+    """Price for one box size from a loaded product page's size dropdown (None if not found)."""
+    # Find the size dropdown
+    select = page.query_selector(SIZE_SELECT)
+    
+    if select:
+        # Find the option matching our target box size
+        options = page.evaluate(OPTIONS_JS, select)
+        target_option = find_option(options, target_box_size)
         
-        if select:
-            # Get all options
-            options = _page.evaluate('''(sel) => {
-                return Array.from(sel.options).map(o => ({
-                    value: o.value,
-                    text: o.textContent.trim()
-                }));
-            }''', select)
+        if target_option and target_option['value']:
+            # Check if out of stock
+            is_out_of_stock = 'out of stock' in target_option['text'].lower()
             
-            # Find the option matching our target box size
-            target_option = None
-            for opt in options:
-                box_size = extract_box_size_from_option(opt['text'])
-                if box_size == target_box_size:
-                    target_option = opt
-                    break
+            # Select the option and wait for the price to update
+            readiness.perform(page, READINESS['price'],
+                              lambda: page.select_option(SIZE_SELECT, target_option['value']))
             
-            if target_option and target_option['value']:
-                # Check if out of stock
-                is_out_of_stock = 'out of stock' in target_option['text'].lower()
-                
-                # Select the option
-                _page.select_option('select.super-attribute-select, select[id*="attribute"]', 
-                                   target_option['value'])
-                
-                # Wait for price to update - needs longer delay
-                time.sleep(1.0)
+            # Get the updated price
+            price_el = page.query_selector('.price')
+            if price_el:
+                price = parse_price_text(price_el.inner_text())
+                if price:
+                    return box_price_result(price, target_box_size, not is_out_of_stock, product_url)
+        elif target_option is None:
+            # Box size option doesn't exist for this product
+            return box_not_available_result(target_box_size, product_url)
+        return None
+    
+    # No dropdown - might be a simple product
+    # Check if there's a price displayed
+    price_el = page.query_selector('.price')
+    if price_el:
+        price = parse_price_text(price_el.inner_text())
+        if price:
+            # Try to determine box size from page content
+            page_text = page.inner_text('body')
+            box_match = re.search(r'box(?:es)? of (\d+)', page_text, re.IGNORECASE)
+            
+            if box_match and int(box_match.group(1)) == target_box_size:
+                stock_el = page.query_selector('.stock')
+                in_stock = 'in stock' in (stock_el.inner_text().lower() if stock_el else '')
                 
-                # Get the updated price
-                price_el = _page.query_selector('.price')
-                if price_el:
-                    price_text = price_el.inner_text()
-                    price_match = re.search(r'£([\d,]+\.?\d*)', price_text)
-                    if price_match:
-                        price = float(price_match.group(1).replace(',', ''))
-                        
-                        # Validate price is reasonable for the box size
-                        # Minimum ~£15 per cigar for premium Cubans
-                        min_price = target_box_size * 15
-                        
-                        if price >= min_price:
-                            result = {
-                                'price': price,
-                                'box_size': target_box_size,
-                                'in_stock': not is_out_of_stock,
-                                'url': product_url
-                            }
-                        else:
-                            # Price too low - likely showing single cigar price for all-OOS product
-                            # Return special marker indicating product exists but price unavailable
-                            result = {
-                                'price': None,
-                                'box_size': target_box_size,
-                                'in_stock': False,
-                                'url': product_url,
-                                'price_unavailable': True
-                            }
-            elif target_option is None:
-                # Box size option doesn't exist for this product
-                result = {
-                    'price': None,
+                return {
+                    'price': price,
                     'box_size': target_box_size,
-                    'in_stock': False,
-                    'url': product_url,
-                    'box_not_available': True
+                    'in_stock': in_stock,
+                    'url': product_url
                 }
-        else:
-            # No dropdown - might be a simple product
-            # Check if there's a price displayed
-            price_el = _page.query_selector('.price')
-            if price_el:
-                price_text = price_el.inner_text()
-                price_match = re.search(r'£([\d,]+\.?\d*)', price_text)
-                if price_match:
-                    price = float(price_match.group(1).replace(',', ''))
-                    
-                    # Try to determine box size from page content
-                    page_text = _page.inner_text('body')
-                    box_match = re.search(r'box(?:es)? of (\d+)', page_text, re.IGNORECASE)
-                    
-                    if box_match:
-                        found_size = int(box_match.group(1))
-                        if found_size == target_box_size:
-                            stock_el = _page.query_selector('.stock')
-                            in_stock = 'in stock' in (stock_el.inner_text().lower() if stock_el else '')
-                            
-                            result = {
-                                'price': price,
-                                'box_size': target_box_size,
-                                'in_stock': in_stock,
-                                'url': product_url
-                            }
-        
+    return None
+
+
+def get_product_price(product_url, target_box_size):
+    """
+    Fetch product page and get price for specific box size.
+    Returns dict with price info or None.
+    """
+    global _loaded_url
+    options = get_product_config(product_url)
+    if options:
+        return config_price_result(options, target_box_size, product_url)
+    
+    # No embedded config - fall back to selecting the dropdown option
+    cache_key = f"jjfox_price:{product_url}:{target_box_size}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    result = None
+    
+    try:
+        # get_product_config() has usually just loaded this page - only
+        # navigate if its (empty) config came from the cache
+        if _loaded_url != product_url or _page.url != product_url:
+            _loaded_url = None
+            readiness.goto(_page, product_url, READINESS['product'])
+            _loaded_url = product_url
+        result = read_dropdown_price(_page, product_url, target_box_size)
     except Exception as e:
         print(f"    Error getting price: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, result)
+        return result
     
     _cache[cache_key] = result
     return result
 
 
+@metrics.timed('match')
 def match_product(product, brand, cigar_name):
     """Check if product matches brand and cigar name."""
     prod_name = product['normalized']
     prod_name_original = product['name'].lower()
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
     
     # Brand check
-    brand_lower = brand.lower()
-    brand_first = brand_lower.split()[0]
-    if brand_first not in prod_name and brand_lower not in prod_name:
+    if sig.brand_first not in prod_name and sig.brand not in prod_name:
         return False, "brand not found"
     
-    # Cigar name matching
-    cigar_normalized = normalize_name(cigar_name.lower())
-    
-    # Special handling for Behike - the number is critical
-    if 'behike' in cigar_name.lower():
-        behike_num = re.search(r'behike\s*(\d+)', cigar_name.lower())
-        if behike_num:
-            target_num = behike_num.group(1)
-            # Check if the EXACT Behike number is in the product name
-            prod_behike = re.search(r'behike\s*(?:bhk\s*)?(\d+)', prod_name_original)
-            if not prod_behike or prod_behike.group(1) != target_num:
-                return False, f"Behike number mismatch (want {target_num})"
+    # Special handling for Behike - the EXACT number must be in the product name
+    if sig.behike:
+        prod_behike = BEHIKE_RE.search(prod_name_original)
+        if not prod_behike or prod_behike.group(1) != sig.behike:
+            return False, f"Behike number mismatch (want {sig.behike})"
     
     # Roman numerals must match exactly
-    roman_pattern = r'\b(i{1,3}|iv|v|vi{1,3}|ix|x{1,3})\b'
-    cigar_romans = set(re.findall(roman_pattern, cigar_name.lower()))
-    prod_romans = set(re.findall(roman_pattern, prod_name))
-    
-    if cigar_romans:
+    if sig.romans:
+        prod_romans = romans(prod_name)
         if not prod_romans:
             return False, f"missing roman numeral"
-        if cigar_romans != prod_romans:
+        if sig.romans != prod_romans:
             return False, f"roman numeral mismatch"
     
-    # Vitola (last word) matching - but skip if it's a Roman numeral (already checked above)
-    cigar_words = cigar_name.lower().split()
-    if cigar_words:
-        last_word = cigar_words[-1]
-        last_word_stem = get_stem(last_word)
-        
-        # Skip if last word is a Roman numeral or common non-vitola word
-        roman_nums = {'i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x'}
-        skip_words = {'box', 'of', 'cigars', 'cigar', '52', '54', '56'}
-        
-        if last_word not in roman_nums and last_word not in skip_words:
-            # Check if vitola or its stem is in product name
-            found_vitola = False
-            
-            # Direct match
-            if last_word in prod_name or last_word_stem in prod_name:
-                found_vitola = True
-            elif last_word in prod_name_original or last_word_stem in prod_name_original:
-                found_vitola = True
-            else:
-                # Try fuzzy match for common misspellings (e<->a vowel swap)
-                # Generate variations: leyenda -> leyanda, leyenda
-                for i, char in enumerate(last_word):
-                    if char == 'e':
-                        variation = last_word[:i] + 'a' + last_word[i+1:]
-                        if variation in prod_name_original:
-                            found_vitola = True
-                            break
-                    elif char == 'a':
-                        variation = last_word[:i] + 'e' + last_word[i+1:]
-                        if variation in prod_name_original:
-                            found_vitola = True
-                            break
-            
-            if not found_vitola:
-                return False, f"vitola mismatch (expected '{last_word}')"
+    # Vitola (last word) matching - skipped for Roman numerals (already checked above)
+    if sig.check_vitola:
+        found_vitola = (
+            sig.last_word in prod_name or sig.last_stem in prod_name
+            or sig.last_word in prod_name_original or sig.last_stem in prod_name_original
+            # Fuzzy match for common misspellings (e<->a vowel swap)
+            or any(v in prod_name_original for v in sig.last_swaps)
+        )
+        if not found_vitola:
+            return False, f"vitola mismatch (expected '{sig.last_word}')"
     
     # Key words matching (for additional validation)
-    key_words = [w for w in cigar_normalized.split() if len(w) > 2]
-    
-    if key_words:
-        matched_words = sum(1 for word in key_words if word in prod_name or get_stem(word) in prod_name)
-        min_matches = max(1, len(key_words) // 2) if len(key_words) > 2 else len(key_words)
-        
-        if matched_words < min_matches:
-            return False, f"insufficient word matches"
+    if sig.key_words and key_word_matches(sig, prod_name) < sig.min_key_matches:
+        return False, f"insufficient word matches"
     
     return True, "matched"
 
 
+def price_info_result(product, price_info, brand, cigar_name, box_size):
+    """
+    Turn a product page price lookup into a scrape() result.
+    
+    Returns None when the search should move on to the next product.
+    """
+    if not price_info:
+        return None
+    
+    # Check for special cases
+    if price_info.get('price_unavailable'):
+        print(f"  ⚠ PRICE UNAVAILABLE (all OOS) {brand} {cigar_name} (Box {box_size})")
+        return {
+            'price': None,
+            'box_size': price_info['box_size'],
+            'product_name': product['name'],
+            'retailer': 'JJ Fox',
+            'url': price_info['url'],
+            'in_stock': False,
+            'price_unavailable': True
+        }
+    elif price_info.get('box_not_available'):
+        # Box size not available for THIS product, but keep searching others
+        return None
+    elif price_info.get('price'):
+        return {
+            'price': price_info['price'],
+            'box_size': price_info['box_size'],
+            'product_name': product['name'],
+            'retailer': 'JJ Fox',
+            'url': price_info['url'],
+            'in_stock': price_info['in_stock']
+        }
+    
+    return None
+
+
+def preflight():
+    """Canary run before any cigar: '' if search and product parsing work, else the reason."""
+    products = search_products(CANARY_TERM)
+    if not products:
+        return f"search '{CANARY_TERM}' returned no products"
+    # Either the embedded config or the dropdown path must yield a result
+    url = products[0]['url']
+    if not get_product_config(url) and get_product_price(url, 25) is None:
+        return f"product '{products[0]['name']}' parsed no prices"
+    return ''
+
+
 def scrape(brand, cigar_name, box_size):
     """
     Main entry point: Find price for a specific cigar.
@@ -478,33 +652,183 @@ def scrape(brand, cigar_name, box_size):
             if is_match:
                 # Get price for the target box size
                 price_info = get_product_price(product['url'], box_size)
-                
-                if price_info:
-                    # Check for special cases
-                    if price_info.get('price_unavailable'):
-                        print(f"  ⚠ PRICE UNAVAILABLE (all OOS) {brand} {cigar_name} (Box {box_size})")
-                        return {
-                            'price': None,
-                            'box_size': price_info['box_size'],
-                            'product_name': product['name'],
-                            'retailer': 'JJ Fox',
-                            'url': price_info['url'],
-                            'in_stock': False,
-                            'price_unavailable': True
-                        }
-                    elif price_info.get('box_not_available'):
-                        # Box size not available for THIS product, but keep searching others
-                        # Don't return, continue to next product
-                        pass
-                    elif price_info.get('price'):
-                        return {
-                            'price': price_info['price'],
-                            'box_size': price_info['box_size'],
-                            'product_name': product['name'],
-                            'retailer': 'JJ Fox',
-                            'url': price_info['url'],
-                            'in_stock': price_info['in_stock']
-                        }
+                result = price_info_result(product, price_info, brand, cigar_name, box_size)
+                if result:
+                    return result
+    
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Async engine (several cigars in flight through a bounded page pool)
+# ---------------------------------------------------------------------------
+
+async def search_products_async(engine, term):
+    """Async version of search_products() using a page from the engine pool."""
+    term = _search_aliases.get(term, term)
+    cache_key = f"jjfox:{term}"
+    
+    async def fetch():
+        products = []
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, search_url(term), READINESS['search'])
+                html = await page.content()
+            
+            products = parse_search_results(html)
+            print(f"    JJ Fox '{term}': {len(products)} products")
+        except Exception as e:
+            print(f"    JJ Fox search error: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, products)
+            return products
+        
+        _cache[cache_key] = products
+        return products
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def get_product_config_async(engine, product_url, no_config=None):
+    """
+    Async version of get_product_config() - concurrent box sizes share one load.
+    
+    no_config(page) is awaited on the still-open page if this call loads it
+    and it has no config, so the caller can read the dropdown without
+    loading the page again.
+    """
+    cache_key = f"jjfox_prices:{product_url}"
+    
+    async def fetch():
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, product_url, READINESS['product'])
+                options = parse_product_config(await page.content())
+                if not options and no_config:
+                    await no_config(page)
+        except Exception as e:
+            print(f"    Error getting product config: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, {})
+            return {}
+        
+        _cache[cache_key] = options
+        return options
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def read_dropdown_price_async(page, product_url, target_box_size):
+    """Async version of read_dropdown_price()."""
+    select = await page.query_selector(SIZE_SELECT)
+    
+    if select:
+        options = await page.evaluate(OPTIONS_JS, select)
+        target_option = find_option(options, target_box_size)
+        
+        if target_option and target_option['value']:
+            is_out_of_stock = 'out of stock' in target_option['text'].lower()
+            await readiness.perform_async(page, READINESS['price'],
+                                          lambda: page.select_option(SIZE_SELECT, target_option['value']))
+            
+            price_el = await page.query_selector('.price')
+            if price_el:
+                price = parse_price_text(await price_el.inner_text())
+                if price:
+                    return box_price_result(price, target_box_size, not is_out_of_stock, product_url)
+        elif target_option is None:
+            return box_not_available_result(target_box_size, product_url)
+        return None
+    
+    price_el = await page.query_selector('.price')
+    if price_el:
+        price = parse_price_text(await price_el.inner_text())
+        if price:
+            page_text = await page.inner_text('body')
+            box_match = re.search(r'box(?:es)? of (\d+)', page_text, re.IGNORECASE)
+            
+            if box_match and int(box_match.group(1)) == target_box_size:
+                stock_el = await page.query_selector('.stock')
+                stock_text = (await stock_el.inner_text()).lower() if stock_el else ''
+                return {
+                    'price': price,
+                    'box_size': target_box_size,
+                    'in_stock': 'in stock' in stock_text,
+                    'url': product_url
+                }
+    return None
+
+
+async def get_product_price_async(engine, product_url, target_box_size):
+    """Async version of get_product_price()."""
+    cache_key = f"jjfox_price:{product_url}:{target_box_size}"
+    read = {}
+    
+    async def no_config(page):
+        # Read the dropdown on the page the config lookup just loaded
+        try:
+            read['result'] = await read_dropdown_price_async(page, product_url, target_box_size)
+        except Exception as e:
+            print(f"    Error getting price: {e}")
+            read['failed'] = True
+    
+    options = await get_product_config_async(engine, product_url, no_config)
+    if options:
+        return config_price_result(options, target_box_size, product_url)
+    
+    if 'result' in read:
+        _cache[cache_key] = read['result']
+        return read['result']
+    if read.get('failed'):
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, None)
+        return None
+    
+    # The (empty) config came from the cache or another box size's load - load the page ourselves
+    async def fetch():
+        result = None
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, product_url, READINESS['product'])
+                result = await read_dropdown_price_async(page, product_url, target_box_size)
+        except Exception as e:
+            print(f"    Error getting price: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, result)
+            return result
+        
+        _cache[cache_key] = result
+        return result
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def preflight_async(engine):
+    """Async version of preflight()."""
+    products = await search_products_async(engine, CANARY_TERM)
+    if not products:
+        return f"search '{CANARY_TERM}' returned no products"
+    url = products[0]['url']
+    if not await get_product_config_async(engine, url) and await get_product_price_async(engine, url, 25) is None:
+        return f"product '{products[0]['name']}' parsed no prices"
+    return ''
+
+
+async def scrape_async(engine, brand, cigar_name, box_size):
+    """Async version of scrape()."""
+    search_terms = get_search_terms(brand, cigar_name)
+    
+    for term in search_terms:
+        products = await search_products_async(engine, term)
+        
+        for product in products:
+            is_match, reason = match_product(product, brand, cigar_name)
+            
+            if is_match:
+                price_info = await get_product_price_async(engine, product['url'], box_size)
+                result = price_info_result(product, price_info, brand, cigar_name, box_size)
+                if result:
+                    return result
     
     return None
 
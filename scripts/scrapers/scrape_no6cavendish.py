@@ -7,111 +7,148 @@ Shopify-based store - using Playwright for browser access.
 URL patterns:
 - Search: /search?type=product&q={search_term}
 - Product JSON: /products/{handle}.json
+- Full catalogue: /products.json?limit=250&page={n}
 
 Variants include box sizes with prices.
+
+By default the whole catalogue is pulled once per run through the paginated
+products.json endpoint and every scrape() call is answered from that local
+product/variant index. Search mode (NO6_CATALOGUE=0) is kept as a fallback.
 """
 
+import os
 import re
 import sys
-import time
-import random
 import json
+import asyncio
 from urllib.parse import quote_plus
 
-def install(pkg):
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", pkg, "-q"])
+# Make the shared scrapers package importable when run standalone
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    install("playwright")
-    import subprocess
-    subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
-    from playwright.sync_api import sync_playwright
+from scrapers import browser
+from scrapers import readiness
+from scrapers import metrics
+from scrapers.cache import ScrapeCache
+from scrapers.product_index import ProductIndex
+from scrapers.matching import (
+    match_rules, normalize_name, get_stem, extract_box_size, match_signature, romans, key_word_matches
+)
 
 
 # Module state
-_playwright = None
-_browser = None
+_context = None
 _page = None
-_cache = {}
+_cache = ScrapeCache()
+
+# Term -> shared query from the orchestrator's search plan
+_search_aliases = {}
 
 BASE_URL = "https://www.no6cavendish.com"
 
+# Browser context settings (shared by the sync page and the async engine)
+CONTEXT_OPTIONS = {
+    'extra_http_headers': {'Accept-Language': 'en-GB,en;q=0.9'},
+}
+
+# Behike number in a product name ("Behike 52" or "BHK 52")
+BEHIKE_RE = re.compile(r'(?:behike|bhk)\s*(\d+)')
+
+# Requests to abort and how to label pages for byte accounting (see resource_policy.py)
+RESOURCE_POLICY = {
+    'retailer': 'No6 Cavendish',
+    'page_types': [
+        ('catalogue', r'/products\.json'),
+        ('product_json', r'/products/[^/?]+\.json'),
+        ('search', r'/search\?'),
+        ('product', r'/products/'),
+    ],
+}
+
+# What "loaded" means per page type (see readiness.py). JSON endpoints
+# are complete once the document has loaded.
+READINESS = {
+    'search': {'selector': '.grid-product, a[href*="/products/"]', 'phase': 'search'},
+    'json': {'phase': 'json'},
+}
+
+# Pages in flight at once in async mode
+CONCURRENCY = 4
+
+# Preflight canary: a known search (or brand listing) that must return
+# products that parse (see preflight())
+CANARY_TERM = 'Montecristo'
+
+# Name noise on No.6 product names (bracketed text dropped) and the
+# box-size forms of its variant titles ('Box of 10', 'Cabinet of 25')
+MATCH_RULES = match_rules(
+    noise=(
+        r'\s*-?\s*box\s*of\s*\d+',
+        r'\s*-?\s*cabinet\s*of?\s*\d+',
+        r'\s*-?\s*pack\s*of\s*\d+',
+        r'\s*\(.*?\)',
+    ),
+    box_patterns=(
+        r'box of (\d+)',
+        r'cabinet of (\d+)',
+        r'pack of (\d+)',
+    ),
+    box_range=None,
+    single='single',
+    single_unless='tubo',
+)
+
+# Answer lookups from the full products.json catalogue instead of searching
+CATALOGUE_MODE = os.environ.get('NO6_CATALOGUE', '1') != '0'
+CATALOGUE_PAGE_SIZE = 250
+CATALOGUE_MAX_PAGES = 40
+
+# Catalogue index for this run ({'products': ProductIndex} once loaded)
+_catalogue = {}
+
 
 def init():
     """Initialize the browser."""
-    global _playwright, _browser, _page
+    global _context, _page
     if _page:
         return
     
-    print("  Starting browser...")
-    _playwright = sync_playwright().start()
-    _browser = _playwright.chromium.launch(headless=True)
-    _page = _browser.new_page()
-    _page.set_extra_http_headers({
-        'Accept-Language': 'en-GB,en;q=0.9',
-    })
-    print("  Browser ready")
+    print("  Opening browser context...")
+    
+    try:
+        # Own context on the shared browser - keeps this retailer's fingerprint
+        _context = browser.new_context(CONTEXT_OPTIONS, resource_policy=RESOURCE_POLICY)
+        _page = _context.new_page()
+        print("  Browser ready")
+    except Exception as e:
+        print(f"  Browser init error: {e}")
+        raise
 
 
 def cleanup():
     """Clean up browser resources."""
-    global _playwright, _browser, _page
-    if _page:
-        _page.close()
-    if _browser:
-        _browser.close()
-    if _playwright:
-        _playwright.stop()
-    _playwright = None
-    _browser = None
-    _page = None
-
-
-def normalize_name(text):
-    """Normalize product name for comparison."""
-    t = text.lower()
-    t = re.sub(r'\s*-?\s*box\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*cabinet\s*of?\s*\d+', '', t)
-    t = re.sub(r'\s*-?\s*pack\s*of\s*\d+', '', t)
-    t = re.sub(r'\s*\(.*?\)', '', t)
-    t = re.sub(r'[^\w\s]', ' ', t)
-    return ' '.join(t.split())
-
-
-def get_stem(word):
-    """Get word stem by removing common endings."""
-    w = word.lower().strip()
-    if w.endswith('os'):
-        return w[:-1]
-    if w.endswith('es') and len(w) > 3:
-        return w[:-1]
-    if w.endswith('s') and len(w) > 3:
-        return w[:-1]
-    return w
-
-
-def extract_box_size_from_variant(title):
-    """Extract box size from variant title like 'Box of 10' or 'Cabinet of 25'."""
-    t = title.lower()
-    
-    patterns = [
-        r'box of (\d+)',
-        r'cabinet of (\d+)',
-        r'pack of (\d+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, t)
-        if match:
-            return int(match.group(1))
-    
-    if 'single' in t and 'tubo' not in t:
-        return 1
-    
-    return None
+    global _context, _page
+    if _context:
+        browser.close_context(_context)
+    _context = _page = None
+
+
+def create_engine():
+    """Create an async page-pool engine configured like init()'s context."""
+    from scrapers.async_engine import AsyncEngine
+    return AsyncEngine(
+        concurrency=CONCURRENCY,
+        context_options=CONTEXT_OPTIONS,
+        resource_policy=RESOURCE_POLICY,
+    )
+
+
+def set_search_plan(aliases):
+    """Route search terms through the orchestrator's inventory-wide search plan."""
+    _search_aliases.clear()
+    _search_aliases.update(aliases)
 
 
 def get_search_terms(brand, name):
@@ -140,117 +177,242 @@ def get_search_terms(brand, name):
     return terms
 
 
+def search_url(term):
+    """Search results URL for a term."""
+    return f"{BASE_URL}/search?type=product&q={quote_plus(term)}"
+
+
+# Extract product cards from a rendered search page
+SEARCH_RESULTS_JS = '''() => {
+    const products = [];
+    const seen = new Set();
+    
+    // Method 1: Use grid-product cards (preferred for No6 Cavendish)
+    const gridProducts = document.querySelectorAll('.grid-product');
+    gridProducts.forEach(card => {
+        const link = card.querySelector('a[href*="/products/"]');
+        const titleEl = card.querySelector('.grid-product__title');
+        
+        if (link && titleEl) {
+            const href = link.href;
+            const match = href.match(/\\/products\\/([^?]+)/);
+            if (match) {
+                const handle = match[1];
+                if (!seen.has(handle)) {
+                    seen.add(handle);
+                    const name = titleEl.textContent.trim();
+                    if (name && name.length > 3) {
+                        products.push({handle: handle, name: name, url: '/products/' + handle});
+                    }
+                }
+            }
+        }
+    });
+    
+    // Method 2: Fallback to scanning all product links
+    if (products.length === 0) {
+        const links = document.querySelectorAll('a[href*="/products/"]');
+        links.forEach(link => {
+            const href = link.href;
+            const match = href.match(/\\/products\\/([^?/]+)/);
+            if (match) {
+                const handle = match[1];
+                if (!seen.has(handle)) {
+                    seen.add(handle);
+                    
+                    // Try to get name from parent
+                    let name = '';
+                    const parent = link.closest('.grid-product, .product-card, article');
+                    if (parent) {
+                        const titleEl = parent.querySelector('.grid-product__title, .product-title, h2, h3');
+                        if (titleEl) {
+                            name = titleEl.textContent.trim();
+                        }
+                    }
+                    
+                    if (!name) {
+                        name = link.textContent.trim();
+                    }
+                    
+                    if (name && name.length > 3 && !name.includes('Quick') && !name.includes('Gift')) {
+                        products.push({handle: handle, name: name, url: '/products/' + handle});
+                    }
+                }
+            }
+        });
+    }
+    
+    return products;
+}'''
+
+
+def filter_search_results(product_data):
+    """Filter and normalize products extracted by SEARCH_RESULTS_JS."""
+    products = []
+    
+    for p in product_data:
+        name = p['name']
+        handle = p['handle']
+        
+        # Skip non-cigars
+        skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'candle', 'case', 
+                      'pouch', 'gift', 'accessory', 'dupont', 'boveda', 'punch', 'flint', 'gift-card']
+        if any(w in name.lower() or w in handle.lower() for w in skip_words):
+            continue
+        
+        products.append({
+            'name': name,
+            'handle': handle,
+            'url': f"{BASE_URL}/products/{handle}",
+            'normalized': normalize_name(name, MATCH_RULES)
+        })
+    
+    return products
+
+
 def search_products(term):
     """Search No6 Cavendish for products using browser."""
+    term = _search_aliases.get(term, term)
     cache_key = f"no6:{term}"
     if cache_key in _cache:
         return _cache[cache_key]
     
-    url = f"{BASE_URL}/search?type=product&q={quote_plus(term)}"
+    url = search_url(term)
     products = []
     
     try:
-        time.sleep(random.uniform(0.3, 0.6))
         init()
         
-        _page.goto(url, wait_until='networkidle', timeout=30000)
-        
-        # Wait for products to load
-        try:
-            _page.wait_for_selector('.grid-product, a[href*="/products/"]', timeout=5000)
-        except:
-            pass
+        readiness.goto(_page, url, READINESS['search'])
         
         # Extract product data using the grid-product structure
-        product_data = _page.evaluate('''() => {
-            const products = [];
-            const seen = new Set();
-            
-            // Method 1: Use grid-product cards (preferred for No6 Cavendish)
-            const gridProducts = document.querySelectorAll('.grid-product');
-            gridProducts.forEach(card => {
-                const link = card.querySelector('a[href*="/products/"]');
-                const titleEl = card.querySelector('.grid-product__title');
-                
-                if (link && titleEl) {
-                    const href = link.href;
-                    const match = href.match(/\\/products\\/([^?]+)/);
-                    if (match) {
-                        const handle = match[1];
-                        if (!seen.has(handle)) {
-                            seen.add(handle);
-                            const name = titleEl.textContent.trim();
-                            if (name && name.length > 3) {
-                                products.push({handle: handle, name: name, url: '/products/' + handle});
-                            }
-                        }
-                    }
-                }
-            });
-            
-            // Method 2: Fallback to scanning all product links
-            if (products.length === 0) {
-                const links = document.querySelectorAll('a[href*="/products/"]');
-                links.forEach(link => {
-                    const href = link.href;
-                    const match = href.match(/\\/products\\/([^?/]+)/);
-                    if (match) {
-                        const handle = match[1];
-                        if (!seen.has(handle)) {
-                            seen.add(handle);
-                            
-                            // Try to get name from parent
-                            let name = '';
-                            const parent = link.closest('.grid-product, .product-card, article');
-                            if (parent) {
-                                const titleEl = parent.querySelector('.grid-product__title, .product-title, h2, h3');
-                                if (titleEl) {
-                                    name = titleEl.textContent.trim();
-                                }
-                            }
-                            
-                            if (!name) {
-                                name = link.textContent.trim();
-                            }
-                            
-                            if (name && name.length > 3 && !name.includes('Quick') && !name.includes('Gift')) {
-                                products.push({handle: handle, name: name, url: '/products/' + handle});
-                            }
-                        }
-                    }
-                });
-            }
-            
-            return products;
-        }''')
-        
-        # Filter and normalize
-        for p in product_data:
-            name = p['name']
-            handle = p['handle']
-            
-            # Skip non-cigars
-            skip_words = ['humidor', 'ashtray', 'cutter', 'lighter', 'candle', 'case', 
-                          'pouch', 'gift', 'accessory', 'dupont', 'boveda', 'punch', 'flint', 'gift-card']
-            if any(w in name.lower() or w in handle.lower() for w in skip_words):
-                continue
-            
-            products.append({
-                'name': name,
-                'handle': handle,
-                'url': f"{BASE_URL}/products/{handle}",
-                'normalized': normalize_name(name)
-            })
+        product_data = _page.evaluate(SEARCH_RESULTS_JS)
+        products = filter_search_results(product_data)
         
         print(f"    No6 Cavendish '{term}': {len(products)} products")
         
     except Exception as e:
         print(f"    No6 Cavendish search error: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, products)
+        return products
+    
+    _cache[cache_key] = products
+    return products
+
+
+def parse_variants(product):
+    """Extract variants with box sizes from a Shopify product dict."""
+    variants = []
+    
+    for v in product.get('variants', []):
+        title = v.get('title', '')
+        price_str = v.get('price', '0')
+        
+        try:
+            price = float(price_str)
+        except:
+            continue
+        
+        box_size = extract_box_size(title, MATCH_RULES)
+        
+        variants.append({
+            'title': title,
+            'price': price,
+            'box_size': box_size,
+            'variant_id': v.get('id'),
+            'available': v.get('available', True)
+        })
+    
+    return variants
+
+
+@metrics.timed('parse')
+def parse_product_json(json_text):
+    """Parse variants from a /products/{handle}.json response body."""
+    data = json.loads(json_text)
+    return parse_variants(data.get('product', {}))
+
+
+def catalogue_url(page_num):
+    """URL of one page of the products.json catalogue."""
+    return f"{BASE_URL}/products.json?limit={CATALOGUE_PAGE_SIZE}&page={page_num}"
+
+
+@metrics.timed('parse')
+def slim_catalogue_page(json_text):
+    """Keep only the fields we index from a products.json page (drops body_html etc.)."""
+    data = json.loads(json_text)
+    return [
+        {
+            'title': p.get('title', ''),
+            'handle': p.get('handle', ''),
+            'variants': [
+                {k: v.get(k) for k in ('id', 'title', 'price', 'available')}
+                for v in p.get('variants', [])
+            ]
+        }
+        for p in data.get('products', [])
+    ]
+
+
+def build_catalogue(shopify_products):
+    """Build the local product/variant index (a ProductIndex) from catalogue entries."""
+    by_handle = {}
+    for p in shopify_products:
+        if p['title'] and p['handle'] and p['handle'] not in by_handle:
+            by_handle[p['handle']] = p
+    
+    # Same non-cigar filtering and normalization as search results
+    index = filter_search_results([{'name': p['title'], 'handle': h} for h, p in by_handle.items()])
+    for product in index:
+        product['variants'] = parse_variants(by_handle[product['handle']])
+    
+    return ProductIndex(index)
+
+
+def fetch_catalogue_page(page_num):
+    """Fetch one slimmed catalogue page through the browser (cached)."""
+    cache_key = f"no6_catalogue:{page_num}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    init()
+    readiness.goto(_page, catalogue_url(page_num), READINESS['json'])
+    products = slim_catalogue_page(_page.evaluate('() => document.body.innerText'))
     
     _cache[cache_key] = products
     return products
 
 
+def load_catalogue():
+    """
+    Pull the full catalogue once per run and index it.
+    
+    Returns the product index, or None if the catalogue couldn't be loaded
+    (callers fall back to search mode).
+    """
+    if 'products' in _catalogue:
+        return _catalogue['products']
+    
+    raw = []
+    try:
+        for page_num in range(1, CATALOGUE_MAX_PAGES + 1):
+            products = fetch_catalogue_page(page_num)
+            raw.extend(products)
+            if len(products) < CATALOGUE_PAGE_SIZE:
+                break
+    except Exception as e:
+        print(f"    No6 Cavendish catalogue error: {e} - falling back to search")
+        _catalogue['products'] = None
+        return None
+    
+    _catalogue['products'] = build_catalogue(raw) if raw else None
+    if _catalogue['products']:
+        print(f"    No6 Cavendish catalogue: {len(_catalogue['products'])} products from {page_num} pages")
+    return _catalogue['products']
+
+
 def get_product_variants(handle):
     """Fetch product JSON and return all variants with prices."""
     cache_key = f"no6_json:{handle}"
@@ -261,118 +423,154 @@ def get_product_variants(handle):
     variants = []
     
     try:
-        time.sleep(random.uniform(0.2, 0.4))
         init()
         
-        _page.goto(url, wait_until='networkidle', timeout=30000)
+        readiness.goto(_page, url, READINESS['json'])
         
         # Get JSON content
         json_text = _page.evaluate('() => document.body.innerText')
-        
-        data = json.loads(json_text)
-        product = data.get('product', {})
-        
-        for v in product.get('variants', []):
-            title = v.get('title', '')
-            price_str = v.get('price', '0')
-            
-            try:
-                price = float(price_str)
-            except:
-                continue
-            
-            box_size = extract_box_size_from_variant(title)
-            
-            variants.append({
-                'title': title,
-                'price': price,
-                'box_size': box_size,
-                'variant_id': v.get('id'),
-                'available': v.get('available', True)
-            })
+        variants = parse_product_json(json_text)
         
     except Exception as e:
         print(f"    Error fetching product JSON: {e}")
+        # Don't persist failures - retry on the next run
+        _cache.remember(cache_key, variants)
+        return variants
     
     _cache[cache_key] = variants
     return variants
 
 
+@metrics.timed('match')
 def match_product(product, brand, cigar_name):
     """Check if product matches brand and cigar name."""
     prod_name = product['normalized']
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
     
     # Brand check
-    brand_lower = brand.lower()
-    brand_first = brand_lower.split()[0]
-    if brand_first not in prod_name and brand_lower not in prod_name:
+    if sig.brand_first not in prod_name and sig.brand not in prod_name:
         return False, "brand not found"
     
-    # Cigar name matching
-    cigar_normalized = normalize_name(cigar_name.lower())
-    
     # Special handling for Behike - the number is critical
     # Handle both "Behike 52" and "BHK 52" formats
-    if 'behike' in cigar_name.lower():
-        behike_num = re.search(r'behike\s*(\d+)', cigar_name.lower())
-        if behike_num:
-            target_num = behike_num.group(1)
-            # Match "behike 52", "bhk 52", or just the number after bhk/behike
-            prod_behike = re.search(r'(?:behike|bhk)\s*(\d+)', prod_name)
-            if not prod_behike or prod_behike.group(1) != target_num:
-                return False, f"Behike number mismatch"
-            # If we matched the Behike number, that's a strong match - return success
-            return True, "behike matched"
+    if sig.behike:
+        prod_behike = BEHIKE_RE.search(prod_name)
+        if not prod_behike or prod_behike.group(1) != sig.behike:
+            return False, f"Behike number mismatch"
+        # If we matched the Behike number, that's a strong match - return success
+        return True, "behike matched"
     
     # Roman numerals must match exactly
-    roman_pattern = r'\b(i{1,3}|iv|v|vi{1,3}|ix|x{1,3})\b'
-    cigar_romans = set(re.findall(roman_pattern, cigar_name.lower()))
-    prod_romans = set(re.findall(roman_pattern, prod_name))
-    
-    if cigar_romans:
+    if sig.romans:
+        prod_romans = romans(prod_name)
         if not prod_romans:
             return False, "missing roman numeral"
-        if cigar_romans != prod_romans:
+        if sig.romans != prod_romans:
             return False, "roman numeral mismatch"
     
-    # Vitola matching (skip for Roman numerals)
-    cigar_words = cigar_name.lower().split()
-    if cigar_words:
-        last_word = cigar_words[-1]
-        last_word_stem = get_stem(last_word)
-        
-        roman_nums = {'i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x'}
-        skip_words = {'box', 'of', 'cigars', 'cigar', '52', '54', '56'}
-        
-        if last_word not in roman_nums and last_word not in skip_words:
-            if last_word not in prod_name and last_word_stem not in prod_name:
-                # Fuzzy match for e<->a
-                found = False
-                for i, char in enumerate(last_word):
-                    if char == 'e':
-                        variation = last_word[:i] + 'a' + last_word[i+1:]
-                        if variation in prod_name:
-                            found = True
-                            break
-                    elif char == 'a':
-                        variation = last_word[:i] + 'e' + last_word[i+1:]
-                        if variation in prod_name:
-                            found = True
-                            break
-                if not found:
-                    return False, f"vitola mismatch"
+    # Vitola matching (skip for Roman numerals), with e<->a fuzzy match
+    if sig.check_vitola:
+        if sig.last_word not in prod_name and sig.last_stem not in prod_name:
+            if not any(v in prod_name for v in sig.last_swaps):
+                return False, f"vitola mismatch"
     
     # Key words matching
-    key_words = [w for w in cigar_normalized.split() if len(w) > 2]
-    if key_words:
-        matched_words = sum(1 for word in key_words if word in prod_name or get_stem(word) in prod_name)
-        min_matches = max(1, len(key_words) // 2) if len(key_words) > 2 else len(key_words)
-        if matched_words < min_matches:
-            return False, "insufficient word matches"
+    if sig.key_words and key_word_matches(sig, prod_name) < sig.min_key_matches:
+        return False, "insufficient word matches"
     
     return True, "matched"
 
 
+def candidate_products(index, brand, cigar_name):
+    """
+    Products from a ProductIndex that could pass match_product(), in index order.
+    
+    Mirrors match_product()'s brand, Behike-number, roman-numeral and vitola
+    rules as postings lookups; the result is always a superset of the matches.
+    """
+    sig = match_signature(brand, cigar_name, MATCH_RULES)
+    # brand_first is a substring of the full brand, so it covers both checks
+    ids = index.containing(sig.brand_first)
+    
+    if sig.behike:
+        return index.select(index.intersect(ids, index.containing_any(['behike', 'bhk'])))
+    
+    ids = index.intersect(ids, index.tokens_all(sig.romans))
+    if sig.check_vitola:
+        forms = [sig.last_word, sig.last_stem] + list(sig.last_swaps)
+        ids = index.intersect(ids, index.containing_any(forms))
+    
+    return index.select(ids)
+
+
+def variant_result(product, variants, brand, cigar_name, box_size):
+    """Return a scrape() result for the variant matching box_size, or None."""
+    # Debug: show variants
+    print(f"      Variants: {[(v['title'], v['box_size'], v['price']) for v in variants]}")
+    
+    # Find matching box size
+    for variant in variants:
+        if variant['box_size'] == box_size:
+            price = variant['price']
+            
+            # Validate price is reasonable
+            min_price = box_size * 10  # £10/cigar minimum
+            if price >= min_price:
+                in_stock = variant.get('available', True)
+                
+                if in_stock:
+                    print(f"  ✓ {brand} {cigar_name} (Box {box_size}): £{price:.2f}")
+                else:
+                    print(f"  ⚠ OUT OF STOCK {brand} {cigar_name} (Box {box_size}): £{price:.2f}")
+                
+                return {
+                    'price': price,
+                    'box_size': box_size,
+                    'product_name': product['name'],
+                    'retailer': 'No6 Cavendish',
+                    'url': product['url'],
+                    'in_stock': in_stock
+                }
+    
+    # Box size not available for THIS product, continue searching
+    print(f"      Box size {box_size} not found in variants")
+    return None
+
+
+def scrape_catalogue(catalogue, brand, cigar_name, box_size):
+    """Answer a lookup from the catalogue index - no network access."""
+    for product in candidate_products(catalogue, brand, cigar_name):
+        is_match, reason = match_product(product, brand, cigar_name)
+        
+        if is_match:
+            print(f"      -> '{product['name'][:40]}' match={is_match} ({reason})")
+            
+            if not product['variants']:
+                print(f"    No variants found for {product['handle']}")
+                continue
+            
+            result = variant_result(product, product['variants'], brand, cigar_name, box_size)
+            if result:
+                return result
+    
+    return None
+
+
+def preflight():
+    """Canary run before any cigar: '' if listing and product parsing work, else the reason."""
+    if CATALOGUE_MODE:
+        catalogue = load_catalogue()
+        if catalogue:
+            return '' if any(p['variants'] for p in catalogue) else "catalogue parsed no variants"
+    
+    products = search_products(CANARY_TERM)
+    if not products:
+        return f"search '{CANARY_TERM}' returned no products"
+    if not get_product_variants(products[0]['handle']):
+        return f"product '{products[0]['handle']}' parsed no variants"
+    return ''
+
+
 def scrape(brand, cigar_name, box_size):
     """
     Main entry point: Find price for a specific cigar.
@@ -385,6 +583,11 @@ def scrape(brand, cigar_name, box_size):
     Returns:
         dict with 'price', 'box_size', 'url', 'in_stock' if found, or None
     """
+    if CATALOGUE_MODE:
+        catalogue = load_catalogue()
+        if catalogue:
+            return scrape_catalogue(catalogue, brand, cigar_name, box_size)
+    
     search_terms = get_search_terms(brand, cigar_name)
     
     for term in search_terms:
@@ -404,36 +607,150 @@ def scrape(brand, cigar_name, box_size):
                     print(f"    No variants found for {product['handle']}")
                     continue
                 
-                # Debug: show variants
-                print(f"      Variants: {[(v['title'], v['box_size'], v['price']) for v in variants]}")
+                result = variant_result(product, variants, brand, cigar_name, box_size)
+                if result:
+                    return result
+    
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Async engine (several cigars in flight through a bounded page pool)
+# ---------------------------------------------------------------------------
+
+async def search_products_async(engine, term):
+    """Async version of search_products() using a page from the engine pool."""
+    term = _search_aliases.get(term, term)
+    cache_key = f"no6:{term}"
+    
+    async def fetch():
+        products = []
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, search_url(term), READINESS['search'])
+                product_data = await page.evaluate(SEARCH_RESULTS_JS)
+            
+            products = filter_search_results(product_data)
+            print(f"    No6 Cavendish '{term}': {len(products)} products")
+        except Exception as e:
+            print(f"    No6 Cavendish search error: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, products)
+            return products
+        
+        _cache[cache_key] = products
+        return products
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def get_product_variants_async(engine, handle):
+    """Async version of get_product_variants()."""
+    cache_key = f"no6_json:{handle}"
+    
+    async def fetch():
+        variants = []
+        try:
+            async with engine.page() as page:
+                await readiness.goto_async(page, f"{BASE_URL}/products/{handle}.json", READINESS['json'])
+                json_text = await page.evaluate('() => document.body.innerText')
+            
+            variants = parse_product_json(json_text)
+        except Exception as e:
+            print(f"    Error fetching product JSON: {e}")
+            # Don't persist failures - retry on the next run
+            _cache.remember(cache_key, variants)
+            return variants
+        
+        _cache[cache_key] = variants
+        return variants
+    
+    return await engine.cached(_cache, cache_key, fetch)
+
+
+async def fetch_catalogue_page_async(engine, page_num):
+    """Async version of fetch_catalogue_page()."""
+    cache_key = f"no6_catalogue:{page_num}"
+    if cache_key in _cache:
+        return _cache[cache_key]
+    
+    async with engine.page() as page:
+        await readiness.goto_async(page, catalogue_url(page_num), READINESS['json'])
+        products = slim_catalogue_page(await page.evaluate('() => document.body.innerText'))
+    
+    _cache[cache_key] = products
+    return products
+
+
+async def load_catalogue_async(engine):
+    """Async version of load_catalogue() - fetches pages in batches of CONCURRENCY."""
+    async def fetch():
+        raw = []
+        try:
+            page_num = 1
+            while page_num <= CATALOGUE_MAX_PAGES:
+                batch = range(page_num, min(page_num + CONCURRENCY, CATALOGUE_MAX_PAGES + 1))
+                pages = await asyncio.gather(*(fetch_catalogue_page_async(engine, n) for n in batch))
+                
+                for products in pages:
+                    raw.extend(products)
+                if any(len(products) < CATALOGUE_PAGE_SIZE for products in pages):
+                    break
+                page_num += len(batch)
+        except Exception as e:
+            print(f"    No6 Cavendish catalogue error: {e} - falling back to search")
+            _catalogue['products'] = None
+            return None
+        
+        _catalogue['products'] = build_catalogue(raw) if raw else None
+        if _catalogue['products']:
+            print(f"    No6 Cavendish catalogue: {len(_catalogue['products'])} products")
+        return _catalogue['products']
+    
+    return await engine.cached(_catalogue, 'products', fetch)
+
+
+async def preflight_async(engine):
+    """Async version of preflight()."""
+    if CATALOGUE_MODE:
+        catalogue = await load_catalogue_async(engine)
+        if catalogue:
+            return '' if any(p['variants'] for p in catalogue) else "catalogue parsed no variants"
+    
+    products = await search_products_async(engine, CANARY_TERM)
+    if not products:
+        return f"search '{CANARY_TERM}' returned no products"
+    if not await get_product_variants_async(engine, products[0]['handle']):
+        return f"product '{products[0]['handle']}' parsed no variants"
+    return ''
+
+
+async def scrape_async(engine, brand, cigar_name, box_size):
+    """Async version of scrape()."""
+    if CATALOGUE_MODE:
+        catalogue = await load_catalogue_async(engine)
+        if catalogue:
+            return scrape_catalogue(catalogue, brand, cigar_name, box_size)
+    
+    search_terms = get_search_terms(brand, cigar_name)
+    
+    for term in search_terms:
+        products = await search_products_async(engine, term)
+        
+        for product in products:
+            is_match, reason = match_product(product, brand, cigar_name)
+            print(f"      -> '{product['name'][:40]}' match={is_match} ({reason})")
+            
+            if is_match:
+                variants = await get_product_variants_async(engine, product['handle'])
                 
-                # Find matching box size
-                for variant in variants:
-                    if variant['box_size'] == box_size:
-                        price = variant['price']
-                        
-                        # Validate price is reasonable
-                        min_price = box_size * 10  # £10/cigar minimum
-                        if price >= min_price:
-                            in_stock = variant.get('available', True)
-                            
-                            if in_stock:
-                                print(f"  ✓ {brand} {cigar_name} (Box {box_size}): £{price:.2f}")
-                            else:
-                                print(f"  ⚠ OUT OF STOCK {brand} {cigar_name} (Box {box_size}): £{price:.2f}")
-                            
-                            return {
-                                'price': price,
-                                'box_size': box_size,
-                                'product_name': product['name'],
-                                'retailer': 'No6 Cavendish',
-                                'url': product['url'],
-                                'in_stock': in_stock
-                            }
+                if not variants:
+                    print(f"    No variants found for {product['handle']}")
+                    continue
                 
-                # Box size not available for THIS product, continue searching
-                print(f"      Box size {box_size} not found in variants")
-                continue
+                result = variant_result(product, variants, brand, cigar_name, box_size)
+                if result:
+                    return result
     
     return None
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+WooCommerce Store API
+=====================
+Bulk catalogue reads from a WooCommerce shop's public Store API
+(/wp-json/wc/store/v1/products), shared by the WooCommerce retailers.
+
+Each page comes back as JSON with prices in minor units, stock flags and
+variation ids; slim_store_page() keeps only the fields the scrapers index.
+fetch_collection() reads page 1 for the X-WP-TotalPages header and then
+fetches the remaining pages concurrently under http_fetch's per-host limit.
+Pages are cached individually, so an interrupted pull resumes where it
+stopped.
+"""
+
+from scrapers import http_fetch, metrics
+
+
+STORE_API_PATH = '/wp-json/wc/store/v1/products'
+PAGE_SIZE = 100
+MAX_PAGES = 50
+
+JSON_HEADERS = {'Accept': 'application/json'}
+
+
+def store_api_url(base_url, page_num, product_type=None, page_size=PAGE_SIZE):
+    """URL of one page of the Store API product collection."""
+    url = f"{base_url}{STORE_API_PATH}?per_page={page_size}&page={page_num}"
+    if product_type:
+        url += f"&type={product_type}"
+    return url
+
+
+def store_price(prices):
+    """Price in pounds from a Store API prices object (amounts are in minor units)."""
+    try:
+        return int(prices['price']) / 10 ** int(prices.get('currency_minor_unit', 2))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@metrics.timed('parse')
+def slim_store_page(data):
+    """Keep only the fields we index from a Store API page (drops descriptions, images etc.)."""
+    return [
+        {
+            'id': p.get('id'),
+            'name': p.get('name', ''),
+            'url': p.get('permalink', ''),
+            'type': p.get('type', ''),
+            'price': store_price(p.get('prices') or {}),
+            'in_stock': bool(p.get('is_in_stock', True)),
+            'variation': p.get('variation') if isinstance(p.get('variation'), str) else '',
+            'variations': [
+                {
+                    'id': v.get('id'),
+                    # Attribute values may be slugs ("box-of-25")
+                    'label': ' '.join(str(a.get('value', '')).replace('-', ' ') for a in v.get('attributes', [])).capitalize(),
+                }
+                for v in p.get('variations') or []
+            ],
+        }
+        for p in data
+    ]
+
+
+def fetch_collection(base_url, cache, cache_prefix, product_type=None, max_pages=MAX_PAGES):
+    """
+    Every page of one Store API collection, slimmed.
+
+    Args:
+        base_url: shop root ("https://www.example.com")
+        cache: the module's ScrapeCache
+        cache_prefix: cache entry type for the pages (sets their TTL)
+        product_type: Store API type filter ('variation' for box-size variants)
+        max_pages: safety cap on pages read
+
+    Raises on HTTP or decoding errors so callers can fall back.
+    """
+    kind = product_type or 'product'
+    pages_key = f"{cache_prefix}:{kind}:pages"
+
+    def fetch_page(page_num):
+        cache_key = f"{cache_prefix}:{kind}:{page_num}"
+        if cache_key in cache:
+            return cache[cache_key]
+
+        response = http_fetch.get(store_api_url(base_url, page_num, product_type), headers=JSON_HEADERS)
+        items = slim_store_page(response.json())
+        if page_num == 1:
+            cache[pages_key] = int(response.headers.get('X-WP-TotalPages') or 0)
+        cache[cache_key] = items
+        return items
+
+    items = list(fetch_page(1))
+    total = min(cache.get(pages_key) or 0, max_pages)
+
+    if total:
+        # Page count known - fetch the rest concurrently
+        for page in http_fetch.fetch_all(fetch_page, range(2, total + 1)):
+            items.extend(page)
+        return items
+
+    # No page count - walk pages until a short one
+    page_num, page = 1, items
+    while len(page) >= PAGE_SIZE and page_num < max_pages:
+        page_num += 1
+        page = fetch_page(page_num)
+        items = items + page
+    return items
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Search Planner
+==============
+Inventory-wide planning of retailer search queries.
+
+Each scraper's get_search_terms() expands a cigar into several queries
+(brand + name, bare name, singular forms, brand + first word...). Across
+an inventory many of those are the same query: every "Robusto" produces
+the bare term "robusto", every Behike shares "Cohiba Behike", and so on.
+
+Before any network access the planner collects every term for every due
+cigar, collapses queries that differ only in case, punctuation, spacing
+or word order (a site search returns the same listing for "No. 2
+Montecristo" and "montecristo no 2") and picks one representative query
+for each. The scraper is handed a term -> representative map, so each
+unique query is navigated at most once per retailer and its product list
+is shared by every cigar that asks for it.
+
+Broader queries are deliberately not merged into narrower ones (e.g.
+"cohiba" standing in for "cohiba behike"): the scrapers read only the
+first, relevance-ranked page of a search, so a broad query's results are
+not a superset of a narrow one's. Exact repeats of a term are already
+served by the scrape cache, so 'saved' counts only the navigations the
+merging itself saves.
+"""
+
+import re
+
+
+def canonical_term(term):
+    """Normalized form of a query: lowercase word tokens, order-insensitive."""
+    tokens = re.findall(r'\w+', term.lower())
+    return ' '.join(sorted(tokens))
+
+
+def plan_searches(cigars, get_search_terms):
+    """
+    Build a search plan for one retailer.
+
+    Args:
+        cigars: list of inventory dicts (brand, name, box_size, key)
+        get_search_terms: the retailer module's get_search_terms(brand, name)
+
+    Returns:
+        dict with:
+        - 'aliases': {term: representative query} for every planned term
+        - 'queries': unique representative queries in first-use order
+        - 'terms': term lookups the cigars would make without the plan
+        - 'distinct': distinct terms (what the scrape cache alone would navigate)
+        - 'unique': number of unique queries
+        - 'saved': navigations saved by merging at most (distinct - unique)
+    """
+    representatives = {}
+    aliases = {}
+    queries = []
+    terms = 0
+
+    for cigar in cigars:
+        for term in get_search_terms(cigar['brand'], cigar['name']):
+            terms += 1
+            canonical = canonical_term(term)
+            if not canonical:
+                continue
+
+            if canonical not in representatives:
+                representatives[canonical] = term
+                queries.append(term)
+            aliases[term] = representatives[canonical]
+
+    return {
+        'aliases': aliases,
+        'queries': queries,
+        'terms': terms,
+        'distinct': len(aliases),
+        'unique': len(queries),
+        'saved': len(aliases) - len(queries),
+    }
+
+
+def describe_plan(plan, cigar_count):
+    """One-line summary of a plan for the run log."""
+    return (f"Search plan: {plan['terms']} term lookups across {cigar_count} cigars, "
+            f"{plan['distinct']} distinct -> {plan['unique']} after merging reordered/recased queries "
+            f"(up to {plan['saved']} navigations saved)")
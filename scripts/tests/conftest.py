@@ -0,0 +1,37 @@
+"""
+Shared pytest setup: the scripts directory on sys.path (the orchestrator
+imports its modules by bare name) and the scrape cache kept in memory.
+
+Run from the repo root:
+    python -m pytest -q scripts/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+# Read by scrapers.cache at import - never touch the real cache database
+os.environ.setdefault('SCRAPE_CACHE', '0')
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(SCRIPTS_DIR, 'benchmarks', 'fixtures')
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+@pytest.fixture(scope='session')
+def fixture_text():
+    """Reader for the benchmark fixtures (saved retailer pages and API responses)."""
+    def read(name):
+        with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+            return f.read()
+    return read
+
+
+@pytest.fixture(scope='session')
+def inventory():
+    """The benchmark inventory as load_inventory() returns it (brand, name, box_size, key)."""
+    from inventory import load_file
+    return load_file(os.path.join(FIXTURES_DIR, 'inventory.json'))
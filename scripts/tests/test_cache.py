@@ -0,0 +1,75 @@
+"""ScrapeCache: dict interface, TTLs, the in-process LRU layer and thread safety."""
+
+import threading
+
+from scrapers import cache
+from scrapers.cache import ScrapeCache
+
+
+def disk_cache(tmp_path, **kwargs):
+    return ScrapeCache(path=str(tmp_path / 'cache.sqlite'), persist=True, **kwargs)
+
+
+def test_round_trip_through_disk(tmp_path):
+    disk_cache(tmp_path)['jjfox:robusto'] = [{'name': 'Cohiba Robustos'}]
+    fresh = disk_cache(tmp_path)
+    assert 'jjfox:robusto' in fresh
+    assert fresh['jjfox:robusto'] == [{'name': 'Cohiba Robustos'}]
+    assert fresh.get('jjfox:missing', 'default') == 'default'
+    stats = fresh.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    disk_cache(tmp_path)['jjfox:robusto'] = []
+    expired = disk_cache(tmp_path, ttls={'jjfox': -1})
+    assert 'jjfox:robusto' not in expired
+    assert expired.stats()['expired'] == 1
+
+
+def test_remember_is_memory_only(tmp_path):
+    c = disk_cache(tmp_path)
+    c.remember('jjfox_price:https://example.com', None)
+    assert 'jjfox_price:https://example.com' in c
+    assert 'jjfox_price:https://example.com' not in disk_cache(tmp_path)
+
+
+def test_memory_layer_is_capped(monkeypatch):
+    monkeypatch.setattr(cache, 'MEMORY_ENTRIES', 3)
+    c = ScrapeCache(persist=False)
+    for i in range(5):
+        c[f'no6:{i}'] = i
+    assert list(c._memo) == ['no6:2', 'no6:3', 'no6:4']
+    # A hit makes the entry most recently used
+    assert c['no6:2'] == 2
+    c['no6:5'] = 5
+    assert list(c._memo) == ['no6:4', 'no6:2', 'no6:5']
+
+
+def test_threads_share_a_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, 'MEMORY_ENTRIES', 20)
+    c = disk_cache(tmp_path)
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(500):
+                key = f'no6_json:{(n * 7 + i) % 60}'
+                if i % 3 == 0:
+                    c[key] = i
+                elif i % 3 == 1:
+                    c.remember(key, i)
+                else:
+                    c.get(key)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(c._memo) <= 20
+    assert c.stats()['writes'] == 8 * 167
@@ -0,0 +1,66 @@
+"""CGars: brand listing crawl, and when keyword searches still run."""
+
+import pytest
+
+from scrapers import scrape_cgars
+from scrapers.product_index import ProductIndex
+
+
+@pytest.fixture
+def searches(monkeypatch, fixture_text):
+    """Terms searched; the Cohiba listing is the saved listing page."""
+    products, _ = scrape_cgars.parse_listing_page(fixture_text('cgars_listing.html'))
+    searched = []
+
+    def search_products(term):
+        searched.append(term)
+        return []
+
+    monkeypatch.setattr(scrape_cgars, 'CRAWL_MODE', True)
+    monkeypatch.setattr(scrape_cgars, '_listings', {'cohiba': ProductIndex(products)})
+    monkeypatch.setattr(scrape_cgars, '_failed_listings', set())
+    monkeypatch.setattr(scrape_cgars, 'search_products', search_products)
+    return searched
+
+
+def test_listed_cigar_needs_no_search(searches):
+    result = scrape_cgars.scrape('Cohiba', 'Siglo VI', 5)
+    assert (result['price'], result['product_name']) == (468.41, 'Cohiba Siglo VI - Box of 5')
+    assert searches == []
+
+
+def test_listed_in_other_box_sizes_only(searches):
+    assert scrape_cgars.scrape('Cohiba', 'Siglo VI', 12) is None
+    assert searches == []
+
+
+def test_cigar_missing_from_listing_is_searched(searches):
+    assert scrape_cgars.scrape('Cohiba', 'Siglo III', 25) is None
+    assert searches == scrape_cgars.get_search_terms('Cohiba', 'Siglo III')
+
+
+def test_failed_crawl_is_searched(searches):
+    scrape_cgars._failed_listings.add('cohiba')
+    assert scrape_cgars.scrape('Cohiba', 'Siglo VI', 12) is None
+    assert searches == scrape_cgars.get_search_terms('Cohiba', 'Siglo VI')
+
+
+def test_empty_listing_is_searched(searches):
+    scrape_cgars._listings['cohiba'] = ProductIndex([])
+    scrape_cgars.scrape('Cohiba', 'Siglo VI', 5)
+    assert searches == scrape_cgars.get_search_terms('Cohiba', 'Siglo VI')
+
+
+def test_crawl_error_marks_the_listing_failed(monkeypatch, capsys):
+    def fetch_listing_page(brand, page_num):
+        if page_num > 1:
+            raise TimeoutError('Timeout 30000ms exceeded.')
+        return [{'name': 'Cohiba Siglo VI - Box of 10', 'url': '/siglo-vi', 'normalized': 'cohiba siglo vi',
+                 'box_size': 10, 'price': 900.0}], True
+
+    monkeypatch.setattr(scrape_cgars, '_listings', {})
+    monkeypatch.setattr(scrape_cgars, '_failed_listings', set())
+    monkeypatch.setattr(scrape_cgars, 'fetch_listing_page', fetch_listing_page)
+
+    assert len(scrape_cgars.load_brand_listing('Cohiba')) == 1
+    assert scrape_cgars._failed_listings == {'cohiba'}
@@ -0,0 +1,92 @@
+"""Cigar Club: Store API catalogue, and the search fallback when it can't be read."""
+
+import json
+
+import pytest
+
+from scrapers import scrape_cigar_club, woocommerce
+
+
+PRODUCT_URL = 'https://www.cigar-club.com/shop/cohiba-siglo-vi/'
+
+
+@pytest.fixture
+def catalogue(fixture_text):
+    products = woocommerce.slim_store_page(json.loads(fixture_text('cigarclub_store_products.json')))
+    variations = woocommerce.slim_store_page(json.loads(fixture_text('cigarclub_store_variations.json')))
+    return scrape_cigar_club.build_catalogue(products, variations)
+
+
+def test_catalogue_folds_variations_into_products(catalogue):
+    vigia = next(p for p in catalogue if p['name'] == 'Trinidad Vigia')
+    assert vigia['url'] == 'https://www.cigar-club.com/shop/trinidad-vigia/'
+    assert [(v['box_size'], v['price'], v['in_stock']) for v in vigia['variants']] == [
+        (3, 267.47, True), (18, 595.15, True),
+    ]
+    # Variation entries are folded into their parents, not listed on their own
+    assert not any('attribute_pa_size' in p['url'] for p in catalogue)
+    assert len({p['url'] for p in catalogue}) == len(catalogue)
+
+
+def test_scrape_catalogue(catalogue, capsys):
+    result = scrape_cigar_club.scrape_catalogue(catalogue, 'Trinidad', 'Vigia', 18)
+    assert result == {
+        'price': 595.15,
+        'box_size': 18,
+        'product_name': 'Trinidad Vigia - Box of 18',
+        'retailer': 'Cigar Club',
+        'url': 'https://www.cigar-club.com/shop/trinidad-vigia/',
+        'in_stock': True,
+    }
+    assert scrape_cigar_club.scrape_catalogue(catalogue, 'Trinidad', 'Vigia', 50) is None
+
+
+def test_catalogue_variants_of_simple_product():
+    product = {'name': 'Cohiba Siglo VI - Box of 10', 'url': PRODUCT_URL, 'price': 869.0,
+               'in_stock': True, 'variations': []}
+    assert scrape_cigar_club.catalogue_variants(product, {}) == [
+        {'variant_name': 'Box of 10', 'box_size': 10, 'price': 869.0, 'in_stock': True, 'url': PRODUCT_URL},
+    ]
+    # A single's price under a box-size name is not a box price
+    assert scrape_cigar_club.catalogue_variants(dict(product, price=45.0), {}) == []
+
+
+def test_search_fallback_with_cached_results_opens_the_browser(monkeypatch, fixture_text, capsys):
+    """Store API down and search results served from the cache: product pages still load."""
+    pages = []
+
+    class Page:
+        url = 'about:blank'
+
+        def content(self):
+            return fixture_text('cigarclub_product.html')
+
+    class Context:
+        def new_page(self):
+            pages.append(Page())
+            return pages[-1]
+
+    def goto(page, url, rule):
+        assert page is not None
+        page.url = url
+
+    def store_api_down(*args, **kwargs):
+        raise OSError('503 Service Unavailable')
+
+    cache = scrape_cigar_club.ScrapeCache(persist=False)
+    for term in (scrape_cigar_club.CANARY_TERM, 'Cohiba Siglo VI'):
+        cache[f'cigarclub:{term}'] = [{'name': 'Cohiba Siglo VI', 'url': PRODUCT_URL, 'normalized': 'cohiba siglo vi'}]
+
+    monkeypatch.setattr(scrape_cigar_club, 'CATALOGUE_MODE', True)
+    monkeypatch.setattr(scrape_cigar_club, '_catalogue', {})
+    monkeypatch.setattr(scrape_cigar_club, '_page', None)
+    monkeypatch.setattr(scrape_cigar_club, '_context', None)
+    monkeypatch.setattr(scrape_cigar_club, '_cache', cache)
+    monkeypatch.setattr(scrape_cigar_club, '_search_aliases', {})
+    monkeypatch.setattr(scrape_cigar_club.woocommerce, 'fetch_collection', store_api_down)
+    monkeypatch.setattr(scrape_cigar_club.browser, 'new_context', lambda *args: Context())
+    monkeypatch.setattr(scrape_cigar_club.readiness, 'goto', goto)
+
+    assert scrape_cigar_club.preflight() == ''
+    assert len(pages) == 1
+    assert scrape_cigar_club.scrape('Cohiba', 'Siglo VI', 10)['price'] == 869.0
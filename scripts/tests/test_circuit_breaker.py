@@ -0,0 +1,110 @@
+"""Circuit breaker: consecutive lookup errors, failing hosts and preflight canaries."""
+
+import types
+
+import pytest
+
+import scrape_orchestrator
+from circuit_breaker import CircuitBreaker, run_preflight
+from run_journal import RunJournal
+from scrapers import rate_scheduler, lookup_status
+from scrapers.cache import ScrapeCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_hosts(monkeypatch):
+    monkeypatch.setattr(rate_scheduler, '_buckets', {})
+
+
+def test_trips_after_consecutive_failures_only():
+    breaker = CircuitBreaker(threshold=3)
+    breaker.failure('timeout')
+    breaker.failure('timeout')
+    breaker.success()
+    breaker.failure('timeout')
+    breaker.failure('timeout')
+    assert breaker.allow({'key': 'a'})
+
+    breaker.failure('boom')
+    assert not breaker.allow({'key': 'b'})
+    assert not breaker.allow({'key': 'c'})
+    assert breaker.summary() == {'reason': '3 consecutive lookup errors (last: boom)', 'skipped': 2}
+
+
+def test_first_reason_is_kept():
+    breaker = CircuitBreaker(threshold=1)
+    breaker.trip('first')
+    breaker.trip('second')
+    assert breaker.reason == 'first'
+
+
+def test_never_tripped_has_no_summary():
+    assert CircuitBreaker().summary() is None
+
+
+def test_trips_on_failing_host():
+    breaker = CircuitBreaker(threshold=2)
+    for _ in range(2):
+        rate_scheduler.bucket('https://www.example.com/').record(0.1, status=500)
+    assert not breaker.allow({'key': 'a'})
+    assert 'www.example.com' in breaker.reason
+
+
+class Canary:
+    def __init__(self, result):
+        self.result = result
+
+    def preflight(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_preflight_canary():
+    breaker = CircuitBreaker()
+    run_preflight(Canary(None), breaker)
+    assert not breaker.reason
+
+    run_preflight(Canary('no products parsed'), breaker)
+    assert breaker.reason == 'preflight canary failed: no products parsed'
+
+    breaker = CircuitBreaker()
+    run_preflight(Canary(RuntimeError('net down')), breaker)
+    assert breaker.reason == 'preflight canary failed: error: net down'
+
+
+class Engine:
+    concurrency = 1
+    lazy = True
+
+    async def close(self):
+        pass
+
+
+def outage_module():
+    """Async scraper on a site that's down: the first search fails, later lookups reuse the failure."""
+    cache = ScrapeCache(persist=False)
+
+    async def scrape_async(engine, brand, name, box_size):
+        if 'example:search' not in cache:
+            lookup_status.fetched('https://www.example.com/search', 503)
+            cache.remember('example:search', [])
+        return None if not cache['example:search'] else {'price': 500.0}
+
+    return types.SimpleNamespace(scrape=None, scrape_async=scrape_async, create_engine=Engine, _cache=cache)
+
+
+def test_lookups_with_failed_fetches_trip_the_breaker(monkeypatch, tmp_path, inventory, capsys):
+    monkeypatch.setattr(scrape_orchestrator, 'ASYNC_ENGINE', True)
+    monkeypatch.setattr(scrape_orchestrator, 'SEARCH_PLAN', False)
+    monkeypatch.setattr(scrape_orchestrator, 'RunJournal', lambda: RunJournal(str(tmp_path / 'journal.jsonl')))
+    monkeypatch.setattr(scrape_orchestrator, 'load_scraper_module', lambda f: outage_module())
+    monkeypatch.setattr(scrape_orchestrator, 'CircuitBreaker', lambda: CircuitBreaker(threshold=3))
+
+    _, stats = scrape_orchestrator.scrape_retailer('Example', 'scrapers/scrape_example.py', inventory)
+
+    # None of the lookups is a "not found" - including those in flight when it tripped
+    assert stats['checked'] == []
+    assert stats['breaker']['reason'].startswith('3 consecutive lookup errors')
+    assert sorted(stats['failed_keys'] + stats['skipped_keys']) == sorted(c['key'] for c in inventory)
+    assert stats['skipped_keys']
@@ -0,0 +1,70 @@
+"""Compact output: interning, URL splitting, chunk files and manifest."""
+
+import os
+import gzip
+import json
+
+import compact_output
+
+
+FINAL_PRICES = {
+    'Cohiba|Siglo VI|25': {
+        'brand': 'Cohiba', 'name': 'Siglo VI', 'box_size': 25, 'price': 1220.0,
+        'sources': {
+            'CGars': {'price': 1220.0, 'url': 'https://www.cgarsltd.co.uk/cohiba-siglo-vi.html', 'in_stock': True},
+            'JJ Fox': {'price': 1250.0, 'url': 'https://www.jjfox.co.uk/cohiba-siglo-vi?size=25', 'in_stock': False},
+        },
+    },
+    'Montecristo|No. 2|25': {
+        'brand': 'Montecristo', 'name': 'No. 2', 'box_size': 25, 'price': 640.0,
+        'sources': {
+            'CGars': {'price': 640.0, 'url': 'https://www.cgarsltd.co.uk/montecristo-no-2.html', 'in_stock': True},
+        },
+    },
+}
+
+
+def test_split_url():
+    assert compact_output.split_url('https://a.com/x/y.html') == ('https://a.com/x/', 'y.html')
+    assert compact_output.split_url('https://a.com/p?u=/a/b') == ('https://a.com/', 'p?u=/a/b')
+    assert compact_output.split_url('') == ('', '')
+
+
+def test_encode_interns_retailers_and_prefixes():
+    brands, retailers, prefixes = compact_output.encode(FINAL_PRICES)
+    assert retailers == ['CGars', 'JJ Fox']
+    assert prefixes == ['https://www.cgarsltd.co.uk/', 'https://www.jjfox.co.uk/']
+    assert brands['Cohiba'] == [['Siglo VI', 25, 1220.0, [
+        [0, 1220.0, 0, 'cohiba-siglo-vi.html', 1],
+        [1, 1250.0, 1, 'cohiba-siglo-vi?size=25', 0],
+    ]]]
+
+
+def test_write_chunks_and_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(compact_output, 'CHUNK_BY_BRAND', True)
+    out_dir = tmp_path / compact_output.COMPACT_DIR
+    out_dir.mkdir()
+    (out_dir / 'cohiba.deadbeef.json').write_text('{}')
+
+    manifest = compact_output.write(FINAL_PRICES, str(tmp_path))
+
+    assert set(manifest['chunks']) == {'Cohiba', 'Montecristo'}
+    chunk = manifest['chunks']['Cohiba']
+    with open(out_dir / chunk['file'], 'rb') as f:
+        raw = f.read()
+    assert len(raw) == chunk['bytes']
+    assert json.loads(raw)['Cohiba'][0][0] == 'Siglo VI'
+    with gzip.open(out_dir / (chunk['file'] + '.gz')) as f:
+        assert f.read() == raw
+
+    with open(out_dir / compact_output.MANIFEST) as f:
+        assert json.load(f) == manifest
+    # The stale chunk from an earlier run is gone
+    assert not os.path.exists(out_dir / 'cohiba.deadbeef.json')
+
+
+def test_single_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(compact_output, 'CHUNK_BY_BRAND', False)
+    manifest = compact_output.write(FINAL_PRICES, str(tmp_path))
+    assert list(manifest['chunks']) == ['all']
+    assert manifest['chunks']['all']['cigars'] == 2
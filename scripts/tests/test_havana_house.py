@@ -0,0 +1,94 @@
+"""Havana House: bulk listing from the WooCommerce Store API or the HTML listing pages."""
+
+import json
+
+import pytest
+
+from scrapers import scrape_havana_house, woocommerce
+
+
+@pytest.fixture
+def store_pages(fixture_text):
+    """A Store API product collection and its variations (same shape on every WooCommerce shop)."""
+    return (json.loads(fixture_text('cigarclub_store_products.json')),
+            json.loads(fixture_text('cigarclub_store_variations.json')))
+
+
+def test_store_price_uses_minor_units():
+    assert woocommerce.store_price({'price': '26747', 'currency_minor_unit': 2}) == 267.47
+    assert woocommerce.store_price({'price': '150', 'currency_minor_unit': 0}) == 150
+    assert woocommerce.store_price({}) is None
+
+
+def test_slim_store_page(store_pages):
+    products, variations = store_pages
+    slim = woocommerce.slim_store_page(products)
+    assert slim[0] == {
+        'id': 1000, 'name': 'Trinidad Vigia', 'url': 'https://www.cigar-club.com/shop/trinidad-vigia/',
+        'type': 'variable', 'price': 267.47, 'in_stock': True, 'variation': '',
+        'variations': [{'id': 1001, 'label': 'Box of 3'}, {'id': 1002, 'label': 'Box of 18'}],
+    }
+    assert woocommerce.slim_store_page(variations)[0]['variation'] == 'Size: Box of 3'
+
+
+def test_store_products_lists_each_variation(store_pages):
+    products, variations = (woocommerce.slim_store_page(page) for page in store_pages)
+    listing = scrape_havana_house.store_products(products, variations)
+
+    vigia = [p for p in listing if p['normalized'] == 'trinidad vigia']
+    assert [(p['name'], p['box_size'], p['price']) for p in vigia] == [
+        ('Trinidad Vigia - Box of 3', 3, 267.47),
+        ('Trinidad Vigia - Box of 18', 18, 595.15),
+    ]
+    assert all(p['price'] > 20 for p in listing)
+    assert not any(w in p['name'].lower() for p in listing for w in scrape_havana_house.SKIP_WORDS)
+
+
+def test_html_listing_page(fixture_text):
+    html = fixture_text('havanahouse_listing.html')
+    products, _ = scrape_havana_house.parse_search_results(html)
+    assert products[0] == {
+        'name': 'Trinidad Vigia - Box of 3', 'price': 267.47, 'box_size': 3, 'normalized': 'trinidad vigia',
+        'url': 'https://www.havanahouse.co.uk/product/trinidad-vigia--box-of-3/', 'in_stock': True,
+    }
+    assert scrape_havana_house.page_count(html) == 3
+
+
+class Response:
+    def __init__(self, items, total_pages=None):
+        self.items = items
+        self.headers = {'X-WP-TotalPages': str(total_pages)} if total_pages else {}
+
+    def json(self):
+        return self.items
+
+
+def test_fetch_collection_reads_every_page_once(monkeypatch):
+    pages = {1: [{'id': 1, 'name': 'A'}], 2: [{'id': 2, 'name': 'B'}], 3: [{'id': 3, 'name': 'C'}]}
+    requested = []
+
+    def get(url, headers=None):
+        page_num = int(url.rsplit('page=', 1)[1])
+        requested.append(page_num)
+        return Response(pages[page_num], total_pages=3)
+
+    monkeypatch.setattr(woocommerce.http_fetch, 'get', get)
+    cache = scrape_havana_house.ScrapeCache(persist=False)
+
+    items = woocommerce.fetch_collection('https://shop.example', cache, 'havanahouse_catalogue')
+    assert [p['id'] for p in items] == [1, 2, 3]
+    assert sorted(requested) == [1, 2, 3]
+
+    # Pages are cached individually - a second pull makes no requests
+    requested.clear()
+    assert [p['id'] for p in woocommerce.fetch_collection('https://shop.example', cache, 'havanahouse_catalogue')] == [1, 2, 3]
+    assert requested == []
+
+
+def test_fetch_collection_without_page_count_stops_at_short_page(monkeypatch):
+    full = [{'id': i} for i in range(woocommerce.PAGE_SIZE)]
+    monkeypatch.setattr(woocommerce.http_fetch, 'get',
+                        lambda url, headers=None: Response(full if url.endswith('page=1') else [{'id': -1}]))
+
+    items = woocommerce.fetch_collection('https://shop.example', scrape_havana_house.ScrapeCache(persist=False), 'x')
+    assert len(items) == woocommerce.PAGE_SIZE + 1
@@ -0,0 +1,41 @@
+"""HTML parser backends: subtree-only parsing reads the same products as a full parse."""
+
+import pytest
+
+from scrapers import html_parser
+from scrapers import scrape_cgars, scrape_havana_house, scrape_cigar_club, scrape_jjfox
+
+
+CASES = [
+    ('cgars listing', 'cgars_listing.html', lambda h: scrape_cgars.parse_listing_page(h)),
+    ('cgars search', 'cgars_listing.html', lambda h: scrape_cgars.parse_search_results(h)),
+    ('havanahouse listing', 'havanahouse_listing.html', lambda h: scrape_havana_house.parse_search_results(h)),
+    ('havanahouse pages', 'havanahouse_listing.html', lambda h: scrape_havana_house.page_count(h)),
+    ('cigarclub search', 'cigarclub_search.html', lambda h: scrape_cigar_club.parse_search_results(h)),
+    ('jjfox search', 'jjfox_search.html', lambda h: scrape_jjfox.parse_search_results(h)),
+]
+
+
+def parsed(monkeypatch, backend, subtrees, parse, html):
+    monkeypatch.setattr(html_parser, 'BACKEND', backend)
+    monkeypatch.setattr(html_parser, 'SUBTREES', subtrees)
+    return parse(html)
+
+
+@pytest.mark.parametrize('backend', html_parser.available_backends())
+@pytest.mark.parametrize('case, fixture, parse', CASES, ids=[c[0] for c in CASES])
+def test_subtree_parse_matches_full_parse(monkeypatch, fixture_text, backend, case, fixture, parse):
+    html = fixture_text(fixture)
+    # SCRAPE_HTML_PARSER=html.parser with SCRAPE_HTML_SUBTREES=0 - the original full parse
+    expected = parsed(monkeypatch, 'html.parser', False, parse, html)
+    assert expected
+    assert parsed(monkeypatch, backend, True, parse, html) == expected
+
+
+def test_only_keeps_the_selected_subtrees(monkeypatch):
+    html = ('<html><body><nav><a class="title">Menu</a></nav>'
+            '<ul><li class="product"><a class="title">Cohiba Siglo VI</a></li></ul></body></html>')
+    for backend in html_parser.available_backends():
+        monkeypatch.setattr(html_parser, 'BACKEND', backend)
+        soup = html_parser.parse(html, 'li.product')
+        assert [a.get_text() for a in soup.select('a.title')] == ['Cohiba Siglo VI'], backend
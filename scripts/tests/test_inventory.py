@@ -0,0 +1,76 @@
+"""Inventory loader: header detection and local .json/.csv inventory files."""
+
+import json
+
+import inventory
+
+
+SHEET = [
+    ['Cigar Inventory', '', '', ''],
+    [],
+    ['Brand', 'Name', 'Size', 'Box/Number of Cigars'],
+    ['Cohiba', 'Siglo VI', 'Canonazo', 'Box of 10'],
+    ['Trinidad', 'Vigia', 'Robusto', '18'],
+    ['Cohiba', 'Siglo VI', 'Canonazo', '10'],      # duplicate
+    ['Partagas', 'Serie D No.4', 'Robusto', '1'],  # single
+    ['Montecristo', '', 'No.2', '25'],             # no name
+    ['Bolivar', 'Royal Corona'],                   # short row
+]
+
+
+def test_find_columns():
+    assert inventory.find_columns(SHEET) == (2, 0, 1, 3)
+    assert inventory.find_columns([['brand', 'name', 'box_size'], ['Name', 'Brand', 'box_size']]) == (1, 1, 0, 2)
+
+
+def test_find_columns_needs_a_box_column():
+    assert inventory.find_columns([['Brand', 'Name', 'Size']]) is None
+    assert inventory.find_columns([]) is None
+
+
+def test_pick_and_parse_columns():
+    rows = inventory.pick_columns(SHEET, inventory.find_columns(SHEET))
+    assert rows[-1] == ('Bolivar', 'Royal Corona', '')
+    assert inventory.parse_cigars(rows) == [
+        {'brand': 'Cohiba', 'name': 'Siglo VI', 'box_size': 10, 'key': 'Cohiba|Siglo VI|10'},
+        {'brand': 'Trinidad', 'name': 'Vigia', 'box_size': 18, 'key': 'Trinidad|Vigia|18'},
+    ]
+
+
+def test_column_letter():
+    assert [inventory._column_letter(i) for i in (0, 3, 25, 26, 27, 51, 52)] == ['A', 'D', 'Z', 'AA', 'AB', 'AZ', 'BA']
+
+
+def test_load_csv(tmp_path, capsys):
+    path = tmp_path / 'inventory.csv'
+    path.write_text('\ufeff' + '\n'.join(','.join(row) for row in SHEET), encoding='utf-8')
+    assert [c['key'] for c in inventory.load_file(str(path))] == ['Cohiba|Siglo VI|10', 'Trinidad|Vigia|18']
+
+
+def test_load_csv_without_columns(tmp_path, capsys):
+    path = tmp_path / 'inventory.csv'
+    path.write_text('Brand,Name\nCohiba,Siglo VI\n')
+    assert inventory.load_file(str(path)) == []
+    assert 'Could not find required columns' in capsys.readouterr().out
+
+
+def test_load_json(tmp_path, capsys):
+    path = tmp_path / 'inventory.json'
+    path.write_text(json.dumps([
+        {'brand': 'Cohiba', 'name': 'Behike 52', 'box_size': 10},
+        {'brand': 'Cohiba', 'name': 'Behike 52', 'box_size': '10'},
+        {'brand': 'Cohiba', 'name': 'Siglo I'},
+    ]))
+    assert inventory.load_file(str(path)) == [
+        {'brand': 'Cohiba', 'name': 'Behike 52', 'box_size': 10, 'key': 'Cohiba|Behike 52|10'},
+    ]
+
+
+def test_unreadable_files(tmp_path, capsys):
+    assert inventory.load_file(str(tmp_path / 'missing.csv')) == []
+    bad = tmp_path / 'bad.json'
+    bad.write_text('{not json')
+    assert inventory.load_file(str(bad)) == []
+    listing = tmp_path / 'object.json'
+    listing.write_text('{"brand": "Cohiba"}')
+    assert inventory.load_file(str(listing)) == []
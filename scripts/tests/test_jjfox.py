@@ -0,0 +1,78 @@
+"""JJ Fox: every box-size price from one product page load."""
+
+import pytest
+
+from scrapers import scrape_jjfox
+
+
+URL = 'https://www.jjfox.co.uk/cohiba-siglo-vi.html'
+
+
+@pytest.fixture
+def product_html(fixture_text):
+    return fixture_text('jjfox_product.html')
+
+
+def test_parse_product_config(product_html):
+    assert scrape_jjfox.parse_product_config(product_html) == {
+        '1': {'price': 52.5, 'in_stock': True, 'label': 'Single'},
+        '10': {'price': 509.0, 'in_stock': True, 'label': 'Box of 10'},
+        '25': {'price': 1249.0, 'in_stock': False, 'label': 'Box of 25'},
+    }
+
+
+def test_page_without_config():
+    assert scrape_jjfox.parse_product_config('<html><body><h1>Cohiba</h1></body></html>') == {}
+
+
+def test_config_price_result(product_html):
+    options = scrape_jjfox.parse_product_config(product_html)
+
+    assert scrape_jjfox.config_price_result(options, 10, URL) == {
+        'price': 509.0, 'box_size': 10, 'in_stock': True, 'url': URL,
+    }
+    assert scrape_jjfox.config_price_result(options, 25, URL)['in_stock'] is False
+    assert scrape_jjfox.config_price_result(options, 5, URL)['box_not_available']
+
+
+def test_dropdown_fallback_reuses_the_config_page(monkeypatch):
+    """With no config on the page, the dropdown is read without loading the page again."""
+    navigations = []
+
+    class Element:
+        def __init__(self, text):
+            self.text = text
+
+        def inner_text(self):
+            return self.text
+
+    class Page:
+        url = 'about:blank'
+        selected = None
+
+        def content(self):
+            return '<html><body><select class="super-attribute-select"></select></body></html>'
+
+        def query_selector(self, selector):
+            return Element('£450.00' if self.selected else '£100.00') if selector == '.price' else Element('')
+
+        def evaluate(self, js, element):
+            return [{'value': '', 'text': 'Choose an Option...'}, {'value': '2', 'text': 'Box of 25'}]
+
+        def select_option(self, selector, value):
+            self.selected = value
+
+    def goto(page, url, rule):
+        navigations.append(url)
+        page.url = url
+
+    monkeypatch.setattr(scrape_jjfox.readiness, 'goto', goto)
+    monkeypatch.setattr(scrape_jjfox.readiness, 'perform', lambda page, rule, action: action())
+    monkeypatch.setattr(scrape_jjfox, '_page', Page())
+    monkeypatch.setattr(scrape_jjfox, '_loaded_url', None)
+    monkeypatch.setattr(scrape_jjfox, '_cache', scrape_jjfox.ScrapeCache(persist=False))
+
+    result = scrape_jjfox.get_product_price(URL, 25)
+
+    assert result['price'] == 450.0
+    assert navigations == [URL]
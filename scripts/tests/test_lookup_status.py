@@ -0,0 +1,114 @@
+"""Lookup status: a lookup whose fetches failed is not "checked, not found"."""
+
+import types
+
+import pytest
+
+import scrape_orchestrator
+from run_journal import RunJournal
+from scrapers import lookup_status, http_fetch, readiness, rate_scheduler
+from scrapers.cache import ScrapeCache
+
+
+URL = 'https://www.example.com/search?q=cohiba'
+
+
+def test_failed_requests():
+    with lookup_status.track() as failures:
+        lookup_status.fetched(URL, 200)
+        lookup_status.fetched(URL, 404)
+        assert failures == []
+        lookup_status.fetched(URL, 503)
+        lookup_status.fetched(URL, error=TimeoutError('Timeout 30000ms exceeded.\nCall log: ...'))
+    assert failures == [f'{URL}: HTTP 503', f'{URL}: Timeout 30000ms exceeded.']
+
+
+def test_outside_a_lookup_is_ignored():
+    lookup_status.failed('preflight')
+    with lookup_status.track() as failures:
+        pass
+    assert failures == []
+
+
+def test_check():
+    assert lookup_status.check(None, []) is None
+    assert lookup_status.check({'price': 500.0}, ['x']) == {'price': 500.0}
+    with pytest.raises(lookup_status.FetchFailed):
+        lookup_status.check(None, ['x'])
+    with pytest.raises(lookup_status.FetchFailed):
+        lookup_status.check({'price': None}, ['x'])
+
+
+def test_remembered_failures_fail_later_lookups():
+    cache = ScrapeCache(persist=False)
+    with lookup_status.track() as first:
+        cache.remember('jjfox:cohiba', [])
+    with lookup_status.track() as second:
+        assert cache.get('jjfox:cohiba') == []
+    assert first and second
+
+    # Fetched successfully since - no longer a failure
+    cache['jjfox:cohiba'] = [{'name': 'Cohiba Siglo VI'}]
+    with lookup_status.track() as third:
+        assert 'jjfox:cohiba' in cache
+    assert third == []
+
+
+def test_fetch_all_reports_to_the_callers_lookup():
+    def fetch(page_num):
+        if page_num == 3:
+            lookup_status.fetched(f'{URL}&page=3', 502)
+        return page_num
+
+    with lookup_status.track() as failures:
+        assert http_fetch.fetch_all(fetch, [1, 2, 3]) == [1, 2, 3]
+    assert failures == [f'{URL}&page=3: HTTP 502']
+
+
+class Page:
+    """Sync page whose navigations to 'down' URLs time out."""
+
+    def goto(self, url, wait_until, timeout):
+        if 'down' in url:
+            raise TimeoutError('Timeout 30000ms exceeded.')
+        return types.SimpleNamespace(status=200, headers={})
+
+
+def scraper_module(prices):
+    """Scraper that swallows navigation errors, like the real ones."""
+    def scrape(brand, name, box_size):
+        try:
+            readiness.goto(Page(), f'https://www.example.com/{prices.get(name, "search")}', {})
+        except Exception as e:
+            print(f"    Error searching: {e}")
+            return None
+        price = prices.get(name)
+        return {'price': price, 'box_size': box_size} if isinstance(price, float) else None
+
+    return types.SimpleNamespace(scrape=scrape)
+
+
+@pytest.fixture
+def journal(monkeypatch, tmp_path):
+    monkeypatch.setattr(scrape_orchestrator, 'ASYNC_ENGINE', False)
+    monkeypatch.setattr(scrape_orchestrator, 'SEARCH_PLAN', False)
+    monkeypatch.setattr(scrape_orchestrator, 'RunJournal', lambda: RunJournal(str(tmp_path / 'journal.jsonl')))
+    monkeypatch.setattr(rate_scheduler, 'wait', lambda url: None)
+    monkeypatch.setattr(rate_scheduler, '_buckets', {})
+    return RunJournal(str(tmp_path / 'journal.jsonl'))
+
+
+def test_failed_lookup_is_neither_checked_nor_journaled(monkeypatch, journal, inventory, capsys):
+    cigars = inventory[:3]
+    prices = {cigars[0]['name']: 'down', cigars[2]['name']: 500.0}
+    monkeypatch.setattr(scrape_orchestrator, 'load_scraper_module', lambda f: scraper_module(prices))
+
+    results, stats = scrape_orchestrator.scrape_retailer('Example', 'scrapers/scrape_example.py', cigars)
+
+    assert stats['failed_keys'] == [cigars[0]['key']]
+    assert stats['checked'] == [cigars[1]['key'], cigars[2]['key']]
+    assert list(results) == [cigars[2]['key']]
+
+    _, pairs = journal.load()
+    assert set(pairs) == {(cigars[1]['key'], 'Example'), (cigars[2]['key'], 'Example')}
+    assert pairs[(cigars[1]['key'], 'Example')] is None
@@ -0,0 +1,213 @@
+"""
+Shared matching core: each retailer's rules must reproduce the decisions of
+the per-scraper normalize_name() / extract_box_size() functions they replaced.
+
+Expected values below were produced by those original functions.
+"""
+
+import json
+
+import pytest
+
+from scrapers import matching
+from scrapers import scrape_cgars, scrape_havana_house, scrape_cigar_club, scrape_jjfox, scrape_no6cavendish
+from scrapers import woocommerce
+from scrapers.product_index import ProductIndex
+
+
+MODULES = {
+    'cgars': scrape_cgars,
+    'havana_house': scrape_havana_house,
+    'cigar_club': scrape_cigar_club,
+    'jjfox': scrape_jjfox,
+    'no6cavendish': scrape_no6cavendish,
+}
+
+# (product name, {retailer: (box size, normalized name)}) from the original functions
+NAMES = [
+    ('Montecristo No. 2 - Box of 25', {
+        'cgars': (25, 'montecristo no 2'),
+        'havana_house': (25, 'montecristo no 2'),
+        'cigar_club': (25, 'montecristo no 2'),
+        'jjfox': (25, 'montecristo no 2'),
+        'no6cavendish': (25, 'montecristo no 2'),
+    }),
+    ('Cohiba Siglo VI (Tubos) - Box of 15', {
+        'cgars': (15, 'cohiba siglo vi tubos'),
+        'havana_house': (15, 'cohiba siglo vi tubos'),
+        'cigar_club': (15, 'cohiba siglo vi tubos'),
+        'jjfox': (15, 'cohiba siglo vi'),
+        'no6cavendish': (15, 'cohiba siglo vi'),
+    }),
+    ('Partagas Serie D No. 4 - 25s', {
+        'cgars': (None, 'partagas serie d no 4 25s'),
+        'havana_house': (25, 'partagas serie d no 4'),
+        'cigar_club': (25, 'partagas serie d no 4'),
+        'jjfox': (None, 'partagas serie d no 4 25s'),
+        'no6cavendish': (None, 'partagas serie d no 4 25s'),
+    }),
+    ('Romeo y Julieta Churchill (25)', {
+        'cgars': (25, 'romeo y julieta churchill'),
+        'havana_house': (25, 'romeo y julieta churchill'),
+        'cigar_club': (None, 'romeo y julieta churchill'),
+        'jjfox': (None, 'romeo y julieta churchill'),
+        'no6cavendish': (None, 'romeo y julieta churchill'),
+    }),
+    ('Hoyo de Monterrey Epicure No. 2 - 25', {
+        'cgars': (None, 'hoyo de monterrey epicure no 2 25'),
+        'havana_house': (25, 'hoyo de monterrey epicure no 2'),
+        'cigar_club': (25, 'hoyo de monterrey epicure no 2'),
+        'jjfox': (None, 'hoyo de monterrey epicure no 2 25'),
+        'no6cavendish': (None, 'hoyo de monterrey epicure no 2 25'),
+    }),
+    ('Bolivar Belicosos Finos Box 25', {
+        'cgars': (None, 'bolivar belicosos finos box 25'),
+        'havana_house': (25, 'bolivar belicosos finos box 25'),
+        'cigar_club': (None, 'bolivar belicosos finos box 25'),
+        'jjfox': (None, 'bolivar belicosos finos box 25'),
+        'no6cavendish': (None, 'bolivar belicosos finos box 25'),
+    }),
+    ('H. Upmann Magnum 54 Cabinet 50', {
+        'cgars': (None, 'h upmann magnum 54 cabinet 50'),
+        'havana_house': (50, 'h upmann magnum 54 cabinet 50'),
+        'cigar_club': (None, 'h upmann magnum 54 cabinet 50'),
+        'jjfox': (None, 'h upmann magnum 54 cabinet 50'),
+        'no6cavendish': (None, 'h upmann magnum 54 cabinet 50'),
+    }),
+    ('Cohiba Behike 52 SLB 10', {
+        'cgars': (10, 'cohiba behike 52'),
+        'havana_house': (10, 'cohiba behike 52'),
+        'cigar_club': (None, 'cohiba behike 52 slb 10'),
+        'jjfox': (None, 'cohiba behike 52 slb 10'),
+        'no6cavendish': (None, 'cohiba behike 52 slb 10'),
+    }),
+    ('Montecristo Petit Edmundo Single Tubo', {
+        'cgars': (1, 'montecristo petit edmundo single tubo'),
+        'havana_house': (1, 'montecristo petit edmundo single tubo'),
+        'cigar_club': (1, 'montecristo petit edmundo single tubo'),
+        'jjfox': (1, 'montecristo petit edmundo single tubo'),
+        'no6cavendish': (None, 'montecristo petit edmundo single tubo'),
+    }),
+    ('Ramon Allones Specially Selected (10 Cigars)', {
+        'cgars': (10, 'ramon allones specially selected 10 cigars'),
+        'havana_house': (None, 'ramon allones specially selected 10 cigars'),
+        'cigar_club': (None, 'ramon allones specially selected 10 cigars'),
+        'jjfox': (None, 'ramon allones specially selected'),
+        'no6cavendish': (None, 'ramon allones specially selected'),
+    }),
+    ('Trinidad Fundadores - Pack of 5', {
+        'cgars': (5, 'trinidad fundadores pack of 5'),
+        'havana_house': (None, 'trinidad fundadores pack of 5'),
+        'cigar_club': (5, 'trinidad fundadores'),
+        'jjfox': (5, 'trinidad fundadores pack of 5'),
+        'no6cavendish': (5, 'trinidad fundadores'),
+    }),
+    ('BOX OF 25', {retailer: (25, '') for retailer in MODULES}),
+    ('Cabinet of 50', {retailer: (50, '') for retailer in MODULES}),
+    ('Single Cigar', {retailer: (1, 'single cigar') for retailer in MODULES}),
+]
+
+CASES = [(retailer, name, expected[retailer]) for name, expected in NAMES for retailer in MODULES]
+
+
+@pytest.mark.parametrize('retailer, name, expected', CASES)
+def test_box_size_and_normalization_match_original(retailer, name, expected):
+    rules = MODULES[retailer].MATCH_RULES
+    box_size, normalized = expected
+    assert matching.extract_box_size(name, rules) == box_size
+    assert matching.normalize_name(name, rules) == normalized
+
+
+def test_signature_uses_retailer_normalization():
+    name = 'Siglo VI (Tubos)'
+    assert matching.match_signature('Cohiba', name, scrape_jjfox.MATCH_RULES).normalized == 'siglo vi'
+    assert matching.match_signature('Cohiba', name, scrape_cgars.MATCH_RULES).normalized == 'siglo vi tubos'
+
+
+def test_signature_fields():
+    sig = matching.match_signature('Romeo y Julieta', 'Wide Churchills', scrape_cgars.MATCH_RULES)
+    assert sig.brand_first == 'romeo'
+    assert sig.brand_forms == ('romeo y julieta', 'romeo', 'ryj')
+    assert sig.last_word == 'churchills'
+    assert sig.last_stem == 'churchill'
+    assert sig.check_vitola
+    assert sig.key_words == ('wide', 'churchills')
+    assert sig.min_key_matches == 2
+
+    sig = matching.match_signature('Cohiba', 'Behike 52', scrape_cgars.MATCH_RULES)
+    assert sig.behike == '52'
+    assert not sig.check_vitola
+
+    sig = matching.match_signature('Cohiba', 'Siglo VI', scrape_cgars.MATCH_RULES)
+    assert sig.romans == frozenset({'vi'})
+    assert not sig.check_vitola
+
+
+def test_rules_are_compiled_once():
+    rules = scrape_havana_house.MATCH_RULES
+    assert all(hasattr(p, 'search') for p in rules.noise + rules.box_patterns)
+    assert matching.extract_box_size('Montecristo No. 4 - 25', rules) == 25
+    # Out-of-range counts fall through to later patterns or None
+    assert matching.extract_box_size('Montecristo No. 4 - 100', rules) is None
+
+
+# -- candidate_products() narrows to a superset of the matches --------------
+
+def packaged_products(module, inventory):
+    """Products named like retailer listings for every inventory cigar, in several box sizes."""
+    forms = ['{} - Box of {}', '{} ({})', '{} - {}s', '{} Box {}', '{} - {}', '{} (Tubos) - Box of {}', '{} Single']
+    products = []
+    for cigar in inventory:
+        for form in forms:
+            for box in (cigar['box_size'], 10):
+                name = form.format(f"{cigar['brand']} {cigar['name']}", box)
+                products.append({
+                    'name': name,
+                    'normalized': matching.normalize_name(name, module.MATCH_RULES),
+                    'box_size': matching.extract_box_size(name, module.MATCH_RULES),
+                    'price': 100.0,
+                    'url': '',
+                })
+    return products
+
+
+def fixture_products(retailer, fixture_text):
+    if retailer == 'cgars':
+        return scrape_cgars.parse_listing_page(fixture_text('cgars_listing.html'))[0]
+    if retailer == 'havana_house':
+        return scrape_havana_house.parse_search_results(fixture_text('havanahouse_listing.html'))[0]
+    if retailer == 'cigar_club':
+        products = woocommerce.slim_store_page(json.loads(fixture_text('cigarclub_store_products.json')))
+        variations = woocommerce.slim_store_page(json.loads(fixture_text('cigarclub_store_variations.json')))
+        return list(scrape_cigar_club.build_catalogue(products, variations))
+    catalogue = scrape_no6cavendish.slim_catalogue_page(fixture_text('no6_products.json'))
+    return list(scrape_no6cavendish.build_catalogue(catalogue))
+
+
+def is_match(module, product, cigar):
+    if module in (scrape_cgars, scrape_havana_house):
+        return module.match_product(product, cigar['brand'], cigar['name'], cigar['box_size'])[0]
+    return module.match_product(product, cigar['brand'], cigar['name'])[0]
+
+
+@pytest.mark.parametrize('retailer', ['cgars', 'havana_house', 'cigar_club', 'no6cavendish'])
+def test_candidates_are_superset_of_matches(retailer, inventory, fixture_text, capsys):
+    module = MODULES[retailer]
+    products = fixture_products(retailer, fixture_text) + packaged_products(module, inventory)
+    index = ProductIndex(products)
+    position = {id(p): i for i, p in enumerate(products)}
+
+    matched = 0
+    for cigar in inventory:
+        candidates = module.candidate_products(index, cigar['brand'], cigar['name'])
+        candidate_ids = {id(p) for p in candidates}
+        for product in products:
+            if is_match(module, product, cigar):
+                matched += 1
+                assert id(product) in candidate_ids, (cigar['key'], product['name'])
+
+        # Candidates keep the list order, so the first match is the same as a linear scan
+        order = [position[id(p)] for p in candidates]
+        assert order == sorted(order)
+
+    assert matched
@@ -0,0 +1,52 @@
+"""ProductIndex: postings lookups are supersets of the substring/word rules they mirror."""
+
+from scrapers.product_index import ProductIndex
+
+
+PRODUCTS = [{'normalized': n} for n in (
+    'cohiba siglo vi',
+    'cohiba behike 52',
+    'montecristo no 2',
+    'montecristo edmundo',
+    'partagas serie d no 4',
+    'cohiba siglo vi tubos',
+    'romeo y julieta churchill 2019',
+)]
+
+
+def names(index, ids):
+    return [p['normalized'] for p in index.select(ids)]
+
+
+def test_containing_confirms_substring():
+    index = ProductIndex(PRODUCTS)
+    assert names(index, index.containing('cohiba')) == ['cohiba siglo vi', 'cohiba behike 52', 'cohiba siglo vi tubos']
+    assert names(index, index.containing('edmund')) == ['montecristo edmundo']
+    assert index.containing('xyz') == set()
+    # Too short to index - no constraint
+    assert index.containing('no') is None
+
+
+def test_containing_matches_linear_scan():
+    index = ProductIndex(PRODUCTS)
+    for text in ('siglo', 'monte', 'o no', 'churchill', 'vi t', 'ehik'):
+        assert names(index, index.containing(text)) == [p['normalized'] for p in PRODUCTS if text in p['normalized']]
+
+
+def test_tokens_all_and_any():
+    index = ProductIndex(PRODUCTS)
+    assert names(index, index.tokens_all(['siglo', 'vi'])) == ['cohiba siglo vi', 'cohiba siglo vi tubos']
+    # Whole words only - 'vi' is not found inside 'edmundo' or 'behike'
+    assert names(index, index.tokens_all(['vi'])) == ['cohiba siglo vi', 'cohiba siglo vi tubos']
+    assert names(index, index.tokens_any(['2019', '52'])) == ['cohiba behike 52', 'romeo y julieta churchill 2019']
+    assert index.tokens_all([]) is None
+    assert index.tokens_any([]) is None
+
+
+def test_intersect_and_select_keep_list_order():
+    index = ProductIndex(PRODUCTS)
+    ids = index.intersect(index.containing_any(['tubos', 'cohiba']), None, index.tokens_all(['siglo']))
+    assert names(index, ids) == ['cohiba siglo vi', 'cohiba siglo vi tubos']
+    assert index.intersect(None, None) is None
+    assert len(index.select(None)) == len(PRODUCTS)
+    assert index.containing_any(['cohiba', 'no']) is None
@@ -0,0 +1,85 @@
+"""Per-host rate scheduler: token bucket waits and AIMD rate adaptation."""
+
+import pytest
+
+from scrapers import rate_scheduler
+
+
+@pytest.fixture(autouse=True)
+def fresh_hosts(monkeypatch):
+    monkeypatch.setattr(rate_scheduler, '_buckets', {})
+    monkeypatch.setattr(rate_scheduler, 'JITTER', 0)
+    monkeypatch.setattr(rate_scheduler.har, 'REPLAY', False)
+
+
+URL = 'https://www.example.com/search?q=cohiba'
+
+
+def test_buckets_are_per_host():
+    assert rate_scheduler.bucket(URL) is rate_scheduler.bucket('https://WWW.example.com/other')
+    assert rate_scheduler.bucket(URL) is not rate_scheduler.bucket('https://www.other.com/')
+
+
+def test_burst_then_wait():
+    b = rate_scheduler.bucket(URL)
+    waits = [b.reserve() for _ in range(rate_scheduler.BURST + 1)]
+    assert waits[:rate_scheduler.BURST] == [0.0] * rate_scheduler.BURST
+    assert waits[-1] > 0
+
+
+def test_fast_responses_raise_rate():
+    b = rate_scheduler.bucket(URL)
+    b.record(0.2, status=200)
+    assert b.rate == pytest.approx(rate_scheduler.INITIAL_RATE + rate_scheduler.RATE_INCREASE)
+
+
+def test_slow_response_lowers_rate():
+    b = rate_scheduler.bucket(URL)
+    b.record(0.2, status=200)
+    rate = b.rate
+    b.record(5.0, status=200)
+    assert b.rate == pytest.approx(rate * rate_scheduler.SLOW_DECREASE)
+    assert b.counters['slow'] == 1
+
+
+def test_throttle_halves_rate_and_cools_down():
+    b = rate_scheduler.bucket(URL)
+    rate_scheduler.record(URL, 0.3, status=429, headers={'Retry-After': '30'})
+    assert b.rate == pytest.approx(rate_scheduler.INITIAL_RATE * rate_scheduler.THROTTLE_DECREASE)
+    assert b.counters['throttled'] == 1 and b.counters['cooldown'] == 30
+    assert b.reserve() >= 29
+
+
+def test_failure_streaks():
+    for _ in range(3):
+        rate_scheduler.record(URL, 0.1, status=503)
+    assert rate_scheduler.failing_hosts(3) == {'www.example.com': (3, 'HTTP 503')}
+    rate_scheduler.record(URL, 0.1, status=200)
+    assert rate_scheduler.failing_hosts(1) == {}
+
+
+def test_retry_after():
+    assert rate_scheduler.retry_after({'retry-after': '12'}) == 12
+    assert rate_scheduler.retry_after({'Retry-After': '9999'}) == rate_scheduler.MAX_COOLDOWN
+    assert rate_scheduler.retry_after({'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}) is None
+    assert rate_scheduler.retry_after(None) is None
+
+
+def test_navigations_report_status_not_error(monkeypatch):
+    """readiness.goto() feeds a response's status and headers back, not an error."""
+    from scrapers import readiness
+
+    class Response:
+        status = 200
+        headers = {'content-type': 'text/html'}
+
+    class Page:
+        def goto(self, url, wait_until, timeout):
+            return Response()
+
+    monkeypatch.setattr(rate_scheduler, 'wait', lambda url: None)
+    for _ in range(3):
+        readiness.goto(Page(), URL, {})
+    b = rate_scheduler.bucket(URL)
+    assert b.counters['errors'] == 0
+    assert rate_scheduler.failing_hosts(1) == {}
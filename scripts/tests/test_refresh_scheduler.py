@@ -0,0 +1,96 @@
+"""RefreshScheduler: interval adaptation and due decisions."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import refresh_scheduler
+from refresh_scheduler import RefreshScheduler, pair_key
+
+
+NOW = datetime(2026, 10, 17, 6, 0)
+PRICE = {'price': 250.0, 'in_stock': True, 'url': 'https://example.com/a'}
+
+
+@pytest.fixture(autouse=True)
+def scheduled(monkeypatch):
+    # The suite may run with SCRAPE_FULL_REFRESH or a HAR mode set
+    monkeypatch.setattr(refresh_scheduler, 'FULL_REFRESH', False)
+
+
+def scheduler(tmp_path, now=NOW):
+    return RefreshScheduler(path=str(tmp_path / 'refresh_schedule.json'), now=now)
+
+
+def interval(s, cigar='Cohiba|Siglo VI|25', retailer='CGars'):
+    return s.state[pair_key(cigar, retailer)]['interval_days']
+
+
+def test_first_check_starts_at_initial_interval(tmp_path):
+    s = scheduler(tmp_path)
+    s.record('Cohiba|Siglo VI|25', 'CGars', PRICE)
+    entry = s.state[pair_key('Cohiba|Siglo VI|25', 'CGars')]
+    assert entry['interval_days'] == refresh_scheduler.INITIAL_INTERVAL_DAYS
+    assert entry['checks'] == 1 and entry['changes'] == 0
+    assert entry['last_result'] == PRICE
+
+
+def test_unchanged_price_grows_interval_up_to_max(tmp_path):
+    s = scheduler(tmp_path)
+    s.record('Cohiba|Siglo VI|25', 'CGars', PRICE)
+    s.record('Cohiba|Siglo VI|25', 'CGars', dict(PRICE))
+    assert interval(s) == 7 * 1.5
+
+    for _ in range(20):
+        s.record('Cohiba|Siglo VI|25', 'CGars', dict(PRICE))
+    assert interval(s) == refresh_scheduler.MAX_INTERVAL_DAYS
+
+
+def test_changed_price_shrinks_interval(tmp_path):
+    s = scheduler(tmp_path)
+    s.record('Cohiba|Siglo VI|25', 'CGars', PRICE)
+    s.record('Cohiba|Siglo VI|25', 'CGars', dict(PRICE, price=275.0))
+    entry = s.state[pair_key('Cohiba|Siglo VI|25', 'CGars')]
+    assert entry['interval_days'] == 7 * 0.5
+    assert entry['changes'] == 1
+    assert entry['last_result']['price'] == 275.0
+
+
+def test_stock_change_and_disappearance_count_as_changes(tmp_path):
+    s = scheduler(tmp_path)
+    s.record('Cohiba|Siglo VI|25', 'CGars', PRICE)
+    s.record('Cohiba|Siglo VI|25', 'CGars', dict(PRICE, in_stock=False))
+    assert interval(s) == 3.5
+    s.record('Cohiba|Siglo VI|25', 'CGars', None)
+    assert interval(s) == 1.75
+
+
+def test_zero_interval_can_grow_again(tmp_path):
+    s = scheduler(tmp_path)
+    s.state[pair_key('Cohiba|Siglo VI|25', 'CGars')] = {
+        'last_result': PRICE, 'last_checked': NOW.isoformat(), 'interval_days': 0,
+    }
+    s.record('Cohiba|Siglo VI|25', 'CGars', dict(PRICE))
+    assert interval(s) == 1.5
+
+
+def test_due_after_interval_with_slack(tmp_path):
+    s = scheduler(tmp_path)
+    s.record('Cohiba|Siglo VI|25', 'CGars', PRICE)
+    s.save()
+
+    # 7-day interval, one day of slack
+    assert not scheduler(tmp_path, NOW + timedelta(days=5)).is_due('Cohiba|Siglo VI|25', 'CGars')
+    assert scheduler(tmp_path, NOW + timedelta(days=6)).is_due('Cohiba|Siglo VI|25', 'CGars')
+    assert scheduler(tmp_path, NOW).is_due('Cohiba|Siglo VI|25', 'JJ Fox')
+
+
+def test_due_cigars_and_last_result(tmp_path):
+    s = scheduler(tmp_path)
+    s.record('a|b|25', 'CGars', PRICE)
+    cigars = [{'key': 'a|b|25'}, {'key': 'c|d|10'}]
+    due, skipped = s.due_cigars(cigars, 'CGars')
+    assert [c['key'] for c in due] == ['c|d|10']
+    assert [c['key'] for c in skipped] == ['a|b|25']
+    assert s.last_result('a|b|25', 'CGars') == PRICE
+    assert s.last_result('c|d|10', 'CGars') is None
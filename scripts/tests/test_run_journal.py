@@ -0,0 +1,43 @@
+"""Run journal: fresh runs, appended pairs and crash-truncated lines."""
+
+from run_journal import RunJournal
+
+
+CIGARS = [{'brand': 'Cohiba', 'name': 'Siglo VI', 'box_size': 25, 'key': 'Cohiba|Siglo VI|25'}]
+RESULT = {'price': 1234.5, 'url': 'https://example.com/siglo-vi', 'in_stock': True}
+
+
+def test_round_trip(tmp_path):
+    journal = RunJournal(str(tmp_path / 'run' / 'scrape_journal.jsonl'))
+    journal.start(CIGARS)
+    journal.append('Cohiba|Siglo VI|25', 'CGars', RESULT)
+    journal.append('Cohiba|Siglo VI|25', 'JJ Fox', None)
+
+    cigars, pairs = journal.load()
+    assert cigars == CIGARS
+    assert pairs == {('Cohiba|Siglo VI|25', 'CGars'): RESULT, ('Cohiba|Siglo VI|25', 'JJ Fox'): None}
+
+
+def test_start_replaces_previous_run(tmp_path):
+    journal = RunJournal(str(tmp_path / 'scrape_journal.jsonl'))
+    journal.start(CIGARS)
+    journal.append('Cohiba|Siglo VI|25', 'CGars', RESULT)
+    journal.start([])
+    assert journal.load() == ([], {})
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / 'scrape_journal.jsonl'
+    journal = RunJournal(str(path))
+    journal.start(CIGARS)
+    journal.append('Cohiba|Siglo VI|25', 'CGars', RESULT)
+    with open(path, 'a') as f:
+        f.write('{"type": "pair", "cigar": "Cohiba|Sig')
+
+    cigars, pairs = journal.load()
+    assert cigars == CIGARS
+    assert list(pairs) == [('Cohiba|Siglo VI|25', 'CGars')]
+
+
+def test_missing_journal(tmp_path):
+    assert RunJournal(str(tmp_path / 'none.jsonl')).load() == ([], {})
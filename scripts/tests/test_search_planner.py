@@ -0,0 +1,45 @@
+"""Search planner: merging reordered/recased queries only."""
+
+from search_planner import canonical_term, plan_searches, describe_plan
+from scrapers import scrape_jjfox
+
+
+def terms(brand, name):
+    return [f"{brand} {name}", name, f"{name} {brand}".upper()]
+
+
+def test_canonical_term_ignores_case_punctuation_and_order():
+    assert canonical_term('No. 2 Montecristo') == canonical_term('montecristo  no 2')
+    assert canonical_term('Cohiba Behike') != canonical_term('Cohiba')
+
+
+def test_plan_merges_reordered_and_recased_terms():
+    cigars = [
+        {'brand': 'Cohiba', 'name': 'Robusto'},
+        {'brand': 'Partagas', 'name': 'Robusto'},
+    ]
+    plan = plan_searches(cigars, terms)
+
+    assert plan['terms'] == 6
+    assert plan['aliases']['ROBUSTO COHIBA'] == 'Cohiba Robusto'
+    assert plan['aliases']['ROBUSTO PARTAGAS'] == 'Partagas Robusto'
+    assert plan['queries'] == ['Cohiba Robusto', 'Robusto', 'Partagas Robusto']
+    # The repeated bare 'Robusto' is one distinct term - the cache handles exact repeats
+    assert plan['distinct'] == 5
+    assert plan['unique'] == 3
+    assert plan['saved'] == 2
+
+
+def test_broader_queries_are_not_merged():
+    plan = plan_searches([{'brand': 'Cohiba', 'name': 'Behike 52'}], lambda b, n: ['Cohiba Behike', 'Cohiba'])
+    assert plan['aliases'] == {'Cohiba Behike': 'Cohiba Behike', 'Cohiba': 'Cohiba'}
+    assert plan['saved'] == 0
+
+
+def test_every_term_has_an_alias(inventory):
+    plan = plan_searches(inventory, scrape_jjfox.get_search_terms)
+    for cigar in inventory:
+        for term in scrape_jjfox.get_search_terms(cigar['brand'], cigar['name']):
+            assert canonical_term(plan['aliases'][term]) == canonical_term(term)
+    assert plan['unique'] + plan['saved'] == plan['distinct']
+    assert describe_plan(plan, len(inventory)).startswith(f"Search plan: {plan['terms']} term lookups")